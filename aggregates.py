@@ -0,0 +1,79 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+from .domain import Order
+from .persistent import PMap
+
+_EMPTY = PMap()
+
+
+def _bump(counts: PMap, key, delta: int) -> PMap:
+    value = counts.get(key, 0) + delta
+    return counts.set(key, value) if value else counts.remove(key)
+
+
+@dataclass(frozen=True, slots=True)
+class Aggregates:
+    """Текущие агрегаты по заказам: выручка, число заказов по статусам,
+    выручка по ресторанам и зонам.
+
+    Каждое изменение - O(log n) по числу ключей и дает новую версию, старая
+    остается прежней. Зоны берутся из отображения rest_id -> zone; заказы
+    ресторанов без зоны в выручку по зонам не попадают.
+    """
+    revenue: int = 0
+    count: int = 0
+    status_counts: PMap = _EMPTY
+    rest_revenue: PMap = _EMPTY
+    zone_revenue: PMap = _EMPTY
+    zones: PMap = field(default=_EMPTY, compare=False)
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Order], zones: Optional[PMap] = None) -> 'Aggregates':
+        """Полный пересчет за один проход; дальше агрегаты ведутся инкрементально"""
+        zones = _EMPTY if zones is None else zones
+        revenue = count = 0
+        status_counts: Dict[str, int] = {}
+        rest_revenue: Dict[str, int] = {}
+        zone_revenue: Dict[str, int] = {}
+        for o in orders:
+            revenue += o.total
+            count += 1
+            status_counts[o.status] = status_counts.get(o.status, 0) + 1
+            rest_revenue[o.rest_id] = rest_revenue.get(o.rest_id, 0) + o.total
+            zone = zones.get(o.rest_id)
+            if zone is not None:
+                zone_revenue[zone] = zone_revenue.get(zone, 0) + o.total
+        return cls(revenue, count,
+                   PMap(status_counts),
+                   PMap((k, v) for k, v in rest_revenue.items() if v),
+                   PMap((k, v) for k, v in zone_revenue.items() if v),
+                   zones)
+
+    def _apply(self, order: Order, sign: int) -> 'Aggregates':
+        total = sign * order.total
+        zone = self.zones.get(order.rest_id)
+        return Aggregates(
+            self.revenue + total,
+            self.count + sign,
+            _bump(self.status_counts, order.status, sign),
+            _bump(self.rest_revenue, order.rest_id, total),
+            self.zone_revenue if zone is None else _bump(self.zone_revenue, zone, total),
+            self.zones,
+        )
+
+    def add(self, order: Order) -> 'Aggregates':
+        return self._apply(order, 1)
+
+    def remove(self, order: Order) -> 'Aggregates':
+        return self._apply(order, -1)
+
+    def replace(self, old: Order, new: Order) -> 'Aggregates':
+        """Переход заказа в новое состояние (например, смена статуса)"""
+        if old.status != new.status and old.rest_id == new.rest_id and old.total == new.total:
+            # Частый случай: меняется только статус, выручка остается на месте
+            counts = _bump(_bump(self.status_counts, old.status, -1), new.status, 1)
+            return Aggregates(self.revenue, self.count, counts, self.rest_revenue, self.zone_revenue, self.zones)
+        return self.remove(old).add(new)
+
+    def status_count(self, status: str) -> int:
+        return self.status_counts.get(status, 0)
@@ -0,0 +1,256 @@
+import time
+from collections import Counter, deque
+from itertools import chain
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from .domain import Courier, Order, Restaurant, Slot
+from .intervals import IntervalTree
+from .recursion import zone_lookup
+from .rules import DEFAULT_PAIR_RULESET, PAIR_COURIER_FIELDS, RuleSet
+from .timeindex import DAY, slot_intervals
+
+GREEDY = "greedy"
+OPTIMAL = "optimal"
+
+
+@dataclass(frozen=True, slots=True)
+class Assignment:
+    mode: str
+    pairs: Tuple[Tuple[str, str, str], ...]  # (order_id, courier_id, slot_id)
+    unassigned: Tuple[str, ...]
+    seconds: float
+
+    def by_order(self) -> Dict[str, str]:
+        return {order_id: courier_id for order_id, courier_id, _ in self.pairs}
+
+
+class _Unit:
+    """Единица емкости: одно место в слоте курьера"""
+    __slots__ = ("courier", "slot_id")
+
+    def __init__(self, courier: Courier, slot_id: str):
+        self.courier = courier
+        self.slot_id = slot_id
+
+
+class AvailabilityIndex:
+    """Индекс свободных мест по зоне и времени.
+
+    Для каждой зоны слоты лежат в дереве интервалов (intervals.IntervalTree),
+    поэтому кандидаты для заказа - запрос точки за O(log n + k). Места с
+    одинаковыми границами слота делятся на списки по полям курьера, которые
+    читают парные правила (rules.PAIR_COURIER_FIELDS). Слоты
+    'HH:MM' повторяются каждый день и ищутся по времени суток; ночной слот
+    делится в полночь (timeindex.slot_intervals, общее правило с SlotIndex). Места,
+    уже занятые прошлыми назначениями (occupied: slot_id -> число мест),
+    из емкости слота вычитаются.
+    """
+
+    def __init__(self, couriers: Iterable[Courier], slots: Iterable[Slot], per_slot: int = 1,
+                 occupied: Optional[Dict[str, int]] = None):
+        by_id = {c.id: c for c in couriers}
+        occupied = occupied or {}
+        self.units: List[_Unit] = []
+        # Места слотов с одинаковыми границами - один интервал дерева
+        groups: Dict[Tuple[str, bool], Dict[Tuple[int, int], Dict[tuple, List[int]]]] = {}
+        for slot in slots:
+            courier = by_id.get(slot.courier_id)
+            free = per_slot - occupied.get(slot.id, 0)
+            if courier is None or free <= 0:
+                continue
+            try:
+                daily, intervals = slot_intervals(slot)
+            except ValueError:
+                continue  # Слот с датами, который кончается до начала, мест не дает
+            first = len(self.units)
+            self.units.extend(_Unit(courier, slot.id) for _ in range(free))
+            zone = groups.setdefault((courier.zone, daily), {})
+            profile = tuple(getattr(courier, f) for f in PAIR_COURIER_FIELDS)
+            for bounds in intervals:
+                zone.setdefault(bounds, {}).setdefault(profile, []).extend(range(first, first + free))
+        # (зона, ежедневный ли слот) -> дерево интервалов со списками номеров мест
+        self._zones: Dict[Tuple[str, bool], IntervalTree] = {
+            key: IntervalTree((lo, hi, tuple(lists.values())) for (lo, hi), lists in zone.items())
+            for key, zone in groups.items()}
+
+    def groups(self, zone: Optional[str], ts: int) -> List[List[int]]:
+        """Списки номеров мест, покрывающих момент ts в зоне.
+
+        В одном списке - места с одними границами слота и курьерами, равными
+        по PAIR_COURIER_FIELDS.
+        """
+        found = []
+        for daily, t in ((True, ts % DAY), (False, ts)):
+            tree = self._zones.get((zone, daily))
+            if tree is not None:
+                for lists in tree.stab(t):
+                    found.extend(lists)
+        return found
+
+    def candidates(self, zone: Optional[str], ts: int) -> List[int]:
+        """Номера мест зоны, слот которых покрывает момент ts"""
+        return list(chain.from_iterable(self.groups(zone, ts)))
+
+
+def _candidate_graph(orders: Tuple[Order, ...], zones: Dict[str, str], index: AvailabilityIndex,
+                     rules: RuleSet) -> List[List[int]]:
+    units = index.units
+    allows = rules.allows
+    graph = []
+    for order in orders:
+        ts = order.epoch
+        graph.append([i for i in index.candidates(zones.get(order.rest_id), ts)
+                      if allows(order, units[i].courier)])
+    return graph
+
+
+def _greedy_lazy(orders: Tuple[Order, ...], zones: Dict[str, str], index: AvailabilityIndex,
+                 rules: RuleSet) -> List[int]:
+    """Жадный подбор без графа кандидатов.
+
+    Курьеры одного списка мест равны по полям, которые читают парные
+    правила, поэтому rules.allows вызывается один раз на список. Заказы
+    идут по возрастанию числа допустимых мест, как в _greedy. У списка
+    хранится начало свободной части: занятые места (ночной слот лежит в
+    двух списках) пропускаются один раз. Заказу - O(log n + число списков)
+    без перебора всех пар.
+    """
+    units = index.units
+    allows = rules.allows
+    options = [[ids for ids in index.groups(zones.get(order.rest_id), order.epoch)
+                if allows(order, units[ids[0]].courier)] for order in orders]
+    match = [-1] * len(orders)
+    used = bytearray(len(units))
+    first_free: Dict[int, int] = {}
+    for u in sorted(range(len(orders)), key=lambda u: sum(map(len, options[u]))):
+        for ids in options[u]:
+            start = first_free.get(id(ids), 0)
+            while start < len(ids) and used[ids[start]]:
+                start += 1
+            first_free[id(ids)] = start
+            if start < len(ids):
+                used[ids[start]] = 1
+                match[u] = ids[start]
+                break
+    return match
+
+
+def _greedy(graph: List[List[int]], n_units: int) -> List[int]:
+    # Сначала заказы с наименьшим числом вариантов, каждому - первое свободное место
+    match = [-1] * len(graph)
+    used = bytearray(n_units)
+    for u in sorted(range(len(graph)), key=lambda u: len(graph[u])):
+        for v in graph[u]:
+            if not used[v]:
+                used[v] = 1
+                match[u] = v
+                break
+    return match
+
+
+def _hopcroft_karp(graph: List[List[int]], n_units: int) -> List[int]:
+    """Максимальное паросочетание заказов и мест за O(E * sqrt(V))"""
+    inf = len(graph) + 1
+    pair_u = [-1] * len(graph)
+    pair_v = [-1] * n_units
+    dist = [0] * len(graph)
+
+    def bfs() -> bool:
+        queue = deque()
+        for u in range(len(graph)):
+            if pair_u[u] == -1:
+                dist[u] = 0
+                queue.append(u)
+            else:
+                dist[u] = inf
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in graph[u]:
+                w = pair_v[v]
+                if w == -1:
+                    found = True
+                elif dist[w] == inf:
+                    dist[w] = dist[u] + 1
+                    queue.append(w)
+        return found
+
+    def augment(root: int, ptr: List[int]) -> bool:
+        # Итеративный DFS по слоям BFS: глубина пути не упирается в лимит рекурсии
+        stack_u, stack_v = [root], []
+        while stack_u:
+            u = stack_u[-1]
+            if ptr[u] < len(graph[u]):
+                v = graph[u][ptr[u]]
+                ptr[u] += 1
+                w = pair_v[v]
+                if w == -1:
+                    stack_v.append(v)
+                    for uu, vv in zip(stack_u, stack_v, strict=True):
+                        pair_u[uu] = vv
+                        pair_v[vv] = uu
+                    return True
+                if dist[w] == dist[u] + 1:
+                    stack_u.append(w)
+                    stack_v.append(v)
+            else:
+                dist[u] = inf
+                stack_u.pop()
+                if stack_v:
+                    stack_v.pop()
+        return False
+
+    # Жадное начальное паросочетание сокращает число фаз
+    for u, v in enumerate(_greedy(graph, n_units)):
+        if v != -1:
+            pair_u[u] = v
+            pair_v[v] = u
+    while bfs():
+        ptr = [0] * len(graph)
+        for u in range(len(graph)):
+            if pair_u[u] == -1:
+                augment(u, ptr)
+    return pair_u
+
+
+def assign_orders(orders: Iterable[Order], couriers: Tuple[Courier, ...], slots: Tuple[Slot, ...],
+                  restaurants: Tuple[Restaurant, ...], mode: str = GREEDY, rules: Optional[RuleSet] = None,
+                  per_slot: int = 1, existing: Iterable[Tuple[str, str, str]] = ()) -> Assignment:
+    """Назначает заказы со статусом placed на места в слотах курьеров.
+
+    Пара допустима, если курьер из зоны ресторана, его слот покрывает время
+    заказа, в слоте есть свободное место и пара проходит парные правила
+    (по умолчанию - лимит для велосипеда). existing - пары прошлых
+    назначений (Assignment.pairs): каждая занимает место в своем слоте.
+    mode=greedy - быстрый жадный подбор, mode=optimal - максимальное число
+    назначенных заказов (Хопкрофт-Карп).
+    """
+    if mode not in (GREEDY, OPTIMAL):
+        raise ValueError(f"Unknown assignment mode: {mode}")
+    start = time.perf_counter()
+    backlog = tuple(o for o in orders if o.status == "placed")
+    occupied = Counter(slot_id for _, _, slot_id in existing)
+    index = AvailabilityIndex(couriers, slots, per_slot, occupied)
+    zones = zone_lookup(restaurants)
+    rules = DEFAULT_PAIR_RULESET if rules is None else rules
+    if mode == GREEDY:
+        # Жадному подбору полный граф не нужен: места перебираются лениво
+        match = _greedy_lazy(backlog, zones, index, rules)
+    else:
+        match = _hopcroft_karp(_candidate_graph(backlog, zones, index, rules), len(index.units))
+
+    pairs, unassigned = [], []
+    for order, v in zip(backlog, match, strict=True):
+        if v == -1:
+            unassigned.append(order.id)
+        else:
+            unit = index.units[v]
+            pairs.append((order.id, unit.courier.id, unit.slot_id))
+    return Assignment(mode, tuple(pairs), tuple(unassigned), time.perf_counter() - start)
+
+
+def apply_assignment(service, assignment: Assignment):
+    """Новая версия DeliveryService, где назначенные заказы переведены в assigned"""
+    for order_id, _, _ in assignment.pairs:
+        service = service.update_status(order_id, "assigned")
+    return service
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from . import memo
+from .cache import MISSING, RouteCostCache
+from .domain import Courier, Order
+
+RouteRequest = Tuple[str, Tuple[Order, ...], Tuple[Courier, ...]]
+RouteKey = Tuple[str, Tuple[str, ...], Tuple[str, ...], Tuple[int, ...]]
+
+# Вычисления, которые уже идут: одинаковые ключи получают один и тот же Future
+_in_flight: Dict[RouteKey, Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+def _compute(key: RouteKey) -> Dict[str, Any]:
+    # Функция верхнего уровня, чтобы ее можно было передать в ProcessPoolExecutor;
+    # время готовности заказов приходит в ключе, и процессу не нужно меню родителя
+    return memo.compute_route_cost_cached.__wrapped__(*key)
+
+
+def _route_key(request: RouteRequest) -> RouteKey:
+    return memo.route_key(*request)
+
+
+def _make_executor(executor: Union[str, Executor], max_workers: Optional[int]) -> Tuple[Executor, bool]:
+    if isinstance(executor, Executor):
+        return executor, False
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers), True
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=max_workers), True
+    raise ValueError(f"Unknown executor kind: {executor}")
+
+
+def _resolved(value: Any) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def _submit(pool: Executor, key: RouteKey, cache: RouteCostCache) -> Future:
+    # Уровни кэша и TTL - как в RouteCostCache.get_or_compute
+    value = cache.lookup(key)
+    if value is not MISSING:
+        return _resolved(value)
+
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is not None:
+            return future
+        future = pool.submit(_compute, key)
+        _in_flight[key] = future
+
+    def _done(f: Future) -> None:
+        if f.exception() is None:
+            cache.put_computed(key, f.result())
+        with _in_flight_lock:
+            if _in_flight.get(key) is f:
+                del _in_flight[key]
+
+    future.add_done_callback(_done)
+    return future
+
+
+def submit_route_costs(requests: Iterable[RouteRequest], pool: Executor,
+                       cache: Optional[RouteCostCache] = None) -> List[Future]:
+    """Ставит запросы в пул: попадания в кэш сразу готовы, дубликаты делят один Future"""
+    cache = memo.route_cache if cache is None else cache
+    return [_submit(pool, _route_key(r), cache) for r in requests]
+
+
+def compute_route_costs(requests: Iterable[RouteRequest], executor: Union[str, Executor] = "thread",
+                        max_workers: Optional[int] = None, ordered: bool = True,
+                        cache: Optional[RouteCostCache] = None) -> Iterator:
+    """Пакетный расчет стоимостей маршрутов в пуле потоков или процессов.
+
+    При ordered=True результаты идут в порядке запросов, иначе - пары
+    (индекс запроса, результат) по мере готовности. Вычисляются только
+    промахи кэша.
+    """
+    pool, owned = _make_executor(executor, max_workers)
+    try:
+        futures = submit_route_costs(requests, pool, cache)
+        if ordered:
+            for future in futures:
+                yield future.result()
+        else:
+            positions: Dict[Future, List[int]] = {}
+            for i, future in enumerate(futures):
+                positions.setdefault(future, []).append(i)
+            for future in as_completed(positions):
+                for i in positions[future]:
+                    yield i, future.result()
+    finally:
+        if owned:
+            pool.shutdown(wait=True)
+
+
+async def aiter_route_costs(requests: Iterable[RouteRequest], executor: Union[str, Executor] = "thread",
+                            max_workers: Optional[int] = None, ordered: bool = True,
+                            cache: Optional[RouteCostCache] = None) -> AsyncIterator:
+    """Асинхронный вариант compute_route_costs с той же дедупликацией"""
+    pool, owned = _make_executor(executor, max_workers)
+    try:
+        futures = submit_route_costs(requests, pool, cache)
+        positions: Dict[Future, List[int]] = {}
+        for i, future in enumerate(futures):
+            positions.setdefault(future, []).append(i)
+        wrapped = {future: asyncio.wrap_future(future) for future in positions}
+        if ordered:
+            for future in futures:
+                yield await wrapped[future]
+        else:
+            index = {wrapped[future]: where for future, where in positions.items()}
+            pending = set(index)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for aw in done:
+                    for i in index[aw]:
+                        yield i, aw.result()
+    finally:
+        if owned:
+            pool.shutdown(wait=False)
+
+
+async def acompute_route_costs(requests: Iterable[RouteRequest], **options) -> List[Dict[str, Any]]:
+    """Результаты в порядке запросов"""
+    return [result async for result in aiter_route_costs(requests, ordered=True, **options)]
@@ -0,0 +1,360 @@
+import argparse
+import gc
+import json
+import math
+import operator
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .domain import Order
+from .loader import SECTIONS
+
+
+@dataclass(frozen=True)
+class _LegacyOrder:
+    """Прежнее представление Order: __dict__ и хеш, пересчитываемый при каждом вызове"""
+    id: str
+    rest_id: str
+    items: Tuple[Tuple[str, int], ...]
+    total: int
+    ts: str
+    status: str
+
+    def __hash__(self):
+        return hash((self.id, self.rest_id, self.items, self.total, self.ts, self.status))
+
+
+def _make_orders(cls, n: int) -> List[Any]:
+    # Строки готовятся заранее, чтобы в замер попадали только объекты заказов
+    items = (("m1", 2), ("m2", 1))
+    ids = [f"o{i}" for i in range(n)]
+    return [cls(ids[i], "r1", items, 1000 + i % 5000, "2024-01-15 10:00:00", "placed") for i in range(n)]
+
+
+def _per_object_bytes(cls, n: int) -> float:
+    items = (("m1", 2), ("m2", 1))
+    ids = [f"o{i}" for i in range(n)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls(ids[i], "r1", items, 1000, "2024-01-15 10:00:00", "placed") for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Список ссылок учитываем отдельно: 8 байт на элемент
+    per_object = (after - before) / n - 8
+    del objects
+    return per_object
+
+
+def _seconds(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _hash_all(orders: List[Any]) -> List[int]:
+    return [hash(o) for o in orders]
+
+
+def _count_members(orders: List[Any], members: set) -> int:
+    return sum(1 for o in orders if o in members)
+
+
+def bench_domain(n: int = 1_000_000) -> Dict[str, Dict[str, float]]:
+    """Память и стоимость хеширования для n заказов: прежний Order против слотового"""
+    results = {}
+    for name, cls in (("legacy", _LegacyOrder), ("slotted", Order)):
+        orders = _make_orders(cls, n)
+        first_hash = _seconds(partial(_hash_all, orders))
+        repeat_hash = _seconds(partial(_hash_all, orders))
+        lookup = _seconds(partial(_count_members, orders, set(orders[: n // 2])))
+        del orders
+        results[name] = {
+            "bytes_per_object": _per_object_bytes(cls, min(n, 200_000)),
+            "construct_s": _seconds(partial(_make_orders, cls, n)),
+            "first_hash_ns": first_hash / n * 1e9,
+            "repeat_hash_ns": repeat_hash / n * 1e9,
+            "set_lookup_ns": lookup / n * 1e9,
+        }
+    return results
+
+
+def bench_replay(n: int = 100_000) -> Dict[str, Any]:
+    """Скорость воспроизведения журнала: полный replay и восстановление со снапшота"""
+    from .events import EventSourcedService, replay_throughput
+
+    results = {}
+    for name, every in (("full", n + 1), ("snapshot", max(1, n // 10))):
+        with tempfile.TemporaryDirectory() as directory:
+            with EventSourcedService(directory, snapshot_every=every) as es:
+                for order in _make_orders(Order, n):
+                    es.place_order(order)
+            results[name] = replay_throughput(directory)
+    return results
+
+
+def _assignment_data(n: int, zones: int = 8):
+    from .domain import Courier, Restaurant, Slot
+
+    restaurants = tuple(Restaurant(f"r{i}", f"R{i}", f"z{i % zones}") for i in range(zones * 4))
+    couriers = tuple(Courier(f"c{i}", f"C{i}", ("bike", "car", "scooter")[i % 3], f"z{i % zones}")
+                     for i in range(max(1, n // 4)))
+    slots = tuple(Slot(f"s{i}-{k}", c.id, f"{8 + 4 * k + i % 3:02d}:00", f"{11 + 4 * k + i % 3:02d}:00")
+                  for i, c in enumerate(couriers) for k in range(3))
+    orders = tuple(Order(f"o{i}", f"r{i % len(restaurants)}", (), 1000 + (i * 37) % 9000,
+                         f"2024-01-15 {8 + i % 14:02d}:{i % 60:02d}:00", "placed") for i in range(n))
+    return restaurants, orders, couriers, slots
+
+
+def bench_assignment(n: int = 20_000) -> Dict[str, Dict[str, float]]:
+    """Время назначения курьеров в зависимости от размера бэклога"""
+    from .assignment import GREEDY, OPTIMAL, assign_orders
+
+    results = {}
+    for size in (n // 8, n // 4, n // 2, n):
+        restaurants, orders, couriers, slots = _assignment_data(size)
+        row = {}
+        for mode in (GREEDY, OPTIMAL):
+            result = assign_orders(orders, couriers, slots, restaurants, mode=mode, per_slot=2)
+            row[f"{mode}_s"] = result.seconds
+            row[f"{mode}_assigned"] = len(result.pairs)
+        results[str(size)] = row
+    return results
+
+
+def bench_compose(n: int = 1_000_000) -> Dict[str, float]:
+    """Скомпилированный конвейер против вложенных вызовов filter_orders/map_orders"""
+    from .compose import Pipeline, each
+    from .filters import by_restaurant, by_status, by_total_range
+    from .transforms import filter_orders, map_orders
+
+    orders = tuple(_make_orders(Order, n))
+    get_total = operator.attrgetter("total")
+
+    def nested():
+        selected = filter_orders(filter_orders(filter_orders(orders, by_restaurant("r1")), by_status("placed")),
+                                 by_total_range(1000, 3000))
+        return sum(map_orders(selected, get_total))
+
+    pipeline = Pipeline(by_restaurant("r1"), by_status("placed"), by_total_range(1000, 3000), each(get_total), sum)
+    compile_s = _seconds(pipeline.compile)
+    nested_s = min(_seconds(nested) for _ in range(3))
+    compiled_s = min(_seconds(lambda: pipeline(orders)) for _ in range(3))
+    return {
+        "nested_s": nested_s,
+        "compiled_s": compiled_s,
+        "compile_s": compile_s,
+        "speedup": nested_s / compiled_s,
+        # Результаты обоих вариантов: замер имеет смысл, только если они совпадают
+        "nested_result": nested(),
+        "compiled_result": pipeline(orders),
+    }
+
+
+# Синтетическая нагрузка в схеме seed.json
+ZONES = ("north", "south", "east", "west", "center")
+VEHICLES = ("bike", "car", "scooter")
+STATUSES = ("placed", "assigned", "delivered", "cancelled")
+
+
+def workload_sizes(n_orders: int) -> Dict[str, int]:
+    """Размеры разделов для n_orders заказов: остальные сущности растут медленнее"""
+    restaurants = max(10, n_orders // 1000)
+    couriers = max(5, n_orders // 100)
+    return {"restaurants": restaurants, "menu_items": restaurants * 10, "orders": n_orders,
+            "couriers": couriers, "slots": couriers * 2}
+
+
+def iter_section(section: str, n_orders: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Детерминированные записи раздела; одинаковые (n_orders, seed) дают одинаковые данные"""
+    sizes = workload_sizes(n_orders)
+    rng = random.Random(f"{seed}:{section}")
+    n_rest = sizes["restaurants"]
+    if section == "restaurants":
+        for i in range(n_rest):
+            yield {"id": f"r{i}", "name": f"Restaurant {i}", "zone": ZONES[i % len(ZONES)]}
+    elif section == "menu_items":
+        for i in range(sizes["menu_items"]):
+            yield {"id": f"m{i}", "rest_id": f"r{i // 10}", "name": f"Dish {i}",
+                   "price": rng.randrange(200, 3000, 50), "prep_time": rng.randrange(5, 40)}
+    elif section == "orders":
+        for i in range(n_orders):
+            rest = rng.randrange(n_rest)
+            items = [[f"m{rest * 10 + rng.randrange(10)}", rng.randrange(1, 4)] for _ in range(rng.randrange(1, 4))]
+            minute = rng.randrange(14 * 60)
+            yield {"id": f"o{i}", "rest_id": f"r{rest}", "items": items, "total": rng.randrange(500, 12000, 10),
+                   "ts": f"2024-01-15 {8 + minute // 60:02d}:{minute % 60:02d}:{rng.randrange(60):02d}",
+                   "status": STATUSES[rng.randrange(len(STATUSES))]}
+    elif section == "couriers":
+        for i in range(sizes["couriers"]):
+            yield {"id": f"c{i}", "name": f"Courier {i}", "vehicle": VEHICLES[i % len(VEHICLES)],
+                   "zone": ZONES[i % len(ZONES)]}
+    elif section == "slots":
+        for i in range(sizes["slots"]):
+            start = 8 + (i % 2) * 6 + rng.randrange(3)
+            yield {"id": f"s{i}", "courier_id": f"c{i // 2}",
+                   "start": f"2024-01-15 {start:02d}:00:00", "end": f"2024-01-15 {start + 4:02d}:00:00"}
+    else:
+        raise ValueError(f"Unknown section: {section}")
+
+
+def generate_seed(n_orders: int, seed: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+    return {section: list(iter_section(section, n_orders, seed)) for section in SECTIONS}
+
+
+def write_seed(path: str, n_orders: int, seed: int = 0) -> None:
+    """Пишет seed потоково: файл на 10^7 заказов не собирается в памяти целиком"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for k, section in enumerate(SECTIONS):
+            f.write(f'{"," if k else ""}\n"{section}": [')
+            for i, record in enumerate(iter_section(section, n_orders, seed)):
+                f.write(("," if i else "") + "\n  " + json.dumps(record, separators=(",", ":")))
+            f.write("\n]")
+        f.write("\n}\n")
+
+
+# Замеры
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    # Ближайший ранг: p99 на малой выборке - максимум, а не интерполяция
+    k = max(0, min(len(sorted_samples) - 1, math.ceil(q * len(sorted_samples)) - 1))
+    return sorted_samples[k]
+
+
+def run_case(func: Callable[[Any], Any], setup: Callable[[], Any], ops: int = 1,
+             repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Повторные замеры func(state) после прогрева; ops - число операций за вызов"""
+    state = setup()
+    for _ in range(warmup):
+        func(state)
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter_ns()
+        func(state)
+        samples.append((time.perf_counter_ns() - start) / 1e9)
+    gc.collect()
+    tracemalloc.start()
+    func(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    samples.sort()
+    p50 = _percentile(samples, 0.5)
+    return {
+        "ops": ops,
+        "ops_per_s": ops / p50 if p50 > 0 else 0.0,
+        "p50_ms": p50 * 1e3,
+        "p99_ms": _percentile(samples, 0.99) * 1e3,
+        "mean_ms": statistics.fmean(samples) * 1e3,
+        "peak_kib": peak / 1024,
+    }
+
+
+def suite_cases(n: int) -> Dict[str, Tuple[Callable[[], Any], Callable[[Any], Any], int]]:
+    """Горячие пути: (setup, замеряемая функция, число операций за вызов)"""
+    from .filters import by_restaurant, by_total_range
+    from .recursion import collect_orders_by_zone
+    from .service import DeliveryService
+    from .transforms import filter_orders, load_seed, total_revenue
+
+    data = generate_seed(n)
+    restaurants, _, orders, _, slots = load_seed(data)
+    extra = tuple(Order(f"x{i}", "r0", (("m0", 1),), 1000, "2024-01-15 23:00:00", "placed") for i in range(1000))
+
+    def place_orders(service):
+        for order in extra:
+            service = service.place_order(order)
+        return service
+
+    return {
+        "load_seed": (lambda: data, load_seed, n),
+        "filter_by_restaurant": (lambda: orders, lambda o: filter_orders(o, by_restaurant("r0")), n),
+        "filter_by_total": (lambda: orders, lambda o: filter_orders(o, by_total_range(1000, 5000)), n),
+        "collect_orders_by_zone": (lambda: orders, lambda o: collect_orders_by_zone(o, restaurants, "north"), n),
+        "total_revenue": (lambda: orders, total_revenue, n),
+        "place_order": (lambda: DeliveryService(orders, slots, restaurants), place_orders, len(extra)),
+    }
+
+
+def bench_suite(n: int = 10_000, repeat: int = 5, warmup: int = 1,
+                cases: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Набор замеров горячих путей на синтетических данных размера n"""
+    results = {}
+    for name, (setup, func, ops) in suite_cases(n).items():
+        if cases is None or name in cases:
+            results[name] = run_case(func, setup, ops, repeat, warmup)
+    return {
+        "meta": {"n": n, "repeat": repeat, "warmup": warmup, "python": platform.python_version()},
+        "cases": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2,
+            metric: str = "p50_ms") -> List[Dict[str, Any]]:
+    """Регрессии относительно сохраненного базового прогона: рост metric больше чем на tolerance"""
+    regressions = []
+    for name, current in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None or not base.get(metric):
+            continue
+        ratio = current[metric] / base[metric]
+        if ratio > 1 + tolerance:
+            regressions.append({"case": name, "metric": metric, "baseline": base[metric],
+                                "current": current[metric], "ratio": ratio})
+    return regressions
+
+
+BENCHMARKS: Dict[str, Callable[..., Any]] = {
+    "suite": bench_suite,
+    "assignment": bench_assignment,
+    "domain": bench_domain,
+    "replay": bench_replay,
+    "compose": bench_compose,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей")
+    parser.add_argument("name", choices=sorted([*BENCHMARKS, "generate"]))
+    parser.add_argument("--n", type=int, default=None, help="размер данных")
+    parser.add_argument("--repeat", type=int, default=5, help="число замеров (suite)")
+    parser.add_argument("--warmup", type=int, default=1, help="прогревочные запуски (suite)")
+    parser.add_argument("--case", action="append", help="только указанные случаи (suite)")
+    parser.add_argument("--out", help="файл для результатов JSON (для generate - для seed)")
+    parser.add_argument("--baseline", help="базовый прогон для сравнения (suite)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимый рост p50 (suite)")
+    args = parser.parse_args(argv)
+
+    if args.name == "generate":
+        write_seed(args.out or "seed_generated.json", args.n or 1000)
+        return 0
+    if args.name == "suite":
+        result = bench_suite(args.n or 10_000, args.repeat, args.warmup, args.case)
+    else:
+        result = BENCHMARKS[args.name](args.n) if args.n else BENCHMARKS[args.name]()
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['case']}: {r['metric']} {r['baseline']:.3f} -> {r['current']:.3f} "
+                  f"(x{r['ratio']:.2f})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    entries: int
+    size_bytes: int
+    backing_hits: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def approx_size(obj: Any) -> int:
+    """Приблизительный размер объекта в байтах с учетом вложенных контейнеров"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (tuple, list, set, frozenset)):
+        size += sum(approx_size(x) for x in obj)
+    return size
+
+
+class _LRU:
+    """Вытеснение давно не использованных записей"""
+
+    def __init__(self):
+        self.order: OrderedDict = OrderedDict()
+
+    def add(self, key) -> None:
+        self.order[key] = None
+
+    def touch(self, key) -> None:
+        self.order.move_to_end(key)
+
+    def remove(self, key) -> None:
+        del self.order[key]
+
+    def victim(self):
+        return next(iter(self.order))
+
+
+class _LFU:
+    """Вытеснение редко используемых записей за O(1): корзины по частоте"""
+
+    def __init__(self):
+        self.freq: Dict[Hashable, int] = {}
+        self.buckets: Dict[int, OrderedDict] = {}
+        self.min_freq = 0
+
+    def add(self, key) -> None:
+        self.freq[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_freq = 1
+
+    def touch(self, key) -> None:
+        f = self.freq[key]
+        bucket = self.buckets[f]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[f]
+            if self.min_freq == f:
+                self.min_freq = f + 1
+        self.freq[key] = f + 1
+        self.buckets.setdefault(f + 1, OrderedDict())[key] = None
+
+    def remove(self, key) -> None:
+        f = self.freq.pop(key)
+        bucket = self.buckets[f]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[f]
+            if self.min_freq == f:
+                self.min_freq = min(self.buckets, default=0)
+
+    def victim(self):
+        return next(iter(self.buckets[self.min_freq]))
+
+
+_POLICIES = {"lru": _LRU, "lfu": _LFU}
+
+
+class RouteCostCache:
+    """Кэш стоимостей маршрутов с вытеснением, TTL и инвалидацией.
+
+    Ключ - (route_id, order_ids, courier_ids). Размер ограничивается числом
+    записей и/или приблизительным объемом в байтах; по order_id и courier_id
+    ведутся обратные индексы для точечной инвалидации. Необязательный
+    backing (например, DiskRouteCache) - следующий уровень: промахи ищутся
+    в нем, а вычисленные значения записываются в оба уровня.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 4096, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None, policy: str = "lru",
+                 clock: Callable[[], float] = time.monotonic, backing: Any = None):
+        if policy not in _POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.policy = policy
+        self._clock = clock
+        self.backing = backing
+        self._lock = threading.RLock()
+        self._entries: Dict[Hashable, Tuple[Any, Optional[float], int]] = {}
+        self._policy = _POLICIES[policy]()
+        self._by_order: Dict[str, Set[Hashable]] = {}
+        self._by_courier: Dict[str, Set[Hashable]] = {}
+        self._size_bytes = 0
+        self._hits = self._misses = self._evictions = self._expirations = self._invalidations = 0
+        self._backing_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return self.peek(key) is not MISSING
+
+    def peek(self, key) -> Any:
+        """Значение без учета в статистике и без изменения порядка вытеснения"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= self._clock()):
+                return MISSING
+            return entry[0]
+
+    def get(self, key) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return MISSING
+            self._hits += 1
+            self._policy.touch(key)
+            return entry[0]
+
+    def put(self, key, value, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires = self._clock() + ttl if ttl is not None else None
+        size = approx_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Запись больше всего кэша не сохраняем
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            # Место освобождается до вставки, чтобы новая запись не стала жертвой LFU
+            self._evict(extra_entries=1, extra_bytes=size)
+            self._entries[key] = (value, expires, size)
+            self._size_bytes += size
+            self._policy.add(key)
+            _, order_ids, courier_ids = _split_key(key)
+            for oid in order_ids:
+                self._by_order.setdefault(oid, set()).add(key)
+            for cid in courier_ids:
+                self._by_courier.setdefault(cid, set()).add(key)
+
+    def lookup(self, key) -> Any:
+        """Значение из памяти или из backing; MISSING, если его нет ни на одном уровне"""
+        value = self.get(key)
+        if value is not MISSING or self.backing is None:
+            return value
+        # Запись с диска живет в памяти не дольше, чем ей осталось на диске
+        value, remaining = self.backing.get_entry(key)
+        if value is not MISSING:
+            with self._lock:
+                self._backing_hits += 1
+            self.put(key, value, ttl=remaining)
+        return value
+
+    def put_computed(self, key, value) -> None:
+        """Записывает вычисленное значение в оба уровня с TTL кэша"""
+        self.put(key, value)
+        if self.backing is not None:
+            self.backing.put(key, value, ttl=self.ttl)
+
+    def get_or_compute(self, key, compute: Callable[[], Any]) -> Any:
+        value = self.lookup(key)
+        if value is MISSING:
+            # Вычисление идет без блокировки, чтобы не задерживать другие потоки
+            value = compute()
+            self.put_computed(key, value)
+        return value
+
+    def invalidate(self, key) -> bool:
+        if self.backing is not None:
+            self.backing.invalidate(key)
+        return self._invalidate_local(key)
+
+    def _invalidate_local(self, key) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self._invalidations += 1
+            return True
+
+    def invalidate_order(self, order_id: str) -> int:
+        if self.backing is not None:
+            self.backing.invalidate_order(order_id)
+        return self._invalidate_all(self._by_order.get(order_id, ()))
+
+    def invalidate_courier(self, courier_id: str) -> int:
+        if self.backing is not None:
+            self.backing.invalidate_courier(courier_id)
+        return self._invalidate_all(self._by_courier.get(courier_id, ()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._policy = _POLICIES[self.policy]()
+            self._by_order.clear()
+            self._by_courier.clear()
+            self._size_bytes = 0
+            self._hits = self._misses = self._evictions = self._expirations = self._invalidations = 0
+            self._backing_hits = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, self._expirations,
+                              self._invalidations, len(self._entries), self._size_bytes, self._backing_hits)
+
+    def cache_info(self) -> CacheInfo:
+        """Совместимый с functools.lru_cache отчет"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.max_entries, len(self._entries))
+
+    def _invalidate_all(self, keys: Iterable[Hashable]) -> int:
+        with self._lock:
+            count = 0
+            for key in tuple(keys):
+                count += self._invalidate_local(key)
+            return count
+
+    def _remove(self, key) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size_bytes -= size
+        self._policy.remove(key)
+        _, order_ids, courier_ids = _split_key(key)
+        for index, ids in ((self._by_order, order_ids), (self._by_courier, courier_ids)):
+            for i in ids:
+                keys = index.get(i)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[i]
+
+    def _evict(self, extra_entries: int = 0, extra_bytes: int = 0) -> None:
+        while self._entries and (
+                (self.max_entries is not None and len(self._entries) + extra_entries > self.max_entries)
+                or (self.max_bytes is not None and self._size_bytes + extra_bytes > self.max_bytes)):
+            self._remove(self._policy.victim())
+            self._evictions += 1
+
+
+def _split_key(key) -> Tuple[Any, Tuple[str, ...], Tuple[str, ...]]:
+    # Ключ маршрута: (route_id, order_ids, courier_ids[, параметры модели])
+    if isinstance(key, tuple) and len(key) >= 3:
+        return key[0], key[1], key[2]
+    return key, (), ()
+
+
+def cached(cache: RouteCostCache) -> Callable:
+    """Декоратор в духе lru_cache: ключ - кортеж позиционных аргументов"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args):
+            # Кэш читается из атрибута, чтобы его можно было подменить на лету
+            return wrapper.cache.get_or_compute(args, lambda: func(*args))
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        wrapper.cache_info = cache.cache_info
+        return wrapper
+    return decorator
@@ -0,0 +1,115 @@
+import sys
+from array import array
+from collections.abc import Iterable
+from typing import Dict, List, Optional, Tuple
+
+
+# Старший код типа зарезервирован под отсутствующее значение: 255 в байтовых колонках
+_MISSING = {'B': 0xFF, 'H': 0xFFFF, 'I': 0xFFFFFFFF}
+MISSING_CODE = _MISSING['B']
+
+STATUS_VALUES = ("placed", "assigned", "delivered", "cancelled")
+VEHICLE_VALUES = ("bike", "car", "scooter")
+
+
+def code_type(size: int) -> str:
+    """Самый узкий typecode array для size кодов: 'B' до 255, затем 'H' и 'I'"""
+    for typecode, missing in _MISSING.items():
+        if size <= missing:
+            return typecode
+    raise ValueError(f"Too many categorical codes: {size}")
+
+
+def missing_code(typecode: str) -> int:
+    """Код отсутствующего значения в колонке с этим typecode"""
+    return _MISSING[typecode]
+
+
+class Categories:
+    """Двунаправленный словарь категориальных значений: строка <-> код.
+
+    Значения интернируются при загрузке, поэтому равные строки становятся
+    одним объектом и сравниваются по идентичности. Колонки хранят коды
+    в одном байте, пока значений не больше 255, и расширяются до 'H'/'I'
+    при большем числе. Словарь принадлежит датасету (см. Vocabulary).
+    """
+
+    __slots__ = ("name", "_codes", "_values")
+
+    def __init__(self, name: str, values: Iterable = ()):
+        self.name = name
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        for value in values:
+            self.code(value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value) -> bool:
+        return value in self._codes
+
+    @property
+    def values(self) -> Tuple[str, ...]:
+        return tuple(self._values)
+
+    @property
+    def typecode(self) -> str:
+        return code_type(len(self._values))
+
+    def code(self, value: str) -> int:
+        """Код значения; новое значение регистрируется"""
+        code = self._codes.get(value)
+        if code is None:
+            value = sys.intern(value)
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def get_code(self, value: str) -> Optional[int]:
+        """Код без регистрации; None для неизвестного значения"""
+        return self._codes.get(value)
+
+    def value(self, code: int) -> str:
+        return self._values[code]
+
+    def intern(self, value: str) -> str:
+        """Каноничный объект строки для значения"""
+        return self._values[self.code(value)]
+
+    def encode(self, values: Iterable) -> array:
+        """Колонка кодов; typecode выбирается после регистрации всех значений"""
+        code = self.code
+        codes = [code(v) for v in values]
+        return array(self.typecode, codes)
+
+    def decode(self, codes: Iterable[int]) -> Tuple[str, ...]:
+        values = self._values
+        return tuple(values[c] for c in codes)
+
+
+class Vocabulary:
+    """Категориальные словари одного датасета: зоны, статусы и транспорт.
+
+    Каждая загрузка получает свой Vocabulary, поэтому датасеты не делят коды
+    и не накапливают значения друг друга.
+    """
+
+    __slots__ = ("zones", "statuses", "vehicles")
+
+    def __init__(self):
+        self.zones = Categories("zone")
+        self.statuses = Categories("status", STATUS_VALUES)
+        self.vehicles = Categories("vehicle", VEHICLE_VALUES)
+
+
+def group_sum(codes: array, values: Iterable[int], size: int) -> List[int]:
+    """Сумма values по коду группы: индексация списка вместо словаря строк.
+
+    Коды вне 0..size-1 (отсутствующее значение) пропускаются.
+    """
+    sums = [0] * size
+    for code, value in zip(codes, values, strict=True):
+        if code < size:
+            sums[code] += value
+    return sums
@@ -0,0 +1,186 @@
+import re
+import time
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from .filters import And, Eq, In, Not, Or, Predicate, Range, Where, _as_predicate
+
+FILTER = "filter"
+MAP = "map"
+APPLY = "apply"
+
+_FIELD = re.compile(r"[A-Za-z_]\w*(\.[A-Za-z_]\w*)*\Z")
+
+
+def _identity(x: Any) -> Any:
+    return x
+
+
+def compose(*funcs: Callable) -> Callable:
+    """compose(f, g, h)(x) == f(g(h(x)))"""
+    if not funcs:
+        return _identity
+    return reduce(lambda f, g: lambda x: f(g(x)), funcs)
+
+
+def pipe(*funcs: Callable) -> Callable:
+    """pipe(f, g, h)(x) == h(g(f(x))): шаги в порядке применения"""
+    return compose(*reversed(funcs))
+
+
+@dataclass(frozen=True)
+class Stage:
+    kind: str
+    func: Callable
+    name: str
+
+
+def _name(func: Callable) -> str:
+    return repr(func) if isinstance(func, Predicate) else getattr(func, "__name__", type(func).__name__)
+
+
+def keep(predicate: Callable[[Any], bool], name: Optional[str] = None) -> Stage:
+    """Поэлементный фильтр (как transforms.filter_orders)"""
+    return Stage(FILTER, _as_predicate(predicate), name or _name(predicate))
+
+
+def each(func: Callable[[Any], Any], name: Optional[str] = None) -> Stage:
+    """Поэлементное преобразование (как transforms.map_orders)"""
+    return Stage(MAP, func, name or _name(func))
+
+
+def apply(func: Callable[[Tuple], Any], name: Optional[str] = None) -> Stage:
+    """Функция над всей коллекцией: total_revenue, sorted, ..."""
+    return Stage(APPLY, func, name or _name(func))
+
+
+def _as_stage(step: Any) -> Stage:
+    # Предикаты из filters - фильтры, остальные функции получают коллекцию целиком
+    if isinstance(step, Stage):
+        return step
+    if isinstance(step, Predicate):
+        return keep(step)
+    return apply(step)
+
+
+def _fuse(stages: Sequence[Stage]) -> Tuple[Stage, ...]:
+    fused: List[Stage] = []
+    for stage in stages:
+        if fused and stage.kind == FILTER and fused[-1].kind == FILTER:
+            prev = fused.pop()
+            stage = Stage(FILTER, prev.func & stage.func, f"{prev.name} & {stage.name}")
+        fused.append(stage)
+    return tuple(fused)
+
+
+class _Codegen:
+    """Исходник одной функции для всего конвейера; функции и константы - в namespace"""
+
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {}
+        self.lines: List[str] = ["def _pipeline(items):"]
+
+    def bind(self, value: Any) -> str:
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def field(self, p: Predicate) -> Optional[str]:
+        return f"x.{p.field}" if _FIELD.match(p.field) else None
+
+    def condition(self, p: Callable) -> str:
+        """Предикаты filters разворачиваются в выражения: без вызова на каждую часть"""
+        if isinstance(p, (Eq, In, Range)) and self.field(p):
+            if isinstance(p, Eq):
+                return f"{self.field(p)} == {self.bind(p.value)}"
+            if isinstance(p, In):
+                return f"{self.field(p)} in {self.bind(p.values)}"
+            return f"{self.bind(p.lo)} <= {self.field(p)} <= {self.bind(p.hi)}"
+        if isinstance(p, And):
+            return " and ".join(f"({self.condition(part)})" for part in p.parts) or "True"
+        if isinstance(p, Or):
+            return " or ".join(f"({self.condition(part)})" for part in p.parts) or "False"
+        if isinstance(p, Not):
+            return f"not ({self.condition(p.part)})"
+        if isinstance(p, Where):
+            return f"{self.bind(p.func)}(x)"
+        return f"{self.bind(p)}(x)"
+
+    def loop(self, stages: Sequence[Stage]) -> None:
+        self.lines += ["    out = []", "    append = out.append", "    for x in items:"]
+        for stage in stages:
+            if stage.kind == FILTER:
+                self.lines.append(f"        if not ({self.condition(stage.func)}):")
+                self.lines.append("            continue")
+            else:
+                self.lines.append(f"        x = {self.bind(stage.func)}(x)")
+        self.lines += ["        append(x)", "    items = tuple(out)"]
+
+    def build(self) -> Tuple[Callable, str]:
+        source = "\n".join(self.lines + ["    return items", ""])
+        exec(compile(source, "<pipeline>", "exec"), self.namespace)
+        return self.namespace.pop("_pipeline"), source
+
+
+class Pipeline:
+    """Конвейер обработки заказов из функций filters и transforms.
+
+    Шаги - Stage (keep/each/apply), предикаты filters (фильтры) или функции
+    над коллекцией. При первом вызове конвейер компилируется в одну функцию:
+    соседние фильтры сливаются в один, подряд идущие поэлементные шаги
+    выполняются в одном цикле, а Eq/In/Range подставляются выражениями.
+    Результат совпадает с последовательными tuple(filter(...))/tuple(map(...)).
+    """
+
+    def __init__(self, *steps: Any):
+        self.stages = _fuse([_as_stage(s) for s in steps])
+        self._compiled: Optional[Callable] = None
+        self.source = ""
+
+    def compile(self) -> Callable:
+        if self._compiled is None:
+            gen = _Codegen()
+            segment: List[Stage] = []
+            for stage in self.stages:
+                if stage.kind == APPLY:
+                    if segment:
+                        gen.loop(segment)
+                        segment = []
+                    gen.lines.append(f"    items = {gen.bind(stage.func)}(items)")
+                else:
+                    segment.append(stage)
+            if segment:
+                gen.loop(segment)
+            self._compiled, self.source = gen.build()
+        return self._compiled
+
+    def __call__(self, items: Any) -> Any:
+        return (self._compiled or self.compile())(items)
+
+    def run_timed(self, items: Any, hook: Callable[[str, int, int], None]) -> Any:
+        """Пошаговое выполнение без слияния: hook(имя шага, наносекунды, строк на выходе).
+
+        Для профилирования: каждый шаг материализует промежуточный кортеж.
+        """
+        for stage in self.stages:
+            start = time.perf_counter_ns()
+            if stage.kind == FILTER:
+                items = tuple(filter(stage.func, items))
+            elif stage.kind == MAP:
+                items = tuple(map(stage.func, items))
+            else:
+                items = stage.func(items)
+            hook(stage.name, time.perf_counter_ns() - start, len(items) if hasattr(items, "__len__") else 1)
+        return items
+
+    def explain(self) -> str:
+        return " -> ".join(f"{stage.kind.capitalize()}({stage.name})" for stage in self.stages)
+
+
+def metrics_hook(prefix: str = "pipeline") -> Callable[[str, int, int], None]:
+    """Hook для run_timed, пишущий время шагов в общий реестр метрик"""
+    from .metrics import REGISTRY
+
+    def hook(name: str, ns: int, rows: int) -> None:
+        REGISTRY.observe(f"{prefix}.{name}", ns)
+    return hook
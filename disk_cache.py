@@ -0,0 +1,195 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .cache import MISSING
+from .domain import Courier, Order, Route
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS route_costs (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL
+);
+CREATE TABLE IF NOT EXISTS route_members (
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    member TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS route_members_lookup ON route_members (kind, member);
+CREATE INDEX IF NOT EXISTS route_members_key ON route_members (key);
+"""
+
+
+def stable_key(key: tuple) -> str:
+    """Стабильный между процессами хеш ключа (route_id, order_ids, courier_ids[, prep])"""
+    route_id, order_ids, courier_ids, *model = key
+    raw = json.dumps([route_id, list(order_ids), list(courier_ids), *(list(m) for m in model)],
+                     separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskRouteCache:
+    """Дисковый уровень кэша стоимостей маршрутов на SQLite.
+
+    Используется журнал WAL: читатели не блокируют писателя, а конкурентные
+    записи из разных процессов ждут друг друга до busy_timeout. У каждого
+    потока и процесса свое соединение.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0, clock: Callable[[], float] = time.time):
+        self.path = str(path)
+        self.timeout = timeout
+        # Срок жизни хранится в абсолютном времени стены: его читают другие процессы
+        self._clock = clock
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(route_costs)")}
+            if "expires" not in columns:
+                conn.execute("ALTER TABLE route_costs ADD COLUMN expires REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key) -> Any:
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key) -> Tuple[Any, Optional[float]]:
+        """(значение, оставшийся TTL в секундах или None); истекшая запись - MISSING"""
+        row = self._connect().execute(
+            "SELECT value, expires FROM route_costs WHERE key = ?", (stable_key(key),)).fetchone()
+        if row is None:
+            return MISSING, None
+        value, expires = row
+        if expires is None:
+            return json.loads(value), None
+        remaining = expires - self._clock()
+        if remaining <= 0:
+            return MISSING, None
+        return json.loads(value), remaining
+
+    def put(self, key, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        now = self._clock()
+        expires = now + ttl if ttl is not None else None
+        digest = stable_key(key)
+        order_ids, courier_ids = key[1], key[2]
+        members = [(digest, "order", oid) for oid in order_ids] + [(digest, "courier", cid) for cid in courier_ids]
+        conn = self._connect()
+        # BEGIN IMMEDIATE сразу берет блокировку записи и не дает двум процессам перемешать строки
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO route_costs (key, value, created, expires) VALUES (?, ?, ?, ?)",
+                         (digest, json.dumps(value), now, expires))
+            conn.execute("DELETE FROM route_members WHERE key = ?", (digest,))
+            conn.executemany("INSERT INTO route_members (key, kind, member) VALUES (?, ?, ?)", members)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate(self, key) -> bool:
+        return self._delete_keys([stable_key(key)]) > 0
+
+    def invalidate_order(self, order_id: str) -> int:
+        return self._delete_members("order", order_id)
+
+    def invalidate_courier(self, courier_id: str) -> int:
+        return self._delete_members("courier", courier_id)
+
+    def clear(self) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM route_costs")
+        conn.execute("DELETE FROM route_members")
+        conn.execute("COMMIT")
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM route_costs").fetchone()[0]
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _delete_members(self, kind: str, member: str) -> int:
+        rows = self._connect().execute(
+            "SELECT DISTINCT key FROM route_members WHERE kind = ? AND member = ?", (kind, member)).fetchall()
+        return self._delete_keys([r[0] for r in rows])
+
+    def _delete_keys(self, digests: List[str]) -> int:
+        if not digests:
+            return 0
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = 0
+            for digest in digests:
+                deleted += conn.execute("DELETE FROM route_costs WHERE key = ?", (digest,)).rowcount
+                conn.execute("DELETE FROM route_members WHERE key = ?", (digest,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted
+
+
+def known_routes(restaurants: Iterable, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...]) -> Tuple[Route, ...]:
+    """Маршруты по умолчанию: один на курьера, через все заказы ресторанов его зоны"""
+    zones = {r.id: r.zone for r in restaurants}
+    routes = []
+    for courier in couriers:
+        order_ids = tuple(o.id for o in orders if zones.get(o.rest_id) == courier.zone)
+        if order_ids:
+            routes.append(Route(f"{courier.id}-{courier.zone}", courier.id, order_ids, 0, 0))
+    return tuple(routes)
+
+
+def warm_up(routes: Iterable[Route], orders: Tuple[Order, ...], couriers: Tuple[Courier, ...]) -> int:
+    """Считает стоимости известных маршрутов через общий кэш; возвращает число вычисленных"""
+    from .memo import compute_route_cost, route_cache
+
+    by_id = {o.id: o for o in orders}
+    by_courier = {c.id: c for c in couriers}
+    before = route_cache.stats()
+    for route in routes:
+        route_orders = tuple(by_id[oid] for oid in route.orders if oid in by_id)
+        route_couriers = (by_courier[route.courier_id],) if route.courier_id in by_courier else ()
+        compute_route_cost(route.id, route_orders, route_couriers)
+    after = route_cache.stats()
+    return (after.misses - before.misses) - (after.backing_hits - before.backing_hits)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .loader import load_seed_file
+    from .memo import enable_disk_cache, register_menu
+
+    parser = argparse.ArgumentParser(description="Предварительный расчет стоимостей маршрутов в дисковый кэш")
+    parser.add_argument("seed", help="seed.json с ресторанами, заказами и курьерами")
+    parser.add_argument("--db", default="route_costs.sqlite", help="файл SQLite дискового кэша")
+    args = parser.parse_args(argv)
+
+    enable_disk_cache(args.db)
+    restaurants, menu_items, orders, couriers, _ = load_seed_file(args.seed)
+    register_menu(menu_items)
+    routes = known_routes(restaurants, orders, couriers)
+    start = time.perf_counter()
+    computed = warm_up(routes, orders, couriers)
+    print(f"Warmed {len(routes)} routes ({computed} computed) in {time.perf_counter() - start:.2f}s -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 from typing import Tuple, Dict, Any
 
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Restaurant:
     id: str
     name: str
     zone: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MenuItem:
     id: str
     rest_id: str
@@ -18,8 +22,12 @@ class MenuItem:
     prep_time: int
 
 
+# Order и Courier объявляют __slots__ сами: лишний слот _hash хранит хеш,
+# посчитанный при первом обращении (lru_cache и множества зовут hash постоянно).
+# У Order так же кэшируется разобранное время заказа (_epoch)
 @dataclass(frozen=True)
 class Order:
+    __slots__ = ("id", "rest_id", "items", "total", "ts", "status", "_hash", "_epoch")
     id: str
     rest_id: str
     items: Tuple[Tuple[str, int], ...]
@@ -27,22 +35,54 @@ class Order:
     ts: str
     status: str
 
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", None)
+        object.__setattr__(self, "_epoch", None)
+
+    @property
+    def epoch(self) -> int:
+        """Время заказа в секундах Unix; строка ts разбирается один раз"""
+        e = self._epoch
+        if e is None:
+            e = (datetime.fromisoformat(self.ts) - _EPOCH) // _SECOND
+            object.__setattr__(self, "_epoch", e)
+        return e
+
     def __hash__(self):
-        return hash((self.id, self.rest_id, self.items, self.total, self.ts, self.status))
+        h = self._hash
+        if h is None:
+            h = hash((self.id, self.rest_id, self.items, self.total, self.ts, self.status))
+            object.__setattr__(self, "_hash", h)
+        return h
+
+    def __reduce__(self):
+        # Хеш строк зависит от процесса, поэтому кэш хеша не сериализуется
+        return Order, (self.id, self.rest_id, self.items, self.total, self.ts, self.status)
 
 
 @dataclass(frozen=True)
 class Courier:
+    __slots__ = ("id", "name", "vehicle", "zone", "_hash")
     id: str
     name: str
     vehicle: str
     zone: str
 
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", None)
+
     def __hash__(self):
-        return hash((self.id, self.name, self.vehicle, self.zone))
+        h = self._hash
+        if h is None:
+            h = hash((self.id, self.name, self.vehicle, self.zone))
+            object.__setattr__(self, "_hash", h)
+        return h
 
+    def __reduce__(self):
+        return Courier, (self.id, self.name, self.vehicle, self.zone)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Slot:
     id: str
     courier_id: str
@@ -50,7 +90,7 @@ class Slot:
     end: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Route:
     id: str
     courier_id: str
@@ -59,7 +99,7 @@ class Route:
     duration: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Event:
     id: str
     ts: str
@@ -67,7 +107,7 @@ class Event:
     payload: Dict[str, Any]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Rule:
     id: str
     kind: str
@@ -0,0 +1,227 @@
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+from .domain import Event, Order, Restaurant, Slot
+from .loader import BUILDERS
+from .service import DeliveryService
+from .snapshot import Snapshot, write_snapshot
+
+ORDER_PLACED = "order_placed"
+SLOT_ASSIGNED = "slot_assigned"
+STATUS_CHANGED = "order_status_changed"
+
+LOG_NAME = "events.jsonl"
+_SNAPSHOT_SUFFIX = ".snap"
+_META_SUFFIX = ".json"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+# События
+def order_placed(order: Order, ts: str) -> Event:
+    payload = {"id": order.id, "rest_id": order.rest_id, "items": [list(i) for i in order.items],
+               "total": order.total, "ts": order.ts, "status": order.status}
+    return Event(uuid.uuid4().hex, ts, ORDER_PLACED, payload)
+
+
+def slot_assigned(slot: Slot, ts: str) -> Event:
+    payload = {"id": slot.id, "courier_id": slot.courier_id, "start": slot.start, "end": slot.end}
+    return Event(uuid.uuid4().hex, ts, SLOT_ASSIGNED, payload)
+
+
+def status_changed(order_id: str, status: str, ts: str) -> Event:
+    return Event(uuid.uuid4().hex, ts, STATUS_CHANGED, {"order_id": order_id, "status": status})
+
+
+def apply_event(service: DeliveryService, event: Event) -> DeliveryService:
+    """Чистая функция перехода: состояние сервиса после события"""
+    if event.name == ORDER_PLACED:
+        return service.place_order(BUILDERS["orders"](event.payload))
+    if event.name == SLOT_ASSIGNED:
+        return service.assign_courier_slot(BUILDERS["slots"](event.payload))
+    if event.name == STATUS_CHANGED:
+        return service.update_status(event.payload["order_id"], event.payload["status"])
+    raise ValueError(f"Unknown event: {event.name}")
+
+
+# Журнал
+class EventLog:
+    """Файловый журнал событий только на дозапись: одна JSON-строка на событие.
+
+    Позиция события - его номер seq и байтовое смещение в файле; снапшот
+    запоминает обе, и восстановление читает журнал только после нее.
+    Недописанная последняя строка (сбой во время записи) отбрасывается.
+    """
+
+    def __init__(self, path, fsync: bool = False):
+        self.path = str(path)
+        self.fsync = fsync
+        self._file: Optional[IO[bytes]] = None
+
+    def read(self, offset: int = 0) -> Iterator[Tuple[int, Event, int]]:
+        """Тройки (seq, событие, смещение конца записи) начиная с offset"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                offset += len(line)
+                yield record["seq"], Event(record["id"], record["ts"], record["name"], record["payload"]), offset
+
+    def truncate(self, offset: int) -> None:
+        """Отрезает хвост после offset (оборванная запись после сбоя)"""
+        if os.path.exists(self.path) and os.path.getsize(self.path) > offset:
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def append(self, seq: int, event: Event) -> int:
+        """Дописывает событие; возвращает смещение конца записи"""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        record = {"seq": seq, "id": event.id, "ts": event.ts, "name": event.name, "payload": event.payload}
+        self._file.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+@dataclass(frozen=True, slots=True)
+class ReplayStats:
+    snapshot_seq: int
+    events: int
+    seconds: float
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds > 0 else 0.0
+
+
+class EventSourcedService:
+    """DeliveryService, состояние которого - свертка журнала событий.
+
+    Изменение сначала проверяется применением к текущему состоянию, затем
+    пишется в журнал и только после этого становится состоянием. Раз в
+    snapshot_every событий состояние сохраняется в снапшот, поэтому после
+    сбоя воспроизводится не больше snapshot_every событий.
+    """
+
+    def __init__(self, directory, restaurants: Tuple[Restaurant, ...] = (), snapshot_every: int = 1000,
+                 keep_snapshots: int = 2, fsync: bool = False, clock: Callable[[], str] = _now):
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.keep_snapshots = keep_snapshots
+        self.clock = clock
+        self.log = EventLog(os.path.join(self.directory, LOG_NAME), fsync=fsync)
+        self.service, self.seq, self.offset, self.snapshot_seq = self._recover(restaurants)
+
+    # Восстановление
+    def _snapshots(self) -> List[int]:
+        seqs = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_META_SUFFIX) and name[:-len(_META_SUFFIX)].isdigit():
+                seqs.append(int(name[:-len(_META_SUFFIX)]))
+        return sorted(seqs)
+
+    def _path(self, seq: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"{seq:012d}{suffix}")
+
+    def _recover(self, restaurants: Tuple[Restaurant, ...]) -> Tuple[DeliveryService, int, int, int]:
+        start = time.perf_counter()
+        seq = offset = 0
+        snapshots = self._snapshots()
+        if snapshots:
+            seq = snapshots[-1]
+            with open(self._path(seq, _META_SUFFIX), encoding="utf-8") as f:
+                offset = json.load(f)["offset"]
+            with Snapshot(self._path(seq, _SNAPSHOT_SUFFIX)) as snap:
+                restaurants = tuple(snap.restaurants)
+                service = DeliveryService(tuple(snap.orders), tuple(snap.slots), restaurants)
+        else:
+            service = DeliveryService((), (), restaurants)
+        self.restaurants = tuple(restaurants)
+        snapshot_seq = seq
+
+        replayed = 0
+        end = offset
+        for record_seq, event, record_end in self.log.read(offset):
+            service = apply_event(service, event)
+            seq, end = record_seq, record_end
+            replayed += 1
+
+        self.log.truncate(end)
+        self.replay_stats = ReplayStats(snapshot_seq, replayed, time.perf_counter() - start)
+        return service, seq, end, snapshot_seq
+
+    # Команды
+    def _emit(self, event: Event) -> DeliveryService:
+        # Событие применяется до записи: недопустимое изменение не попадает в журнал
+        service = apply_event(self.service, event)
+        self.offset = self.log.append(self.seq + 1, event)
+        self.seq += 1
+        self.service = service
+        if self.seq - self.snapshot_seq >= self.snapshot_every:
+            self.snapshot()
+        return service
+
+    def place_order(self, order: Order) -> DeliveryService:
+        return self._emit(order_placed(order, self.clock()))
+
+    def assign_courier_slot(self, slot: Slot) -> DeliveryService:
+        return self._emit(slot_assigned(slot, self.clock()))
+
+    def update_status(self, order_id: str, status: str) -> DeliveryService:
+        return self._emit(status_changed(order_id, status, self.clock()))
+
+    # Снапшоты
+    def snapshot(self) -> None:
+        """Сохраняет текущее состояние; метаданные пишутся последними и атомарно"""
+        seq = self.seq
+        write_snapshot(self._path(seq, _SNAPSHOT_SUFFIX), self.restaurants, (),
+                       tuple(self.service.orders), (), tuple(self.service.slots))
+        meta = self._path(seq, _META_SUFFIX)
+        with open(f"{meta}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "offset": self.offset}, f)
+        os.replace(f"{meta}.tmp", meta)
+        self.snapshot_seq = seq
+        for old in self._snapshots()[:-self.keep_snapshots]:
+            for suffix in (_META_SUFFIX, _SNAPSHOT_SUFFIX):
+                try:
+                    os.remove(self._path(old, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def close(self) -> None:
+        self.log.close()
+
+    def __enter__(self) -> 'EventSourcedService':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def replay_throughput(directory) -> Dict[str, Any]:
+    """Восстанавливает сервис из каталога и возвращает статистику воспроизведения"""
+    with EventSourcedService(directory) as es:
+        stats = es.replay_stats
+    return {"snapshot_seq": stats.snapshot_seq, "events": stats.events, "seconds": stats.seconds,
+            "events_per_second": stats.events_per_second}
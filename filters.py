@@ -1,22 +1,152 @@
-from typing import Callable
-from .domain import Order, Restaurant, MenuItem
-
-def by_restaurant(rest_id: str) -> Callable[[Order], bool]:
-    def filter_func(order: Order) -> bool:
-        return order.rest_id == rest_id
-    return filter_func
-
-def by_zone(zone: str) -> Callable[[Restaurant], bool]:
-    def filter_func(restaurant: Restaurant) -> bool:
-        return restaurant.zone == zone
-    return filter_func
-
-def by_price_range(min_price: int, max_price: int) -> Callable[[MenuItem], bool]:
-    def filter_func(item: MenuItem) -> bool:
-        return min_price <= item.price <= max_price
-    return filter_func
-
-def by_time_range(start: str, end: str) -> Callable[[Order], bool]:
-    def filter_func(order: Order) -> bool:
-        return start <= order.ts <= end
-    return filter_func
\ No newline at end of file
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Tuple
+from .domain import Order
+from .store import OrderStore
+from .timeindex import Timestamp, to_epoch
+
+class Predicate:
+    """Интроспектируемый предикат: вызывается как функция и комбинируется через &, | и ~"""
+    __slots__ = ()
+
+    def __call__(self, item: Any) -> bool:
+        raise NotImplementedError
+
+    def __and__(self, other: 'Predicate') -> 'Predicate':
+        return And(self.conjuncts() + _as_predicate(other).conjuncts())
+
+    def __or__(self, other: 'Predicate') -> 'Predicate':
+        return Or((self, _as_predicate(other)))
+
+    def __invert__(self) -> 'Predicate':
+        return Not(self)
+
+    def conjuncts(self) -> Tuple['Predicate', ...]:
+        """Части конъюнкции; планировщик выбирает из них индексируемую"""
+        return (self,)
+
+class Eq(Predicate):
+    __slots__ = ("field", "value", "_get")
+
+    def __init__(self, field: str, value: Any):
+        self.field = field
+        self.value = value
+        self._get = attrgetter(field)
+
+    def __call__(self, item: Any) -> bool:
+        return self._get(item) == self.value
+
+    def __repr__(self) -> str:
+        return f"{self.field} == {self.value!r}"
+
+class In(Predicate):
+    __slots__ = ("field", "values", "_get")
+
+    def __init__(self, field: str, values: Iterable[Any]):
+        self.field = field
+        self.values = frozenset(values)
+        self._get = attrgetter(field)
+
+    def __call__(self, item: Any) -> bool:
+        return self._get(item) in self.values
+
+    def __repr__(self) -> str:
+        return f"{self.field} in {sorted(self.values)!r}"
+
+class Range(Predicate):
+    """Закрытый диапазон lo <= field <= hi"""
+    __slots__ = ("field", "lo", "hi", "_get")
+
+    def __init__(self, field: str, lo: Any, hi: Any):
+        self.field = field
+        self.lo = lo
+        self.hi = hi
+        self._get = attrgetter(field)
+
+    def __call__(self, item: Any) -> bool:
+        return self.lo <= self._get(item) <= self.hi
+
+    def __repr__(self) -> str:
+        return f"{self.lo!r} <= {self.field} <= {self.hi!r}"
+
+class And(Predicate):
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: Tuple[Predicate, ...]):
+        self.parts = tuple(parts)
+
+    def __call__(self, item: Any) -> bool:
+        return all(p(item) for p in self.parts)
+
+    def conjuncts(self) -> Tuple[Predicate, ...]:
+        return self.parts
+
+    def __repr__(self) -> str:
+        return "(" + " & ".join(map(repr, self.parts)) + ")"
+
+class Or(Predicate):
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: Tuple[Predicate, ...]):
+        self.parts = tuple(parts)
+
+    def __call__(self, item: Any) -> bool:
+        return any(p(item) for p in self.parts)
+
+    def __repr__(self) -> str:
+        return "(" + " | ".join(map(repr, self.parts)) + ")"
+
+class Not(Predicate):
+    __slots__ = ("part",)
+
+    def __init__(self, part: Predicate):
+        self.part = part
+
+    def __call__(self, item: Any) -> bool:
+        return not self.part(item)
+
+    def __repr__(self) -> str:
+        return f"~{self.part!r}"
+
+class Where(Predicate):
+    """Обертка над произвольной функцией: непрозрачна для планировщика"""
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[Any], bool]):
+        self.func = func
+
+    def __call__(self, item: Any) -> bool:
+        return self.func(item)
+
+    def __repr__(self) -> str:
+        return f"where({getattr(self.func, '__name__', 'func')})"
+
+def _as_predicate(p) -> Predicate:
+    return p if isinstance(p, Predicate) else Where(p)
+
+def by_restaurant(rest_id: str) -> Predicate:
+    return Eq("rest_id", rest_id)
+
+def by_zone(zone: str) -> Predicate:
+    return Eq("zone", zone)
+
+def by_price_range(min_price: int, max_price: int) -> Predicate:
+    return Range("price", min_price, max_price)
+
+def by_time_range(start: Timestamp, end: Timestamp) -> Predicate:
+    """Заказы с start <= ts <= end; сравниваются разобранные при загрузке эпохи"""
+    return Range("epoch", to_epoch(start), to_epoch(end))
+
+def by_status(status: str) -> Predicate:
+    return Eq("status", status)
+
+def by_total_range(min_total: int, max_total: int) -> Predicate:
+    return Range("total", min_total, max_total)
+
+def orders_in_zone(restaurants: Iterable, zone: str) -> Predicate:
+    """Предикат по заказам: ресторан заказа находится в зоне"""
+    return In("rest_id", (r.id for r in restaurants if r.zone == zone))
+
+def select_by_restaurant(orders: Tuple[Order, ...], rest_id: str) -> Tuple[Order, ...]:
+    if isinstance(orders, OrderStore):
+        return orders.by_rest_id(rest_id)
+    return tuple(filter(by_restaurant(rest_id), orders))
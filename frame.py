@@ -0,0 +1,181 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import compress, repeat
+from typing import Dict, Optional, Sequence, Tuple, Union
+from .categorical import MISSING_CODE, STATUS_VALUES, Categories, code_type, group_sum, missing_code
+from .domain import Order, Restaurant
+from .timeindex import to_epoch
+
+Mask = bytearray
+
+
+class OrderFrame:
+    """Колоночное представление заказов.
+
+    Каждая колонка хранится в компактном array: total (int64), ts (epoch,
+    int64), status и zone (категориальные коды, 1 байт, шире при более
+    чем 255 значениях) и индекс ресторана (uint32). Словари кодов свои
+    у каждого фрейма (statuses, zones). Агрегаты считаются встроенными
+    функциями над массивами, а фильтры возвращают байтовые маски, которые
+    объединяются побитовыми операциями. Маски равенства строятся по байтам
+    колонки через bytes.translate, диапазонные - по отсортированной
+    перестановке колонки (строится один раз при первом запросе).
+    """
+
+    __slots__ = ("orders", "total", "ts", "status", "rest", "zone", "statuses", "rest_ids", "zones", "_sorted")
+
+    def __init__(self, orders: Sequence[Order], statuses: Tuple[str, ...], rest_ids: Tuple[str, ...],
+                 total: array, ts: array, status: array, rest: array, zone: Optional[array] = None,
+                 zones: Tuple[str, ...] = ()):
+        self.orders = orders
+        self.statuses = statuses
+        self.rest_ids = rest_ids
+        self.total = total
+        self.ts = ts
+        self.status = status
+        self.rest = rest
+        self.zone = zone if zone is not None else array('B', bytes([MISSING_CODE]) * len(total))
+        self.zones = zones
+        self._sorted: Dict[str, Tuple[array, array]] = {}
+
+    @classmethod
+    def from_orders(cls, orders: Sequence[Order],
+                    restaurants: Optional[Tuple[Restaurant, ...]] = None) -> 'OrderFrame':
+        zones = Categories("zone")
+        statuses = Categories("status", STATUS_VALUES)
+        rest_codes: Dict[str, int] = {}
+        rest_zones = []
+        for r in restaurants or ():
+            if r.id not in rest_codes:
+                rest_codes[r.id] = len(rest_codes)
+                rest_zones.append(zones.code(r.zone))
+
+        total = array('q', [o.total for o in orders])
+        ts = array('q', [o.epoch for o in orders])
+        status = statuses.encode(o.status for o in orders)
+        rest = array('I', [rest_codes.setdefault(o.rest_id, len(rest_codes)) for o in orders])
+        # Зона заказа - зона его ресторана; неизвестным ресторанам достается код отсутствия
+        typecode = code_type(len(zones))
+        rest_zones.extend([missing_code(typecode)] * (len(rest_codes) - len(rest_zones)))
+        zone = array(typecode, [rest_zones[r] for r in rest])
+        return cls(orders, statuses.values, tuple(rest_codes), total, ts, status, rest, zone, zones.values)
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+    # Агрегаты
+    def revenue(self, mask: Optional[Mask] = None) -> int:
+        if mask is None:
+            return sum(self.total)
+        return sum(compress(self.total, mask))
+
+    def status_counts(self, mask: Optional[Mask] = None) -> Dict[str, int]:
+        codes = self.status
+        if mask is not None:
+            codes = array(codes.typecode, compress(codes, mask))
+        if codes.itemsize == 1:
+            raw = codes.tobytes()
+            return {s: raw.count(i) for i, s in enumerate(self.statuses)}
+        return {s: codes.count(i) for i, s in enumerate(self.statuses)}
+
+    def revenue_by_zone(self, mask: Optional[Mask] = None) -> Dict[str, int]:
+        """Выручка по зонам: группировка по коду зоны"""
+        zone, total = self.zone, self.total
+        if mask is not None:
+            zone, total = compress(zone, mask), compress(total, mask)
+        sums = group_sum(zone, total, len(self.zones))
+        return {self.zones[code]: s for code, s in enumerate(sums) if s}
+
+    # Маски
+    def price_mask(self, min_total: int, max_total: int) -> Mask:
+        return self._range_mask("total", min_total, max_total)
+
+    def time_mask(self, start: Union[str, int], end: Union[str, int]) -> Mask:
+        return self._range_mask("ts", to_epoch(start), to_epoch(end))
+
+    def status_mask(self, status: str) -> Mask:
+        return _code_mask(self.status, _index(self.statuses, status))
+
+    def zone_mask(self, zone: str) -> Mask:
+        return _code_mask(self.zone, _index(self.zones, zone))
+
+    def restaurant_mask(self, rest_id: str) -> Mask:
+        if rest_id not in self.rest_ids:
+            return bytearray(len(self))
+        return _code_mask(self.rest, self.rest_ids.index(rest_id))
+
+    def select(self, mask: Mask) -> Tuple[Order, ...]:
+        return tuple(compress(self.orders, mask))
+
+    def _range_mask(self, name: str, lo: int, hi: int) -> Mask:
+        """Маска lo <= x <= hi: бинарный поиск по отсортированной колонке.
+
+        Единицы расставляются по срезу перестановки через map без цикла
+        байткода; если совпадений больше половины, проставляются нули
+        в дополнении.
+        """
+        ordered = self._sorted.get(name)
+        if ordered is None:
+            column = getattr(self, name)
+            perm = array('I', sorted(range(len(column)), key=column.__getitem__))
+            ordered = self._sorted[name] = (perm, array(column.typecode, [column[i] for i in perm]))
+        perm, keys = ordered
+        n = len(perm)
+        i = bisect_left(keys, lo)
+        j = max(i, bisect_right(keys, hi))
+        if j - i <= n // 2:
+            mask = bytearray(n)
+            _scatter(mask, perm[i:j], 1)
+        else:
+            mask = bytearray(b"\1") * n
+            _scatter(mask, perm[:i], 0)
+            _scatter(mask, perm[j:], 0)
+        return mask
+
+
+def _index(values: Tuple[str, ...], value: str) -> Optional[int]:
+    return values.index(value) if value in values else None
+
+
+def _scatter(mask: Mask, positions: array, value: int) -> None:
+    deque(map(mask.__setitem__, positions, repeat(value)), maxlen=0)
+
+
+def _code_mask(column: array, code: Optional[int]) -> Mask:
+    """Маска column == code для колонки любой ширины.
+
+    Каждый байт элемента сравнивается отдельно: срез raw[k::width] дает
+    k-й байт всех элементов, таблица перекодировки переводит искомый байт
+    в 1, остальные в 0, а полосы объединяются побитовым И.
+    """
+    n = len(column)
+    if code is None or not n:
+        return bytearray(n)
+    width = column.itemsize
+    raw = column.tobytes()
+    result = -1
+    for k, byte in enumerate(code.to_bytes(width, sys.byteorder)):
+        table = bytearray(256)
+        table[byte] = 1
+        result &= int.from_bytes(raw[k::width].translate(table), "little")
+    return bytearray(result.to_bytes(n, "little"))
+
+
+def mask_and(a: Mask, b: Mask) -> Mask:
+    """Побитовое И двух масок одной длины"""
+    n = len(a)
+    return bytearray((int.from_bytes(a, "little") & int.from_bytes(b, "little")).to_bytes(n, "little"))
+
+
+def mask_or(a: Mask, b: Mask) -> Mask:
+    n = len(a)
+    return bytearray((int.from_bytes(a, "little") | int.from_bytes(b, "little")).to_bytes(n, "little"))
+
+
+def mask_not(a: Mask) -> Mask:
+    return a.translate(_INVERT)
+
+
+_INVERT = bytes([1, 0]) + bytes(254)
@@ -1,5 +1,6 @@
 from typing import Generic, TypeVar, Callable, Any
 from dataclasses import dataclass
+from .store import OrderStore
 
 T = TypeVar('T')
 E = TypeVar('E')
@@ -62,18 +63,23 @@ class Left(Either[E, T]):
 
 # Функциональные операции
 def safe_order(orders: tuple, oid: str) -> Maybe:
-    order = next((o for o in orders if o.id == oid), None)
+    if isinstance(orders, OrderStore):
+        order = orders.get(oid)
+    else:
+        order = next((o for o in orders if o.id == oid), None)
     return Maybe.just(order) if order else Maybe.nothing()
 
 
 def validate_order(order, rules: tuple, couriers: tuple) -> Either:
-    if order.total > 10000:  # Пример правила
-        return Either.left({"error": "Order too expensive"})
-    return Either.right(order)
-
-
-def assign_courier(order, courier) -> Either:
-    # Упрощенная проверка - в реальном приложении была бы сложная логика
-    if order.total > 5000 and courier.vehicle == "bike":
-        return Either.left({"error": "Heavy order cannot be delivered by bike"})
-    return Either.right(order)
\ No newline at end of file
+    # Правила компилируются один раз на кортеж; без правил - лимит суммы по умолчанию
+    from .rules import DEFAULT_ORDER_RULESET, compile_rules
+    if not rules:
+        return DEFAULT_ORDER_RULESET.check_order(order)
+    return compile_rules(rules).validate(order, couriers)
+
+
+def assign_courier(order, courier, rules: tuple = ()) -> Either:
+    # Без правил - запрет тяжелых заказов для велосипеда
+    from .rules import DEFAULT_PAIR_RULESET, compile_rules
+    ruleset = compile_rules(rules) if rules else DEFAULT_PAIR_RULESET
+    return ruleset.check_pair(order, courier)
\ No newline at end of file
@@ -0,0 +1,227 @@
+import random
+from itertools import chain
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+from .domain import Slot
+from .ftypes import Either
+from .persistent import PMap
+from .timeindex import DAY, Timestamp, day_ranges, is_time_of_day, slot_intervals, time_of_day, to_epoch
+
+
+class _Node:
+    __slots__ = ("start", "end", "value", "priority", "left", "right", "max_end", "size")
+
+    def __init__(self, start: int, end: int, value: Any, priority: float,
+                 left: Optional['_Node'], right: Optional['_Node']):
+        self.start = start
+        self.end = end
+        self.value = value
+        self.priority = priority
+        self.left = left
+        self.right = right
+        # Максимальный конец в поддереве: позволяет отсекать поддеревья без пересечений
+        self.max_end = max(end, left.max_end if left else end, right.max_end if right else end)
+        self.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+
+
+def _with(node: _Node, left: Optional[_Node], right: Optional[_Node]) -> _Node:
+    return _Node(node.start, node.end, node.value, node.priority, left, right)
+
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    # Копируется только путь от корня до места вставки
+    if node is None:
+        return new
+    if (new.start, new.end) < (node.start, node.end):
+        left = _insert(node.left, new)
+        if left.priority > node.priority:
+            return _with(left, left.left, _with(node, left.right, node.right))
+        return _with(node, left, node.right)
+    right = _insert(node.right, new)
+    if right.priority > node.priority:
+        return _with(right, _with(node, node.left, right.left), right.right)
+    return _with(node, node.left, right)
+
+
+def _overlapping(node: Optional[_Node], lo: int, hi: int, out: List[Any]) -> None:
+    # Интервалы полуоткрытые: [start, end) пересекает [lo, hi), если start < hi и end > lo
+    while node is not None and node.max_end > lo:
+        _overlapping(node.left, lo, hi, out)
+        if node.start >= hi:
+            return
+        if node.end > lo:
+            out.append(node.value)
+        node = node.right
+
+
+def _iter(node: Optional[_Node]) -> Iterator[Any]:
+    stack = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node.value
+        node = node.right
+
+
+class IntervalTree:
+    """Персистентное дерево интервалов (декартово дерево с max_end в узлах).
+
+    Интервалы полуоткрытые [start, end): соседние слоты 10:00-12:00 и
+    12:00-14:00 не пересекаются. Вставка - O(log n) с копированием пути;
+    запросы точки и окна отсекают поддеревья по max_end и спускаются только
+    к найденным интервалам. Результаты идут в порядке начала.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, items: Any = ()):
+        tree = IntervalTree._make(None)
+        for start, end, value in items:
+            tree = tree.insert(start, end, value)
+        self._root = tree._root
+
+    @classmethod
+    def _make(cls, root: Optional[_Node]) -> 'IntervalTree':
+        tree = cls.__new__(cls)
+        tree._root = root
+        return tree
+
+    def __len__(self) -> int:
+        return self._root.size if self._root else 0
+
+    def __iter__(self) -> Iterator[Any]:
+        return _iter(self._root)
+
+    def insert(self, start: int, end: int, value: Any) -> 'IntervalTree':
+        return IntervalTree._make(_insert(self._root, _Node(start, end, value, random.random(), None, None)))
+
+    def overlapping(self, lo: int, hi: int) -> Tuple[Any, ...]:
+        """Значения интервалов, пересекающих окно [lo, hi)"""
+        out: List[Any] = []
+        _overlapping(self._root, lo, hi, out)
+        return tuple(out)
+
+    def stab(self, t: int) -> Tuple[Any, ...]:
+        """Значения интервалов, содержащих точку t"""
+        return self.overlapping(t, t + 1)
+
+
+_EMPTY_TREE = IntervalTree()
+# Деревья курьера: ежедневные слоты, слоты с датами и они же по времени суток
+_EMPTY_COURIER = (_EMPTY_TREE, _EMPTY_TREE, _EMPTY_TREE)
+
+
+class SlotIndex:
+    """Индекс слотов курьеров: общие деревья интервалов и деревья каждого курьера.
+
+    Ежедневные слоты 'HH:MM' лежат на оси времени суток (ночной слот
+    "22:00"-"02:00" делится в полночь, как в assignment), слоты с датами -
+    в секундах Unix, в отдельных деревьях. Момент или окно с датой
+    проецируется на время суток для ежедневных слотов, поэтому они
+    находятся запросами с датой и конфликтуют со слотами с датами.
+
+    Как и остальные коллекции сервиса, неизменяем: add возвращает новую
+    версию, разделяющую структуру со старой.
+    """
+
+    __slots__ = ("_daily", "_dated", "_by_courier", "_count")
+
+    def __init__(self, slots: Any = ()):
+        index = SlotIndex._make(_EMPTY_TREE, _EMPTY_TREE, PMap(), 0)
+        for slot in slots:
+            index = index.add(slot)
+        self._daily = index._daily
+        self._dated = index._dated
+        self._by_courier = index._by_courier
+        self._count = index._count
+
+    @classmethod
+    def _make(cls, daily: IntervalTree, dated: IntervalTree, by_courier: PMap, count: int) -> 'SlotIndex':
+        index = cls.__new__(cls)
+        index._daily = daily
+        index._dated = dated
+        index._by_courier = by_courier
+        index._count = count
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, slot: Slot) -> 'SlotIndex':
+        """Новая версия со слотом; пересечения проверяет вызывающий (conflicts/check_slot).
+
+        ValueError для слота с датами, который кончается не позже начала.
+        """
+        daily, ranges = slot_intervals(slot)
+        own_daily, own_dated, own_dated_tod = self._by_courier.get(slot.courier_id, _EMPTY_COURIER)
+        all_daily, all_dated = self._daily, self._dated
+        if daily:
+            all_daily = _insert_all(all_daily, ranges, slot)
+            own_daily = _insert_all(own_daily, ranges, slot)
+        else:
+            all_dated = _insert_all(all_dated, ranges, slot)
+            own_dated = _insert_all(own_dated, ranges, slot)
+            own_dated_tod = _insert_all(own_dated_tod, day_ranges(*ranges[0]), slot)
+        by_courier = self._by_courier.set(slot.courier_id, (own_daily, own_dated, own_dated_tod))
+        return SlotIndex._make(all_daily, all_dated, by_courier, self._count + 1)
+
+    def conflicts(self, slot: Slot) -> Tuple[Slot, ...]:
+        """Слоты того же курьера, пересекающиеся с slot (ежедневные - в любой день)"""
+        daily, ranges = slot_intervals(slot)
+        own_daily, own_dated, own_dated_tod = self._by_courier.get(slot.courier_id, _EMPTY_COURIER)
+        if daily:
+            found = chain(_overlapping_any(own_daily, ranges), _overlapping_any(own_dated_tod, ranges))
+        else:
+            found = chain(_overlapping_any(own_dated, ranges), _overlapping_any(own_daily, day_ranges(*ranges[0])))
+        return tuple(dict.fromkeys(found))
+
+    def at(self, t: Timestamp) -> Tuple[Slot, ...]:
+        """Слоты, покрывающие момент t; для 'HH:MM' - только ежедневные"""
+        if is_time_of_day(t):
+            return tuple(dict.fromkeys(self._daily.stab(time_of_day(t))))
+        t = to_epoch(t)
+        return tuple(dict.fromkeys(chain(self._dated.stab(t), self._daily.stab(t % DAY))))
+
+    def available_at(self, t: Timestamp) -> Tuple[str, ...]:
+        """Курьеры, у которых есть слот, покрывающий момент t"""
+        return tuple(dict.fromkeys(s.courier_id for s in self.at(t)))
+
+    def overlapping(self, start: Timestamp, end: Timestamp) -> Tuple[Slot, ...]:
+        """Слоты, пересекающиеся с окном [start, end); для 'HH:MM' - только ежедневные"""
+        if is_time_of_day(start) and is_time_of_day(end):
+            lo, hi = time_of_day(start), time_of_day(end)
+            if hi == lo:
+                return ()
+            return tuple(dict.fromkeys(_overlapping_any(self._daily, day_ranges(lo, hi if hi > lo else hi + DAY))))
+        lo, hi = to_epoch(start), to_epoch(end)
+        if hi <= lo:
+            return ()
+        found = chain(self._dated.overlapping(lo, hi), _overlapping_any(self._daily, day_ranges(lo, hi)))
+        return tuple(dict.fromkeys(found))
+
+    def for_courier(self, courier_id: str) -> Tuple[Slot, ...]:
+        own_daily, own_dated, _ = self._by_courier.get(courier_id, _EMPTY_COURIER)
+        return tuple(dict.fromkeys(chain(own_daily, own_dated)))
+
+
+def _insert_all(tree: IntervalTree, ranges: Iterable[Tuple[int, int]], value: Any) -> IntervalTree:
+    for lo, hi in ranges:
+        tree = tree.insert(lo, hi, value)
+    return tree
+
+
+def _overlapping_any(tree: IntervalTree, ranges: Iterable[Tuple[int, int]]) -> Iterator[Any]:
+    return chain.from_iterable(tree.overlapping(lo, hi) for lo, hi in ranges)
+
+
+def check_slot(index: SlotIndex, slot: Slot) -> Either:
+    """Right(slot), если слот не пересекается со слотами курьера, иначе Left с конфликтами"""
+    try:
+        conflicts = index.conflicts(slot)
+    except ValueError as e:
+        return Either.left({"error": str(e)})
+    if conflicts:
+        return Either.left({"error": f"Slot {slot.id} overlaps existing slots",
+                            "conflicts": tuple(s.id for s in conflicts)})
+    return Either.right(slot)
@@ -0,0 +1,178 @@
+import heapq
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .filters import _as_predicate
+from .planner import plan_query
+from .store import OrderStore
+
+FILTER = "filter"
+MAP = "map"
+TAKE = "take"
+SKIP = "skip"
+SORT = "sort"
+GROUP = "group"
+
+
+def _compose(f: Callable, g: Callable) -> Callable:
+    return lambda x: g(f(x))
+
+
+def _filter_map(items: Iterable, predicate: Callable, func: Callable) -> Iterator:
+    return (func(x) for x in items if predicate(x))
+
+
+def _grouped(items: Iterable, key: Callable) -> Iterator[Tuple[Any, Tuple]]:
+    # Группировка блокирующая, но выполняется только при первом next()
+    groups: Dict[Any, List] = {}
+    for item in items:
+        k = key(item)
+        bucket = groups.get(k)
+        if bucket is None:
+            groups[k] = [item]
+        else:
+            bucket.append(item)
+    for k, bucket in groups.items():
+        yield k, tuple(bucket)
+
+
+def _sorted(items: Iterable, key: Optional[Callable], reverse: bool) -> Iterator:
+    yield from sorted(items, key=key, reverse=reverse)
+
+
+def _top(items: Iterable, n: int, key: Optional[Callable], reverse: bool) -> Iterator:
+    # sort + take: частичная сортировка кучей за O(m log n) вместо полной
+    yield from (heapq.nlargest if reverse else heapq.nsmallest)(n, items, key=key)
+
+
+class Query:
+    """Ленивый запрос над коллекцией заказов.
+
+    filter/map/take/skip/sort_by/group_by только дописывают стадию в план и
+    возвращают новый Query. Соседние стадии сливаются при построении:
+    фильтры - в одну конъюнкцию, map - в одну функцию, take - в минимум.
+    Данные читаются одним проходом при итерации или в терминальных методах
+    (to_tuple, first, count, ...); take останавливает проход досрочно.
+    Ведущий фильтр по OrderStore выполняется планировщиком через индексы;
+    порядок строк при этом тот же, что у полного прохода по источнику.
+    """
+
+    __slots__ = ("_source", "_stages")
+
+    def __init__(self, source: Iterable, stages: Tuple[Tuple[str, Any], ...] = ()):
+        self._source = source
+        self._stages = stages
+
+    def _then(self, kind: str, arg: Any) -> 'Query':
+        stages = self._stages
+        if stages:
+            last_kind, last = stages[-1]
+            if kind == last_kind == FILTER:
+                return Query(self._source, stages[:-1] + ((FILTER, last & arg),))
+            if kind == last_kind == MAP:
+                return Query(self._source, stages[:-1] + ((MAP, _compose(last, arg)),))
+            if kind == last_kind == TAKE:
+                return Query(self._source, stages[:-1] + ((TAKE, min(last, arg)),))
+            if kind == last_kind == SKIP:
+                return Query(self._source, stages[:-1] + ((SKIP, last + arg),))
+        return Query(self._source, stages + ((kind, arg),))
+
+    def filter(self, predicate: Callable[[Any], bool]) -> 'Query':
+        return self._then(FILTER, _as_predicate(predicate))
+
+    def map(self, func: Callable[[Any], Any]) -> 'Query':
+        return self._then(MAP, func)
+
+    def take(self, n: int) -> 'Query':
+        if n < 0:
+            raise ValueError(f"take expects a non-negative count, got {n}")
+        return self._then(TAKE, n)
+
+    def skip(self, n: int) -> 'Query':
+        if n < 0:
+            raise ValueError(f"skip expects a non-negative count, got {n}")
+        return self._then(SKIP, n)
+
+    def sort_by(self, key: Optional[Callable] = None, reverse: bool = False) -> 'Query':
+        return self._then(SORT, (key, reverse))
+
+    def group_by(self, key: Callable[[Any], Any]) -> 'Query':
+        """Стадия группировки: дальше по плану идут пары (ключ, кортеж элементов)"""
+        return self._then(GROUP, key)
+
+    def __iter__(self) -> Iterator:
+        stages = self._stages
+        it: Iterable = self._source
+        i = 0
+        if stages and stages[0][0] == FILTER and isinstance(it, OrderStore):
+            it = plan_query(it, stages[0][1]).rows()
+            i = 1
+        while i < len(stages):
+            kind, arg = stages[i]
+            following = stages[i + 1] if i + 1 < len(stages) else (None, None)
+            if kind == FILTER and following[0] == MAP:
+                # filter + map - один генератор без промежуточного итератора
+                it = _filter_map(it, arg, following[1])
+                i += 2
+                continue
+            if kind == SORT and following[0] == TAKE:
+                it = _top(it, following[1], *arg)
+                i += 2
+                continue
+            if kind == FILTER:
+                it = filter(arg, it)
+            elif kind == MAP:
+                it = map(arg, it)
+            elif kind == TAKE:
+                it = islice(it, arg)
+            elif kind == SKIP:
+                it = islice(it, arg, None)
+            elif kind == SORT:
+                it = _sorted(it, *arg)
+            else:
+                it = _grouped(it, arg)
+            i += 1
+        return iter(it)
+
+    def explain(self) -> str:
+        stages = self._stages
+        if stages and stages[0][0] == FILTER and isinstance(self._source, OrderStore):
+            parts = [plan_query(self._source, stages[0][1]).explain()]
+            stages = stages[1:]
+        else:
+            parts = [f"Source({type(self._source).__name__})"]
+        for kind, arg in stages:
+            if kind == FILTER:
+                parts.append(f"Filter({arg!r})")
+            elif kind in (TAKE, SKIP):
+                parts.append(f"{kind.capitalize()}({arg})")
+            elif kind == SORT:
+                parts.append(f"Sort(reverse={arg[1]})")
+            else:
+                parts.append({MAP: "Map", GROUP: "GroupBy"}[kind])
+        return " -> ".join(parts)
+
+    def to_tuple(self) -> Tuple:
+        return tuple(self)
+
+    def to_dict(self) -> Dict:
+        """Для запросов, дающих пары (ключ, значение), например после group_by"""
+        return dict(self)
+
+    def first(self, default: Any = None) -> Any:
+        return next(iter(self.take(1)), default)
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def sum(self, key: Callable[[Any], Any] = lambda x: x) -> Any:
+        return sum(map(key, self))
+
+    def any(self) -> bool:
+        return self.first(_NOTHING) is not _NOTHING
+
+
+_NOTHING = object()
+
+
+def query(source: Iterable) -> Query:
+    return Query(source)
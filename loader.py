@@ -0,0 +1,175 @@
+import json
+import re
+from os import PathLike
+from functools import partial
+from typing import Any, Callable, Dict, IO, Iterator, Optional, Tuple, Union
+from .categorical import Vocabulary
+from .domain import Restaurant, MenuItem, Order, Courier, Slot
+from .metrics import timed
+
+SECTIONS = ("restaurants", "menu_items", "orders", "couriers", "slots")
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def make_order(o: Dict[str, Any], vocab: Optional[Vocabulary] = None) -> Order:
+    # Преобразуем items из list в tuple для хеширования
+    order = Order(
+        id=o['id'],
+        rest_id=o['rest_id'],
+        items=tuple(tuple(item) for item in o['items']),
+        total=o['total'],
+        ts=o['ts'],
+        status=(vocab or _VOCAB).statuses.intern(o['status'])
+    )
+    # Время разбирается один раз при загрузке; фильтры и индексы берут order.epoch
+    _ = order.epoch
+    return order
+
+
+def make_restaurant(r: Dict[str, Any], vocab: Optional[Vocabulary] = None) -> Restaurant:
+    return Restaurant(**{**r, 'zone': (vocab or _VOCAB).zones.intern(r['zone'])})
+
+
+def make_courier(c: Dict[str, Any], vocab: Optional[Vocabulary] = None) -> Courier:
+    # Категориальные поля интернируются: равные значения - один объект строки
+    vocab = vocab or _VOCAB
+    return Courier(**{**c, 'zone': vocab.zones.intern(c['zone']), 'vehicle': vocab.vehicles.intern(c['vehicle'])})
+
+
+def make_builders(vocab: Vocabulary) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """Конструкторы записей по разделам seed, интернирующие в словари vocab"""
+    return {
+        "restaurants": partial(make_restaurant, vocab=vocab),
+        "menu_items": lambda m: MenuItem(**m),
+        "orders": partial(make_order, vocab=vocab),
+        "couriers": partial(make_courier, vocab=vocab),
+        "slots": lambda s: Slot(**s),
+    }
+
+
+# Словари для одиночных записей вне загрузки датасета (события, тесты)
+_VOCAB = Vocabulary()
+BUILDERS = make_builders(_VOCAB)
+
+
+class _Reader:
+    """Скользящее окно над текстовым потоком для инкрементального разбора JSON"""
+
+    def __init__(self, stream: IO[str], chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Отбрасываем уже разобранную часть, чтобы буфер не рос с размером файла
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the buffer")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # Число на границе чанка может быть прочитано не полностью
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def _iter_stream(stream: IO[str], batch_size: int, chunk_size: int,
+                 builders: Dict[str, Callable]) -> Iterator[Tuple[str, tuple]]:
+    reader = _Reader(stream, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        build = builders.get(key)
+        if build is None or reader.peek() != "[":
+            reader.value()  # Неизвестный раздел пропускаем целиком
+        else:
+            reader.expect("[")
+            batch = []
+            if reader.peek() != "]":
+                while True:
+                    batch.append(build(reader.value()))
+                    if len(batch) >= batch_size:
+                        yield key, tuple(batch)
+                        batch = []
+                    if reader.peek() != ",":
+                        break
+                    reader.pos += 1
+            reader.expect("]")
+            if batch:
+                yield key, tuple(batch)
+        if reader.peek() != ",":
+            break
+        reader.pos += 1
+    reader.expect("}")
+
+
+def iter_seed_batches(source: Union[str, PathLike, IO[str], Dict[str, Any]], batch_size: int = 1000,
+                      chunk_size: int = _CHUNK_SIZE,
+                      vocab: Optional[Vocabulary] = None) -> Iterator[Tuple[str, tuple]]:
+    """Потоково читает seed и отдает пары (раздел, пачка доменных объектов).
+
+    source - путь к файлу, открытый текстовый поток или уже разобранный dict.
+    В памяти одновременно находятся только текущий чанк и одна пачка.
+    Категориальные значения интернируются в vocab; по умолчанию у каждого
+    чтения свои словари.
+    """
+    builders = make_builders(vocab or Vocabulary())
+    if isinstance(source, dict):
+        for key in SECTIONS:
+            records = source.get(key, [])
+            build = builders[key]
+            for i in range(0, len(records), batch_size):
+                yield key, tuple(build(r) for r in records[i:i + batch_size])
+    elif hasattr(source, "read"):
+        yield from _iter_stream(source, batch_size, chunk_size, builders)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from _iter_stream(f, batch_size, chunk_size, builders)
+
+
+def collect_seed(batches: Iterator[Tuple[str, tuple]]) -> tuple:
+    """Собирает пачки в кортеж (restaurants, menu_items, orders, couriers, slots)"""
+    sections: Dict[str, list] = {key: [] for key in SECTIONS}
+    for key, batch in batches:
+        sections[key].extend(batch)
+    return tuple(tuple(sections[key]) for key in SECTIONS)
+
+
+@timed("loader.load_seed_file")
+def load_seed_file(path: Union[str, PathLike], batch_size: int = 1000) -> tuple:
+    return collect_seed(iter_seed_batches(path, batch_size))
@@ -3,7 +3,16 @@ import json
 from pathlib import Path
 import sys
 import os
-from functools import reduce
+import contextlib
+import importlib
+import statistics
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import Tuple, Dict, Any
+import hashlib
 import time
 
 # set_page_config ДОЛЖЕН быть первым вызовом Streamlit
@@ -16,13 +25,38 @@ st.set_page_config(
 # Добавляем путь к модулям
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Определяем базовые классы на случай проблем с импортом
-from dataclasses import dataclass
-from typing import Tuple, Dict, Any
-import hashlib
+# Пакет целиком (модель маршрутов, замеры) доступен, если виден его родительский каталог
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-@dataclass(frozen=True)
+def _core_module(name: str):
+    try:
+        return importlib.import_module(f"{Path(__file__).resolve().parent.name}.{name}")
+    except ImportError:
+        return None
+
+
+core_memo = _core_module("memo")
+core_metrics = _core_module("metrics")
+core_snapshot = _core_module("snapshot")
+core_filters = _core_module("filters")
+core_planner = _core_module("planner")
+core_store = _core_module("store")
+core_persistent = _core_module("persistent")
+core_lazy = _core_module("lazy")
+
+
+def span(name: str):
+    """Замер блока в реестр метрик пакета; без пакета - пустой контекст"""
+    return core_metrics.span(name) if core_metrics is not None else contextlib.nullcontext()
+
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+# Определяем базовые классы на случай проблем с импортом
+@dataclass(frozen=True, slots=True)
 class Restaurant:
     id: str
     name: str
@@ -31,6 +65,7 @@ class Restaurant:
 
 @dataclass(frozen=True)
 class Order:
+    __slots__ = ("id", "rest_id", "items", "total", "ts", "status", "_hash", "_epoch")
     id: str
     rest_id: str
     items: Tuple[Tuple[str, int], ...]  # Для хеширования используем tuple вместо list
@@ -38,23 +73,54 @@ class Order:
     ts: str
     status: str
 
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", None)
+        object.__setattr__(self, "_epoch", None)
+
+    @property
+    def epoch(self) -> int:
+        # Время заказа в секундах Unix; строка ts разбирается один раз
+        e = self._epoch
+        if e is None:
+            e = (datetime.fromisoformat(self.ts) - _EPOCH) // _SECOND
+            object.__setattr__(self, "_epoch", e)
+        return e
+
     def __hash__(self):
-        # Создаем хеш на основе неизменяемых полей
-        return hash((self.id, self.rest_id, self.items, self.total, self.ts, self.status))
+        # Хеш по неизменяемым полям считается один раз и хранится в слоте _hash
+        h = self._hash
+        if h is None:
+            h = hash((self.id, self.rest_id, self.items, self.total, self.ts, self.status))
+            object.__setattr__(self, "_hash", h)
+        return h
+
+    def __reduce__(self):
+        return Order, (self.id, self.rest_id, self.items, self.total, self.ts, self.status)
 
 
 @dataclass(frozen=True)
 class Courier:
+    __slots__ = ("id", "name", "vehicle", "zone", "_hash")
     id: str
     name: str
     vehicle: str
     zone: str
 
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", None)
+
     def __hash__(self):
-        return hash((self.id, self.name, self.vehicle, self.zone))
+        h = self._hash
+        if h is None:
+            h = hash((self.id, self.name, self.vehicle, self.zone))
+            object.__setattr__(self, "_hash", h)
+        return h
 
+    def __reduce__(self):
+        return Courier, (self.id, self.name, self.vehicle, self.zone)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Slot:
     id: str
     courier_id: str
@@ -62,7 +128,7 @@ class Slot:
     end: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Route:
     id: str
     courier_id: str
@@ -73,25 +139,72 @@ class Route:
 
 # Простой сервис доставки
 class DeliveryService:
-    def __init__(self, orders: Tuple[Order, ...], slots: Tuple[Slot, ...]):
+    def __init__(self, orders: Tuple[Order, ...], slots: Tuple[Slot, ...],
+                 restaurants: Tuple[Restaurant, ...] = (), aggregates: Dict[str, Any] = None):
         self.orders = orders
         self.slots = slots
+        if aggregates is None:
+            zones = {}
+            for r in restaurants:
+                zones.setdefault(r.id, r.zone)
+            aggregates = {"zones": zones, "revenue": 0, "status": Counter(), "rest": Counter(), "zone": Counter()}
+            # Начальный пересчет - один проход с изменением словарей на месте
+            for o in orders:
+                aggregates["revenue"] += o.total
+                aggregates["status"][o.status] += 1
+                aggregates["rest"][o.rest_id] += o.total
+                if o.rest_id in zones:
+                    aggregates["zone"][zones[o.rest_id]] += o.total
+            if core_persistent is not None:
+                # Персистентные словари: новая версия агрегатов не копирует счетчики
+                for key in ("status", "rest", "zone"):
+                    aggregates[key] = core_persistent.PMap(aggregates[key])
+        # Текущие агрегаты: чтение для дашборда не зависит от числа заказов
+        self.aggregates = aggregates
 
     def place_order(self, order: Order) -> 'DeliveryService':
         new_orders = self.orders + (order,)
-        return DeliveryService(new_orders, self.slots)
+        return DeliveryService(new_orders, self.slots, aggregates=_bump_aggregates(self.aggregates, order, 1))
 
     def assign_courier_slot(self, slot: Slot) -> 'DeliveryService':
         new_slots = self.slots + (slot,)
-        return DeliveryService(self.orders, new_slots)
+        return DeliveryService(self.orders, new_slots, aggregates=self.aggregates)
 
     def get_revenue(self) -> int:
-        return reduce(lambda acc, order: acc + order.total, self.orders, 0)
+        return self.aggregates["revenue"]
+
+    def get_status_counts(self) -> Dict[str, int]:
+        return dict(self.aggregates["status"])
+
+    def get_revenue_by_zone(self) -> Dict[str, int]:
+        return dict(self.aggregates["zone"])
 
     def get_orders_by_status(self, status: str) -> Tuple[Order, ...]:
         return tuple(filter(lambda o: o.status == status, self.orders))
 
 
+def _bump_aggregates(aggregates: Dict[str, Any], order: Order, sign: int) -> Dict[str, Any]:
+    """Новая версия агрегатов с учетом заказа; старая версия не меняется"""
+    total = sign * order.total
+    zone = aggregates["zones"].get(order.rest_id)
+    zones = aggregates["zone"]
+    if zone is not None:
+        zones = _bump_count(zones, zone, total)
+    return {"zones": aggregates["zones"], "revenue": aggregates["revenue"] + total,
+            "status": _bump_count(aggregates["status"], order.status, sign),
+            "rest": _bump_count(aggregates["rest"], order.rest_id, total), "zone": zones}
+
+
+def _bump_count(counts, key, delta: int):
+    # PMap.set - O(log32 n) со структурным разделением; без пакета словарь копируется
+    value = counts.get(key, 0) + delta
+    if core_persistent is not None and isinstance(counts, core_persistent.PMap):
+        return counts.set(key, value)
+    counts = dict(counts)
+    counts[key] = value
+    return counts
+
+
 # Функции фильтрации (Лаба 2)
 def by_restaurant(rest_id: str):
     def filter_func(order: Order) -> bool:
@@ -147,9 +260,6 @@ def collect_orders_by_zone(orders: Tuple[Order, ...], restaurants: Tuple[Restaur
 
 
 # Мемоизация (Лаба 3) - исправленная версия
-from functools import lru_cache
-
-
 @lru_cache(maxsize=128)
 def compute_route_cost_cached(route_id: str, order_ids: Tuple[str, ...], courier_ids: Tuple[str, ...]) -> Dict[
     str, Any]:
@@ -173,6 +283,12 @@ def compute_route_cost_cached(route_id: str, order_ids: Tuple[str, ...], courier
     }
 
 
+# Streamlit выполняет модуль заново на каждом перезапуске; register_cache заменяет
+# запись с тем же именем, поэтому в реестре остается один источник
+if core_metrics is not None:
+    core_metrics.register_cache("main.route_cost", compute_route_cost_cached.cache_info)
+
+
 def compute_route_cost(route_id: str, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...]) -> Dict[str, Any]:
     """Обертка для работы с объектами Order и Courier"""
     order_ids = tuple(order.id for order in orders)
@@ -180,26 +296,34 @@ def compute_route_cost(route_id: str, orders: Tuple[Order, ...], couriers: Tuple
     return compute_route_cost_cached(route_id, order_ids, courier_ids)
 
 
-def measure_performance(route_id: str, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...]):
-    """Замер производительности до/после кэширования"""
-    # Очищаем кэш для чистоты эксперимента
-    compute_route_cost_cached.cache_clear()
-
-    # Первый вызов (без кэша)
-    start = time.time()
-    result1 = compute_route_cost(route_id, orders, couriers)
-    time1 = time.time() - start
-
-    # Второй вызов (с кэшем)
-    start = time.time()
-    result2 = compute_route_cost(route_id, orders, couriers)
-    time2 = time.time() - start
-
+def measure_performance(route_id: str, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...],
+                        repeat: int = 3, number: int = 1000):
+    """Холодная и теплая задержка на изолированных экземплярах lru_cache (медианы, сек)"""
+    key = (route_id, tuple(o.id for o in orders), tuple(c.id for c in couriers))
+    compute = compute_route_cost_cached.__wrapped__
+
+    cold = []
+    for _ in range(repeat):
+        cache = lru_cache(maxsize=128)(compute)
+        start = time.perf_counter_ns()
+        result = cache(*key)
+        cold.append(time.perf_counter_ns() - start)
+
+    # Теплые вызовы быстрее разрешения таймера: замеряем пачками по number
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            cache(*key)
+        warm.append((time.perf_counter_ns() - start) / number)
+
+    time1 = statistics.median(cold) / 1e9
+    time2 = statistics.median(warm) / 1e9
     return {
         "first_call_time": time1,
         "cached_call_time": time2,
         "speedup": time1 / time2 if time2 > 0 else 0,
-        "result": result1
+        "result": result
     }
 
 
@@ -284,7 +408,9 @@ def assign_courier(order, courier) -> Either:
 
 def load_seed(data: dict) -> tuple:
     """Загрузка данных из JSON с преобразованием list в tuple"""
-    restaurants = tuple(Restaurant(**r) for r in data.get('restaurants', []))
+    # Категориальные поля интернируются: равные зоны/статусы/транспорт - один объект строки
+    intern = sys.intern
+    restaurants = tuple(Restaurant(r['id'], r['name'], intern(r['zone'])) for r in data.get('restaurants', []))
 
     # Преобразуем items из list в tuple для хеширования
     orders_data = []
@@ -297,20 +423,32 @@ def load_seed(data: dict) -> tuple:
             items=items_tuple,
             total=o['total'],
             ts=o['ts'],
-            status=o['status']
+            status=intern(o['status'])
         )
         orders_data.append(order)
     orders = tuple(orders_data)
 
-    couriers = tuple(Courier(**c) for c in data.get('couriers', []))
+    couriers = tuple(Courier(c['id'], c['name'], intern(c['vehicle']), intern(c['zone']))
+                     for c in data.get('couriers', []))
     slots = tuple(Slot(**s) for s in data.get('slots', []))
     return restaurants, orders, couriers, slots
 
 
-def load_data():
+SEED_PATH = Path(__file__).parent.parent / "data" / "seed.json"
+
+
+def load_data(seed_path: Path = SEED_PATH, digest: str = ""):
     """Load seed data from file"""
     try:
-        seed_path = Path(__file__).parent.parent / "data" / "seed.json"
+        if core_snapshot is not None:
+            # Бинарный снапшот рядом с seed: после первого запуска JSON не разбирается;
+            # снапшот другого содержимого (digest не совпал) пересобирается
+            restaurants, menu_items, orders, couriers, slots = core_snapshot.load_cached(
+                seed_path, digest=digest or None)
+            if core_memo is not None:
+                # Время приготовления блюд нужно модели маршрутов пакета
+                core_memo.register_menu(menu_items)
+            return restaurants, orders, couriers, slots
         with open(seed_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return load_seed(data)
@@ -325,6 +463,94 @@ def load_data():
         )
 
 
+def _seed_fingerprint(seed_path: Path):
+    """Дешевый отпечаток файла: (mtime_ns, size) без чтения содержимого"""
+    try:
+        stat = seed_path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_data(show_spinner=False)
+def _seed_digest(seed_path: str, fingerprint) -> str:
+    """SHA-256 содержимого; пересчитывается только при смене mtime/размера"""
+    if fingerprint is None:
+        return ""
+    digest = hashlib.sha256()
+    with open(seed_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Держим только текущий датасет: данные прошлых версий seed освобождаются
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_dataset(seed_path: str, digest: str) -> Dict[str, Any]:
+    """Открытие датасета; кэшируется по хешу содержимого файла.
+
+    Из снапшота приходят ленивые последовательности: записи собираются при
+    обращении. Сервис и хранилище заказов строит dataset_part для страниц,
+    которым они нужны.
+    """
+    start = time.perf_counter()
+    data = load_data(Path(seed_path), digest)
+    return {
+        "data": data,
+        "digest": digest,
+        "parse_ms": (time.perf_counter() - start) * 1000,
+        "loaded_at": time.time(),
+    }
+
+
+def dataset_part(dataset: Dict[str, Any], name: str) -> Any:
+    """Сервис ("service") или хранилище заказов ("store") датасета.
+
+    Строится при первом обращении страницы и дальше живет вместе с датасетом;
+    время сборки пишется в dataset[name + "_ms"].
+    """
+    if name not in dataset:
+        start = time.perf_counter()
+        restaurants, orders, couriers, slots = dataset["data"]
+        if name == "service":
+            dataset[name] = DeliveryService(tuple(orders), tuple(slots), tuple(restaurants))
+        else:
+            # Индексированные заказы пакета: индекс по времени строится при первом запросе
+            dataset[name] = core_store.OrderStore(orders) if core_store is not None else None
+        dataset[f"{name}_ms"] = (time.perf_counter() - start) * 1000
+    return dataset[name]
+
+
+def get_dataset(seed_path: Path = SEED_PATH) -> Dict[str, Any]:
+    """Данные и сервис, переиспользуемые между перезапусками скрипта Streamlit"""
+    start = time.perf_counter()
+    digest = _seed_digest(str(seed_path), _seed_fingerprint(seed_path))
+    dataset = _load_dataset(str(seed_path), digest)
+
+    metrics = st.session_state.setdefault("load_metrics", {"reruns": 0, "reloads": 0, "loaded_at": None})
+    metrics["reruns"] += 1
+    if metrics["loaded_at"] != dataset["loaded_at"]:
+        metrics["reloads"] += 1
+        metrics["loaded_at"] = dataset["loaded_at"]
+    metrics["parse_ms"] = dataset["parse_ms"]
+    metrics["rerun_ms"] = (time.perf_counter() - start) * 1000
+    return dataset
+
+
+def show_load_metrics(dataset: Dict[str, Any]):
+    metrics = st.session_state.get("load_metrics")
+    if not metrics:
+        return
+    with st.sidebar.expander("⏱️ Data loading"):
+        st.write(f"Load on this rerun: `{metrics['rerun_ms']:.2f} ms`")
+        st.write(f"Last full parse: `{metrics['parse_ms']:.2f} ms`")
+        # Сервис и хранилище собираются при первом открытии страницы, которой они нужны
+        built = [f"{name}: `{dataset[name + '_ms']:.2f} ms`" for name in ("service", "store") if name + "_ms" in dataset]
+        if built:
+            st.write(", ".join(built))
+        st.write(f"Reruns: `{metrics['reruns']}`, reloads: `{metrics['reloads']}`")
+
+
 def show_overview(restaurants, orders, couriers, service):
     st.title("🚚 Food Delivery Optimization System")
 
@@ -351,31 +577,47 @@ def show_overview(restaurants, orders, couriers, service):
     """)
 
 
+DATA_PAGE_ROWS = 50
+
+
+def _head(items, limit: int):
+    """Первые limit строк: ленивый query(...).take(limit) пакета, без пакета - islice"""
+    if core_lazy is not None:
+        return core_lazy.query(items).take(limit)
+    return islice(items, limit)
+
+
 def show_data(restaurants, orders, couriers, slots):
     st.title("📊 Data View")
 
+    # Выводятся только первые строки: take не проходит коллекцию дальше лимита
+    limit = st.number_input("Rows per tab", min_value=1, value=DATA_PAGE_ROWS, step=10)
     tab1, tab2, tab3, tab4 = st.tabs(["🏢 Restaurants", "📦 Orders", "🚴 Couriers", "⏰ Slots"])
 
     with tab1:
         st.subheader("Restaurants")
-        for r in restaurants:
+        st.caption(f"Showing {min(limit, len(restaurants))} of {len(restaurants)}")
+        for r in _head(restaurants, limit):
             st.write(f"**{r.name}** | Zone: `{r.zone}` | ID: `{r.id}`")
 
     with tab2:
         st.subheader("Orders")
-        for o in orders:
+        st.caption(f"Showing {min(limit, len(orders))} of {len(orders)}")
+        for o in _head(orders, limit):
             status_emoji = {"placed": "📝", "assigned": "🚀", "delivered": "✅", "cancelled": "❌"}.get(o.status, "❓")
             st.write(f"{status_emoji} **Order {o.id}** | Restaurant: `{o.rest_id}` | Total: `${o.total / 100:.2f}`")
 
     with tab3:
         st.subheader("Couriers")
-        for c in couriers:
+        st.caption(f"Showing {min(limit, len(couriers))} of {len(couriers)}")
+        for c in _head(couriers, limit):
             vehicle_emoji = {"bike": "🚲", "car": "🚗", "scooter": "🛵"}.get(c.vehicle, "🚶")
             st.write(f"{vehicle_emoji} **{c.name}** | {c.vehicle} | Zone: `{c.zone}`")
 
     with tab4:
         st.subheader("Time Slots")
-        for s in slots:
+        st.caption(f"Showing {min(limit, len(slots))} of {len(slots)}")
+        for s in _head(slots, limit):
             st.write(f"⏰ **Slot {s.id}** | Courier: `{s.courier_id}` | `{s.start}` to `{s.end}`")
 
 
@@ -385,24 +627,58 @@ def show_functional_core(orders, service):
     st.subheader("📈 Order Statistics")
     col1, col2, col3 = st.columns(3)
 
+    # Счетчики ведутся сервисом при каждом изменении заказов
+    status_counts = Counter(service.get_status_counts())
+
     with col1:
-        placed_orders = len([o for o in orders if o.status == "placed"])
-        st.metric("📝 Placed", placed_orders)
+        st.metric("📝 Placed", status_counts["placed"])
 
     with col2:
-        delivered_orders = len([o for o in orders if o.status == "delivered"])
-        st.metric("✅ Delivered", delivered_orders)
+        st.metric("✅ Delivered", status_counts["delivered"])
 
     with col3:
-        assigned_orders = len([o for o in orders if o.status == "assigned"])
-        st.metric("🚀 Assigned", assigned_orders)
+        st.metric("🚀 Assigned", status_counts["assigned"])
 
     st.subheader("💰 Revenue Analysis")
     revenue = service.get_revenue()
     st.write(f"Total Revenue: **${revenue / 100:.2f}**")
 
 
-def show_pipelines(restaurants, orders, couriers):
+def _filter_orders(restaurants, orders, store, selected_restaurant, selected_zone, min_price, max_price, min_time, max_time):
+    """(по ресторану, по зоне, по цене, по времени) для страницы Pipelines"""
+    if core_planner is not None:
+        # Предикаты пакета; run_queries проверяет все три за один проход
+        f = core_filters
+        found = core_planner.run_queries(orders, {
+            "rest": f.by_restaurant(selected_restaurant),
+            "zone": f.orders_in_zone(restaurants, selected_zone),
+            "price": f.by_total_range(min_price * 100, max_price * 100),
+        })
+        rest_orders, zone_orders, price_orders = found["rest"], found["zone"], found["price"]
+        # Окно по времени - бинарный поиск по TimeIndex хранилища вместо прохода
+        try:
+            time_orders = core_planner.run_query(store if store is not None else orders,
+                                                 f.by_time_range(min_time, max_time))
+        except ValueError:
+            st.error("Время должно быть в формате YYYY-MM-DD HH:MM:SS")
+            time_orders = ()
+    else:
+        zone_restaurants = {r.id for r in restaurants if r.zone == selected_zone}
+        lo, hi = ((datetime.fromisoformat(t) - _EPOCH) // _SECOND for t in (min_time, max_time))
+        rest_orders, zone_orders, price_orders, time_orders = [], [], [], []
+        for o in orders:
+            if o.rest_id == selected_restaurant:
+                rest_orders.append(o)
+            if o.rest_id in zone_restaurants:
+                zone_orders.append(o)
+            if min_price <= o.total / 100 <= max_price:
+                price_orders.append(o)
+            if lo <= o.epoch <= hi:
+                time_orders.append(o)
+    return rest_orders, zone_orders, price_orders, time_orders
+
+
+def show_pipelines(restaurants, orders, couriers, store=None):
     st.title("🎯 Фильтры и Конвейеры обработки")
 
     tab1, tab2 = st.tabs(["🔍 Фильтрация данных", "🔄 Рекурсивные операции"])
@@ -429,18 +705,11 @@ def show_pipelines(restaurants, orders, couriers):
             selected_zone = st.selectbox("Выберите зону", list(set(r.zone for r in restaurants)), key="zone_filter")
 
         if st.button("Применить фильтры", type="primary"):
-            # Фильтр по ресторану
-            rest_orders = [o for o in orders if o.rest_id == selected_restaurant]
-
-            # Фильтр по зоне
-            zone_restaurants = [r.id for r in restaurants if r.zone == selected_zone]
-            zone_orders = [o for o in orders if o.rest_id in zone_restaurants]
-
-            # Фильтр по цене
-            price_orders = [o for o in orders if min_price <= o.total / 100 <= max_price]
-
-            # Фильтр по времени
-            time_orders = [o for o in orders if min_time <= o.ts <= max_time]
+            # Замер всей фильтрации, которая реально выполняется: пакетной или запасной
+            with span("main.pipelines.filter"):
+                rest_orders, zone_orders, price_orders, time_orders = _filter_orders(
+                    restaurants, orders, store, selected_restaurant, selected_zone,
+                    min_price, max_price, min_time, max_time)
 
             # Показываем результаты
             st.success("Результаты фильтрации:")
@@ -527,7 +796,9 @@ def show_reports(orders, couriers):
                 sample_orders = orders[:5]
                 sample_couriers = couriers[:3]
 
-                performance = measure_performance("route1", tuple(sample_orders), tuple(sample_couriers))
+                # Замер на отдельном кэше: общий кэш приложения не сбрасывается
+                measure = core_memo.measure_performance if core_memo is not None else measure_performance
+                performance = measure("route1", tuple(sample_orders), tuple(sample_couriers))
 
                 # Показываем анимацию успеха
                 st.balloons()
@@ -535,14 +806,21 @@ def show_reports(orders, couriers):
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    st.metric("Первый вызов (сек)", f"{performance['first_call_time']:.3f}")
-                    st.metric("Кэшированный вызов (сек)", f"{performance['cached_call_time']:.3f}")
+                    st.metric("Холодный вызов (мс)", f"{performance['first_call_time'] * 1e3:.3f}")
+                    st.metric("Кэшированный вызов (мкс)", f"{performance['cached_call_time'] * 1e6:.2f}")
                     st.metric("Ускорение", f"{performance['speedup']:.1f}x")
+                    if "speedup_ci" in performance:
+                        low, high = performance["speedup_ci"]
+                        st.caption(f"95% ДИ ускорения: {low:.1f}x - {high:.1f}x, "
+                                   f"медианы по {performance['cold']['samples']} замерам, "
+                                   f"выбросов: {performance['cold']['outliers']} / {performance['warm']['outliers']}")
 
                 with col2:
                     result = performance['result']
+                    # Модель пакета считает дистанцию в метрах
+                    distance = result['distance'] / 1000 if "sequence" in result else result['distance']
                     st.write("**Результат:**")
-                    st.write(f"- Дистанция: {result['distance']} км")
+                    st.write(f"- Дистанция: {distance} км")
                     st.write(f"- Длительность: {result['duration']} мин")
                     st.write(f"- Стоимость: ${result['cost'] / 100:.2f}")
 
@@ -703,6 +981,37 @@ def show_tests():
     - `ruff` - статический анализатор кода
     """)
 
+def show_metrics():
+    st.title("📈 Metrics")
+    if core_metrics is None:
+        st.warning("Пакет не импортируется: инструментирование недоступно")
+        return
+
+    enabled = st.checkbox("Сбор метрик", value=core_metrics.REGISTRY.enabled)
+    if enabled:
+        core_metrics.enable()
+    else:
+        core_metrics.disable()
+    if st.button("Сбросить"):
+        core_metrics.REGISTRY.reset()
+
+    snap = core_metrics.snapshot()
+    st.subheader("Задержки, мс")
+    if snap["timers"]:
+        st.dataframe([{"name": name, **summary} for name, summary in snap["timers"].items()])
+    else:
+        st.info("Пока нет замеров: включите сбор и откройте другие страницы")
+
+    st.subheader("Кэши")
+    st.dataframe([{"name": name, **ratios} for name, ratios in snap["caches"].items()])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("JSON", core_metrics.REGISTRY.to_json(), file_name="metrics.json")
+    with col2:
+        st.download_button("Text", core_metrics.REGISTRY.to_text(), file_name="metrics.txt")
+
+
 def show_about():
     st.title("ℹ️ About")
     st.write("""
@@ -730,27 +1039,32 @@ def main():
     st.sidebar.title("🍕 Food Delivery")
     menu = st.sidebar.radio("Navigation", [
         "Overview", "Data", "Functional Core", "Pipelines",
-        "Reports", "Tests", "About"
+        "Reports", "Tests", "Metrics", "About"
     ])
 
-    # Load data
-    restaurants, orders, couriers, slots = load_data()
-    service = DeliveryService(orders, slots)
-
-    if menu == "Overview":
-        show_overview(restaurants, orders, couriers, service)
-    elif menu == "Data":
-        show_data(restaurants, orders, couriers, slots)
-    elif menu == "Functional Core":
-        show_functional_core(orders, service)
-    elif menu == "Pipelines":
-        show_pipelines(restaurants, orders, couriers)
-    elif menu == "Reports":
-        show_reports(orders, couriers)
-    elif menu == "Tests":
-        show_tests()
-    elif menu == "About":
-        show_about()
+    # Load data: повторные перезапуски берут данные и сервис из кэша
+    with span("main.load_data"):
+        dataset = get_dataset()
+    restaurants, orders, couriers, slots = dataset["data"]
+
+    with span(f"main.page.{menu}"):
+        if menu == "Overview":
+            show_overview(restaurants, orders, couriers, dataset_part(dataset, "service"))
+        elif menu == "Data":
+            show_data(restaurants, orders, couriers, slots)
+        elif menu == "Functional Core":
+            show_functional_core(orders, dataset_part(dataset, "service"))
+        elif menu == "Pipelines":
+            show_pipelines(restaurants, orders, couriers, dataset_part(dataset, "store"))
+        elif menu == "Reports":
+            show_reports(orders, couriers)
+        elif menu == "Tests":
+            show_tests()
+        elif menu == "Metrics":
+            show_metrics()
+        elif menu == "About":
+            show_about()
+    show_load_metrics(dataset)
 
 
 if __name__ == "__main__":
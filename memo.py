@@ -1,57 +1,109 @@
-from functools import lru_cache
-from typing import Dict, Any, Tuple
-from .domain import Order, Courier
-import time
+from typing import Dict, Any, Iterable, Tuple
+from .domain import Order, Courier, MenuItem
+from .cache import RouteCostCache, cached
+from .routing import CostModel
+from .metrics import register_cache, timed
+from .timing import measure_cold_warm
+from dataclasses import replace
 
+# Общий кэш стоимостей маршрутов; размер и TTL настраиваются через configure_route_cache
+route_cache = RouteCostCache(max_entries=65536)
 
-@lru_cache(maxsize=128)
-def compute_route_cost_cached(route_id: str, order_ids: Tuple[str, ...], courier_ids: Tuple[str, ...]) -> Dict[
-    str, Any]:
-    """Дорогая функция вычисления стоимости маршрута с кэшированием"""
-    time.sleep(0.1)  # Имитация сложных вычислений
+# Модель стоимости: матрица расстояний, эвристики обхода, время приготовления
+cost_model = CostModel()
 
-    total_orders = len(order_ids)
-    total_distance = sum(len(order_id) * 2 for order_id in order_ids)
-    total_duration = sum(len(order_id) for order_id in order_ids) * 3
-    base_cost = total_orders * 100
+# Доля попаданий читается при экспорте метрик; лямбда видит кэш после configure_route_cache
+register_cache("route_cost", lambda: route_cache.stats())
 
-    # Упрощенный расчет стоимости
-    cost = base_cost + total_distance * 2 + total_duration * 5
 
-    return {
-        "distance": total_distance,
-        "duration": total_duration,
-        "cost": cost,
-        "orders_count": total_orders,
-        "route_id": route_id
-    }
+@cached(route_cache)
+def compute_route_cost_cached(route_id: str, order_ids: Tuple[str, ...], courier_ids: Tuple[str, ...],
+                              prep: Tuple[int, ...] = ()) -> Dict[str, Any]:
+    """Стоимость маршрута по модели cost_model с кэшированием.
+
+    prep - время готовности заказов: оно входит в ключ, поэтому смена меню
+    дает новый ключ, а не устаревший результат из памяти или с диска.
+    """
+    return cost_model.route_cost(route_id, order_ids, courier_ids, prep or None)
+
+
+def route_key(route_id: str, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...]) -> Tuple:
+    """Ключ кэша: (route_id, id заказов, id курьеров, время готовности заказов)"""
+    return (route_id, tuple(o.id for o in orders), tuple(c.id for c in couriers), cost_model.prep_for(orders))
+
+
+def register_menu(menu_items: Iterable[MenuItem]) -> None:
+    """Время приготовления позиций меню для текущей модели; вызывается при загрузке данных"""
+    cost_model.register_menu(menu_items)
+
+
+def configure_route_cache(**options) -> RouteCostCache:
+    """Пересоздает общий кэш с новыми параметрами (max_entries, max_bytes, ttl, policy).
 
+    Подключенный дисковый уровень переносится в новый кэш, если не передан
+    другой backing (backing=None отключает его).
+    """
+    global route_cache
+    options.setdefault("backing", route_cache.backing)
+    route_cache = RouteCostCache(**options)
+    compute_route_cost_cached.cache = route_cache
+    compute_route_cost_cached.cache_clear = route_cache.clear
+    compute_route_cost_cached.cache_info = route_cache.cache_info
+    return route_cache
 
+
+def configure_cost_model(model: CostModel) -> CostModel:
+    """Подменяет модель стоимости; закэшированные по старой модели результаты сбрасываются.
+
+    Меню, уже зарегистрированное в прежней модели, переносится, если у новой его нет.
+    """
+    global cost_model
+    if not model.menu_prep:
+        model.menu_prep.update(cost_model.menu_prep)
+    cost_model = model
+    route_cache.clear()
+    if route_cache.backing is not None:
+        route_cache.backing.clear()
+    return cost_model
+
+
+def enable_disk_cache(path: str) -> None:
+    """Подключает дисковый уровень под общий кэш; он разделяется между процессами"""
+    from .disk_cache import DiskRouteCache
+    route_cache.backing = DiskRouteCache(path)
+
+
+@timed("memo.compute_route_cost")
 def compute_route_cost(route_id: str, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...]) -> Dict[str, Any]:
     """Обертка для работы с объектами Order и Courier"""
-    order_ids = tuple(order.id for order in orders)
-    courier_ids = tuple(courier.id for courier in couriers)
-    return compute_route_cost_cached(route_id, order_ids, courier_ids)
+    return compute_route_cost_cached(*route_key(route_id, orders, couriers))
 
 
-def measure_performance(route_id: str, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...]):
-    """Замер производительности до/после кэширования"""
-    # Очищаем кэш для чистоты эксперимента
-    compute_route_cost_cached.cache_clear()
+def measure_performance(route_id: str, orders: Tuple[Order, ...], couriers: Tuple[Courier, ...],
+                        repeat: int = 30, warmup: int = 3) -> Dict[str, Any]:
+    """Холодная и теплая задержка расчета маршрута на изолированном кэше.
 
-    # Первый вызов (без кэша)
-    start = time.time()
-    result1 = compute_route_cost(route_id, orders, couriers)
-    time1 = time.time() - start
+    Общий route_cache не очищается и не заполняется. Холодный вызов - промах
+    нового кэша и новая копия модели с пустой матрицей расстояний, теплый -
+    попадание в заполненный кэш. Времена - медианы в секундах.
+    """
+    key = route_key(route_id, orders, couriers)
 
-    # Второй вызов (с кэшем)
-    start = time.time()
-    result2 = compute_route_cost(route_id, orders, couriers)
-    time2 = time.time() - start
+    def make_cache():
+        model = replace(cost_model)
+        return RouteCostCache(max_entries=16), model
 
+    def call(state):
+        cache, model = state
+        return cache.get_or_compute(key, lambda: model.route_cost(*key))
+
+    speedup = measure_cold_warm(call, make_cache, repeat=repeat, warmup=warmup)
     return {
-        "first_call_time": time1,
-        "cached_call_time": time2,
-        "speedup": time1 / time2 if time2 > 0 else 0,
-        "result": result1
-    }
\ No newline at end of file
+        "first_call_time": speedup.cold.median / 1e9,
+        "cached_call_time": speedup.warm.median / 1e9,
+        "speedup": speedup.ratio,
+        "speedup_ci": speedup.ci,
+        "cold": speedup.cold.as_dict(),
+        "warm": speedup.warm.as_dict(),
+        "result": cost_model.route_cost(*key),
+    }
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+# Гистограммы по степеням двойки наносекунд: корзина i - длительности в [2^(i-1), 2^i)
+_BUCKETS = 64
+
+
+class Histogram:
+    """Гистограмма задержек с логарифмическими корзинами.
+
+    Запись - O(1) без выделения памяти; квантили оцениваются верхней
+    границей корзины (погрешность не больше 2x, сверху ограничена max).
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def observe(self, ns: int) -> None:
+        ns = max(0, int(ns))
+        self.counts[min(ns.bit_length(), _BUCKETS - 1)] += 1
+        if self.count == 0 or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        self.count += 1
+        self.total += ns
+
+    def quantile(self, q: float) -> int:
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return min(1 << i, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Сводка в миллисекундах"""
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1e6,
+            "mean_ms": self.total / self.count / 1e6 if self.count else 0.0,
+            "min_ms": self.min / 1e6,
+            "p50_ms": self.quantile(0.5) / 1e6,
+            "p99_ms": self.quantile(0.99) / 1e6,
+            "max_ms": self.max / 1e6,
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry: 'Registry', name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.registry.observe(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+
+class Registry:
+    """Реестр метрик: гистограммы задержек, счетчики и статистика кэшей.
+
+    Выключенный реестр ничего не пишет: декоратор делает одну проверку флага,
+    span возвращает общий пустой контекст. Включается и выключается на ходу.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._caches: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Сбрасывает накопленные значения; зарегистрированные кэши остаются"""
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+    def histogram(self, name: str) -> Histogram:
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram())
+        return hist
+
+    def observe(self, name: str, ns: int) -> None:
+        self.histogram(name).observe(ns)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def register_cache(self, name: str, stats: Callable[[], Any]) -> None:
+        """stats() возвращает CacheStats или CacheInfo; читается при экспорте"""
+        self._caches[name] = stats
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Декоратор: время каждого вызова в гистограмму name (по умолчанию - имя функции)"""
+        def decorator(func: Callable) -> Callable:
+            metric = name or f"{func.__module__}.{func.__qualname__}"
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(metric, time.perf_counter_ns() - start)
+            return wrapper
+        return decorator
+
+    def span(self, name: str):
+        """Контекстный менеджер: время блока в гистограмму name"""
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def cache_ratios(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for name, stats in self._caches.items():
+            s = stats()
+            total = s.hits + s.misses
+            out[name] = {
+                "hits": s.hits,
+                "misses": s.misses,
+                "hit_ratio": s.hits / total if total else 0.0,
+                "entries": getattr(s, "entries", getattr(s, "currsize", 0)),
+            }
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "timers": {name: h.summary() for name, h in sorted(self._histograms.items())},
+            "counters": dict(sorted(self._counters.items())),
+            "caches": self.cache_ratios(),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_text(self) -> str:
+        """Построчный формат 'имя{поле} значение' для логов и diff между запусками"""
+        snap = self.snapshot()
+        lines = []
+        for name, summary in snap["timers"].items():
+            lines.extend(f"timer.{name}{{{field}}} {value:g}" for field, value in summary.items())
+        lines.extend(f"counter.{name} {value}" for name, value in snap["counters"].items())
+        for name, ratios in snap["caches"].items():
+            lines.extend(f"cache.{name}{{{field}}} {value:g}" for field, value in ratios.items())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Экспорт в файл: .json - JSON, иначе текстовый формат"""
+        text = self.to_json() if str(path).endswith(".json") else self.to_text()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+# Общий реестр; включается переменной окружения DELIVERY_METRICS=1 или enable()
+REGISTRY = Registry(enabled=os.environ.get("DELIVERY_METRICS") == "1")
+
+timed = REGISTRY.timed
+span = REGISTRY.span
+incr = REGISTRY.incr
+enable = REGISTRY.enable
+disable = REGISTRY.disable
+register_cache = REGISTRY.register_cache
+snapshot = REGISTRY.snapshot
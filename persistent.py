@@ -0,0 +1,337 @@
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+# Ветвление 32: глубина дерева для миллиона элементов - 4 уровня
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_HASH_MASK = 0xFFFFFFFF
+
+
+class PVector(Sequence):
+    """Персистентный вектор (bit-partitioned trie) со структурным разделением.
+
+    append и set возвращают новую версию за O(log32 n), копируя только путь
+    от корня до листа; старые версии остаются неизменными.
+    """
+
+    __slots__ = ("_count", "_shift", "_root", "_tail")
+
+    def __init__(self, iterable: Iterable = ()):
+        items = tuple(iterable)
+        count = len(items)
+        tail_off = _tail_offset(count)
+        level = [items[i:i + _WIDTH] for i in range(0, tail_off, _WIDTH)]
+        shift = _BITS
+        while len(level) > _WIDTH:
+            level = [tuple(level[i:i + _WIDTH]) for i in range(0, len(level), _WIDTH)]
+            shift += _BITS
+        self._count = count
+        self._shift = shift
+        self._root = tuple(level)
+        self._tail = items[tail_off:]
+
+    @classmethod
+    def _make(cls, count: int, shift: int, root: tuple, tail: tuple) -> 'PVector':
+        vec = cls.__new__(cls)
+        vec._count = count
+        vec._shift = shift
+        vec._root = root
+        vec._tail = tail
+        return vec
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Срез, как и у кортежа, материализуется в tuple
+            return tuple(self[i] for i in range(*index.indices(self._count)))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("PVector index out of range")
+        return self._leaf_for(index)[index & _MASK]
+
+    def _leaf_for(self, index: int) -> tuple:
+        if index >= _tail_offset(self._count):
+            return self._tail
+        node = self._root
+        for level in range(self._shift, 0, -_BITS):
+            node = node[(index >> level) & _MASK]
+        return node
+
+    def __iter__(self) -> Iterator:
+        yield from _iter_node(self._root, self._shift)
+        yield from self._tail
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PVector, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __add__(self, other) -> 'PVector':
+        vec = self
+        for value in other:
+            vec = vec.append(value)
+        return vec
+
+    def __repr__(self) -> str:
+        return f"PVector({list(self)!r})"
+
+    def append(self, value: Any) -> 'PVector':
+        count = self._count
+        if count - _tail_offset(count) < _WIDTH:
+            return PVector._make(count + 1, self._shift, self._root, self._tail + (value,))
+
+        # Хвост заполнен: переносим его в дерево
+        shift = self._shift
+        if (count >> _BITS) > (1 << shift):
+            root = (self._root, _new_path(shift, self._tail))
+            shift += _BITS
+        else:
+            root = _push_tail(count, shift, self._root, self._tail)
+        return PVector._make(count + 1, shift, root, (value,))
+
+    def set(self, index: int, value: Any) -> 'PVector':
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("PVector index out of range")
+        if index >= _tail_offset(self._count):
+            pos = index & _MASK
+            tail = self._tail[:pos] + (value,) + self._tail[pos + 1:]
+            return PVector._make(self._count, self._shift, self._root, tail)
+        root = _assoc(self._shift, self._root, index, value)
+        return PVector._make(self._count, self._shift, root, self._tail)
+
+
+def _tail_offset(count: int) -> int:
+    return 0 if count < _WIDTH else ((count - 1) >> _BITS) << _BITS
+
+
+def _iter_node(node: tuple, level: int) -> Iterator:
+    if level == 0:
+        yield from node
+    else:
+        for child in node:
+            yield from _iter_node(child, level - _BITS)
+
+
+def _new_path(level: int, node: tuple) -> tuple:
+    while level > 0:
+        node = (node,)
+        level -= _BITS
+    return node
+
+
+def _push_tail(count: int, level: int, parent: tuple, tail: tuple) -> tuple:
+    sub = ((count - 1) >> level) & _MASK
+    if level == _BITS:
+        child = tail
+    elif sub < len(parent):
+        child = _push_tail(count, level - _BITS, parent[sub], tail)
+    else:
+        child = _new_path(level - _BITS, tail)
+    return parent[:sub] + (child,) + parent[sub + 1:]
+
+
+def _assoc(level: int, node: tuple, index: int, value: Any) -> tuple:
+    if level == 0:
+        pos = index & _MASK
+        return node[:pos] + (value,) + node[pos + 1:]
+    sub = (index >> level) & _MASK
+    child = _assoc(level - _BITS, node[sub], index, value)
+    return node[:sub] + (child,) + node[sub + 1:]
+
+
+class _BitmapNode:
+    """Узел HAMT: битовая маска и плотный массив записей (key, value) или подузлов"""
+
+    __slots__ = ("bitmap", "array")
+
+    def __init__(self, bitmap: int, array: tuple):
+        self.bitmap = bitmap
+        self.array = array
+
+    def find(self, shift: int, h: int, key, default):
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return default
+        entry = self.array[_popcount(self.bitmap & (bit - 1))]
+        if type(entry) is tuple:
+            return entry[1] if entry[0] == key else default
+        return entry.find(shift + _BITS, h, key, default)
+
+    def assoc(self, shift: int, h: int, key, value) -> Tuple['_BitmapNode', bool]:
+        bit = 1 << ((h >> shift) & _MASK)
+        idx = _popcount(self.bitmap & (bit - 1))
+        array = self.array
+        if not self.bitmap & bit:
+            return _BitmapNode(self.bitmap | bit, array[:idx] + ((key, value),) + array[idx:]), True
+
+        entry = array[idx]
+        if type(entry) is tuple:
+            if entry[0] == key:
+                if entry[1] is value:
+                    return self, False
+                new_entry, added = (key, value), False
+            else:
+                new_entry = _merge(shift + _BITS, entry[0], entry[1], h, key, value)
+                added = True
+        else:
+            new_entry, added = entry.assoc(shift + _BITS, h, key, value)
+            if new_entry is entry:
+                return self, False
+        return _BitmapNode(self.bitmap, array[:idx] + (new_entry,) + array[idx + 1:]), added
+
+    def without(self, shift: int, h: int, key) -> Optional['_BitmapNode']:
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+        idx = _popcount(self.bitmap & (bit - 1))
+        array = self.array
+        entry = array[idx]
+        if type(entry) is tuple:
+            if entry[0] != key:
+                return self
+            sub = None
+        else:
+            sub = entry.without(shift + _BITS, h, key)
+            if sub is entry:
+                return self
+        if sub is None:
+            if self.bitmap == bit:
+                return None
+            return _BitmapNode(self.bitmap ^ bit, array[:idx] + array[idx + 1:])
+        return _BitmapNode(self.bitmap, array[:idx] + (sub,) + array[idx + 1:])
+
+    def entries(self) -> Iterator[tuple]:
+        for entry in self.array:
+            if type(entry) is tuple:
+                yield entry
+            else:
+                yield from entry.entries()
+
+
+class _CollisionNode:
+    """Узел для ключей с полностью совпадающим 32-битным хешем"""
+
+    __slots__ = ("hash", "array")
+
+    def __init__(self, h: int, array: tuple):
+        self.hash = h
+        self.array = array
+
+    def find(self, shift: int, h: int, key, default):
+        for k, v in self.array:
+            if k == key:
+                return v
+        return default
+
+    def assoc(self, shift: int, h: int, key, value):
+        if h != self.hash:
+            # Другой хеш: поднимаем коллизию в обычный узел
+            node = _BitmapNode(1 << ((self.hash >> shift) & _MASK), (self,))
+            return node.assoc(shift, h, key, value)
+        for i, (k, v) in enumerate(self.array):
+            if k == key:
+                if v is value:
+                    return self, False
+                return _CollisionNode(h, self.array[:i] + ((key, value),) + self.array[i + 1:]), False
+        return _CollisionNode(h, self.array + ((key, value),)), True
+
+    def without(self, shift: int, h: int, key):
+        for i, (k, _) in enumerate(self.array):
+            if k == key:
+                array = self.array[:i] + self.array[i + 1:]
+                return _CollisionNode(h, array) if array else None
+        return self
+
+    def entries(self) -> Iterator[tuple]:
+        return iter(self.array)
+
+
+def _merge(shift: int, k1, v1, h2: int, k2, v2):
+    h1 = hash(k1) & _HASH_MASK
+    if h1 == h2:
+        return _CollisionNode(h1, ((k1, v1), (k2, v2)))
+    node, _ = _EMPTY_NODE.assoc(shift, h1, k1, v1)
+    node, _ = node.assoc(shift, h2, k2, v2)
+    return node
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+_EMPTY_NODE = _BitmapNode(0, ())
+_MISSING = object()
+
+
+class PMap(Mapping):
+    """Персистентный ассоциативный массив (HAMT) со структурным разделением.
+
+    set и remove возвращают новую версию за O(log32 n).
+    """
+
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, items: Any = ()):
+        pairs = items.items() if isinstance(items, Mapping) else items
+        root, count = _EMPTY_NODE, 0
+        for key, value in pairs:
+            root, added = root.assoc(0, hash(key) & _HASH_MASK, key, value)
+            count += added
+        self._root = root
+        self._count = count
+
+    @classmethod
+    def _make(cls, root, count: int) -> 'PMap':
+        pmap = cls.__new__(cls)
+        pmap._root = root
+        pmap._count = count
+        return pmap
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, key):
+        value = self._root.find(0, hash(key) & _HASH_MASK, key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        return self._root.find(0, hash(key) & _HASH_MASK, key, default)
+
+    def __contains__(self, key) -> bool:
+        return self._root.find(0, hash(key) & _HASH_MASK, key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator:
+        for key, _ in self._root.entries():
+            yield key
+
+    def items(self):
+        return list(self._root.entries())
+
+    def __hash__(self):
+        return hash(frozenset(self._root.entries()))
+
+    def __repr__(self) -> str:
+        return f"PMap({dict(self._root.entries())!r})"
+
+    def set(self, key, value) -> 'PMap':
+        root, added = self._root.assoc(0, hash(key) & _HASH_MASK, key, value)
+        if root is self._root:
+            return self
+        return PMap._make(root, self._count + added)
+
+    def remove(self, key) -> 'PMap':
+        root = self._root.without(0, hash(key) & _HASH_MASK, key)
+        if root is self._root:
+            return self
+        return PMap._make(root if root is not None else _EMPTY_NODE, self._count - 1)
@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from .filters import Predicate, Eq, Range, And
+from .metrics import timed
+from .store import OrderStore
+
+_RANGE_SELECTIVITY = 3
+
+# Поля, по которым OrderStore держит хеш-индексы
+_HASH_INDEXES = {
+    "id": lambda store, value: tuple(o for o in (store.get(value),) if o is not None),
+    "rest_id": lambda store, value: store.by_rest_id(value),
+    "status": lambda store, value: store.by_status(value),
+}
+
+# Размеры групп тех же индексов для оценки плана: кортеж результата не собирается
+_INDEX_COUNTS = {
+    "id": lambda store, value: int(store.get(value) is not None),
+    "rest_id": lambda store, value: store.count_rest_id(value),
+    "status": lambda store, value: store.count_status(value),
+}
+
+
+@dataclass(frozen=True)
+class Plan:
+    """План выполнения запроса: источник кандидатов и остаточный фильтр.
+
+    Строки результата всегда идут в порядке источника, как при полном
+    проходе, какой бы индекс ни выбрал планировщик.
+    """
+    strategy: str
+    index_predicate: Optional[Predicate]
+    residual: Tuple[Predicate, ...]
+    estimate: int
+    source: Any = field(repr=False, compare=False)
+
+    def explain(self) -> str:
+        if self.strategy == "scan":
+            head = f"FullScan(rows={self.estimate})"
+        else:
+            head = f"IndexLookup[{self.strategy}]({self.index_predicate!r}, rows~{self.estimate})"
+        if self.residual:
+            return f"{head} -> Filter{And(self.residual)!r}"
+        return head
+
+    def rows(self) -> Iterator:
+        """Ленивый проход по результату: кандидаты из индекса через остаточный фильтр"""
+        if self.strategy == "scan":
+            candidates = self.source
+        elif self.strategy == "ts_index":
+            # Индекс времени отдает заказы по времени: возвращаем порядок хранилища
+            candidates = self.source.in_store_order(
+                self.source.by_ts_range(self.index_predicate.lo, self.index_predicate.hi))
+        else:
+            candidates = _HASH_INDEXES[self.index_predicate.field](self.source, self.index_predicate.value)
+
+        if not self.residual:
+            return iter(candidates)
+        if len(self.residual) == 1:
+            return filter(self.residual[0], candidates)
+        return filter(And(self.residual), candidates)
+
+    def execute(self) -> Tuple:
+        return tuple(self.rows())
+
+
+def _estimate(store: OrderStore, p: Predicate) -> Optional[Tuple[str, int]]:
+    if isinstance(p, Eq) and p.field in _HASH_INDEXES:
+        return f"{p.field}_index", _INDEX_COUNTS[p.field](store, p.value)
+    if isinstance(p, Range) and p.field == "epoch":
+        if store.has_ts_index:
+            return "ts_index", store.ts_index().count_range(p.lo, p.hi)
+        # Индекс строится только если план его выберет; до этого - типовая
+        # оценка селективности диапазона в треть строк
+        return "ts_index", len(store) // _RANGE_SELECTIVITY
+    return None
+
+
+def plan_query(source: Sequence, predicate: Predicate) -> Plan:
+    """Выбирает самый избирательный индекс среди частей конъюнкции или полный проход"""
+    conjuncts = predicate.conjuncts() if isinstance(predicate, Predicate) else ()
+    best = None
+    if isinstance(source, OrderStore):
+        for i, p in enumerate(conjuncts):
+            estimate = _estimate(source, p)
+            if estimate is not None and (best is None or estimate[1] < best[2]):
+                best = (i, estimate[0], estimate[1])
+
+    if best is None or best[2] >= len(source):
+        residual = conjuncts if conjuncts else (predicate,)
+        return Plan("scan", None, residual, len(source), source)
+    i, strategy, rows = best
+    return Plan(strategy, conjuncts[i], conjuncts[:i] + conjuncts[i + 1:], rows, source)
+
+
+@timed("planner.run_query")
+def run_query(source: Sequence, predicate: Predicate) -> Tuple:
+    return plan_query(source, predicate).execute()
+
+
+@timed("planner.run_queries")
+def run_queries(source: Sequence, predicates: Dict[str, Predicate]) -> Dict[str, Tuple]:
+    """Несколько независимых запросов за один проход по источнику"""
+    named = tuple(predicates.items())
+    results: Dict[str, list] = {name: [] for name, _ in named}
+    buckets = tuple((p, results[name]) for name, p in named)
+    for item in source:
+        for p, bucket in buckets:
+            if p(item):
+                bucket.append(item)
+    return {name: tuple(bucket) for name, bucket in results.items()}
@@ -1,21 +1,66 @@
-from typing import Tuple
+from typing import Any, Callable, Dict, Iterator, Tuple
 from .domain import Route, Order, Restaurant
 
+
+class Bounce:
+    """Отложенный рекурсивный вызов для trampoline"""
+    __slots__ = ("func", "args")
+
+    def __init__(self, func: Callable, *args):
+        self.func = func
+        self.args = args
+
+
+def trampoline(result: Any) -> Any:
+    """Выполняет цепочку Bounce в цикле, не наращивая стек вызовов"""
+    while isinstance(result, Bounce):
+        result = result.func(*result.args)
+    return result
+
+
+def zone_lookup(restaurants: Tuple[Restaurant, ...]) -> Dict[str, str]:
+    """Строит отображение rest_id -> zone за один проход"""
+    zones: Dict[str, str] = {}
+    for r in restaurants:
+        # Как и next(...), берем первый ресторан с данным id
+        zones.setdefault(r.id, r.zone)
+    return zones
+
+
 def split_route(route: Route) -> Tuple[str, ...]:
-    def _split_recursive(orders: Tuple[str, ...], acc: Tuple[str, ...]) -> Tuple[str, ...]:
-        if not orders:
-            return acc
-        current = f"Order {orders[0]} -> Courier {route.courier_id}"
-        return _split_recursive(orders[1:], acc + (current,))
-    return _split_recursive(route.orders, ())
+    orders = route.orders
+
+    # Хвостовая рекурсия по индексу: без срезов orders[1:] и копий аккумулятора
+    def _split_recursive(i: int, acc: list):
+        if i == len(orders):
+            return tuple(acc)
+        acc.append(f"Order {orders[i]} -> Courier {route.courier_id}")
+        return Bounce(_split_recursive, i + 1, acc)
+    return trampoline(_split_recursive(0, []))
+
+
+def iter_route(route: Route) -> Iterator[str]:
+    """Ленивая версия split_route"""
+    for oid in route.orders:
+        yield f"Order {oid} -> Courier {route.courier_id}"
+
 
 def collect_orders_by_zone(orders: Tuple[Order, ...], restaurants: Tuple[Restaurant, ...], zone: str) -> Tuple[Order, ...]:
-    def _collect_recursive(remaining_orders: Tuple[Order, ...], acc: Tuple[Order, ...]) -> Tuple[Order, ...]:
-        if not remaining_orders:
-            return acc
-        current_order = remaining_orders[0]
-        restaurant = next((r for r in restaurants if r.id == current_order.rest_id), None)
-        if restaurant and restaurant.zone == zone:
-            return _collect_recursive(remaining_orders[1:], acc + (current_order,))
-        return _collect_recursive(remaining_orders[1:], acc)
-    return _collect_recursive(orders, ())
\ No newline at end of file
+    zones = zone_lookup(restaurants)
+
+    def _collect_recursive(i: int, acc: list):
+        if i == len(orders):
+            return tuple(acc)
+        current_order = orders[i]
+        if current_order.rest_id in zones and zones[current_order.rest_id] == zone:
+            acc.append(current_order)
+        return Bounce(_collect_recursive, i + 1, acc)
+    return trampoline(_collect_recursive(0, []))
+
+
+def iter_orders_by_zone(orders, restaurants: Tuple[Restaurant, ...], zone: str) -> Iterator[Order]:
+    """Ленивая версия collect_orders_by_zone: отдает заказы по мере совпадения"""
+    zones = zone_lookup(restaurants)
+    for order in orders:
+        if order.rest_id in zones and zones[order.rest_id] == zone:
+            yield order
@@ -0,0 +1,205 @@
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from .domain import Courier, MenuItem, Order, Route
+
+Point = Tuple[int, int]
+
+# Размер условного города для псевдокоординат, метры
+CITY_SIZE = 10_000
+
+
+def hashed_point(key: str) -> Point:
+    """Стабильные между процессами псевдокоординаты для точки без адреса"""
+    raw = key.encode("utf-8")
+    return zlib.crc32(b"x:" + raw) % CITY_SIZE, zlib.crc32(b"y:" + raw) % CITY_SIZE
+
+
+def manhattan(a: Point, b: Point) -> int:
+    """Расстояние по городской сетке кварталов"""
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class DistanceMatrix:
+    """Попарные расстояния между точками с мемоизацией.
+
+    Расстояние считается один раз на пару идентификаторов точек и дальше
+    берется из словаря; matrix() собирает плотную матрицу для одного
+    маршрута, по которой работают эвристики. Словари точек и пар ограничены
+    max_entries: сверх него вытесняются самые старые записи.
+    """
+
+    def __init__(self, locate: Callable[[str], Point], metric: Callable[[Point, Point], int] = manhattan,
+                 max_entries: int = 1 << 20):
+        self.locate = locate
+        self.metric = metric
+        self.max_entries = max_entries
+        self._points: Dict[str, Point] = {}
+        self._pairs: Dict[Tuple[str, str], int] = {}
+
+    def point(self, key: str) -> Point:
+        point = self._points.get(key)
+        if point is None:
+            point = self._points[key] = self.locate(key)
+            _trim(self._points, self.max_entries)
+        return point
+
+    def distance(self, a: str, b: str) -> int:
+        pair = (a, b) if a <= b else (b, a)
+        d = self._pairs.get(pair)
+        if d is None:
+            d = self._pairs[pair] = self.metric(self.point(a), self.point(b))
+            _trim(self._pairs, self.max_entries)
+        return d
+
+    def matrix(self, keys: Sequence[str]) -> List[List[int]]:
+        distance = self.distance
+        return [[distance(a, b) for b in keys] for a in keys]
+
+    def clear(self) -> None:
+        self._points.clear()
+        self._pairs.clear()
+
+
+def _trim(entries: Dict, limit: int) -> None:
+    # Словари хранят порядок вставки: первым вытесняется самый старый ключ
+    if len(entries) > limit:
+        del entries[next(iter(entries))]
+
+
+def nearest_neighbour(dist: List[List[int]]) -> List[int]:
+    """Порядок обхода точек 1..n-1 из точки 0: каждый раз к ближайшей непосещенной"""
+    n = len(dist)
+    tour = [0]
+    left = set(range(1, n))
+    current = 0
+    while left:
+        row = dist[current]
+        current = min(left, key=row.__getitem__)
+        left.remove(current)
+        tour.append(current)
+    return tour
+
+
+def two_opt(tour: List[int], dist: List[List[int]]) -> List[int]:
+    """Улучшает открытый путь с фиксированным началом разворотами отрезков"""
+    tour = list(tour)
+    n = len(tour)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            a, b = tour[i - 1], tour[i]
+            d_ab = dist[a][b]
+            for j in range(i + 1, n):
+                c = tour[j]
+                # Разворот tour[i..j]: ребра (a,b) и (c,d) меняются на (a,c) и (b,d)
+                if j + 1 < n:
+                    d = tour[j + 1]
+                    delta = dist[a][c] + dist[b][d] - d_ab - dist[c][d]
+                else:
+                    delta = dist[a][c] - d_ab
+                if delta < 0:
+                    tour[i:j + 1] = reversed(tour[i:j + 1])
+                    improved = True
+                    b = tour[i]
+                    d_ab = dist[a][b]
+    return tour
+
+
+def path_length(tour: Sequence[int], dist: List[List[int]]) -> int:
+    return sum(dist[tour[k]][tour[k + 1]] for k in range(len(tour) - 1))
+
+
+@dataclass
+class CostModel:
+    """Модель стоимости маршрута: расстояния, время в пути, готовность заказов.
+
+    Точки заказов и курьеров берутся из locations, для остальных - стабильные
+    псевдокоординаты. Готовность заказа - максимальное prep_time его позиций
+    (меню - register_menu): курьер, приехавший раньше, ждет. Время готовности
+    передается в route_cost явно (prep_for) и входит в ключ кэша memo;
+    prep_times - запасной источник для вызовов без него. Модель подменяется
+    через memo.configure_cost_model.
+    """
+    locations: Dict[str, Point] = field(default_factory=dict)
+    speed_m_per_min: int = 250
+    service_min: int = 2
+    per_order: int = 100
+    per_km: int = 20
+    per_min: int = 5
+    metric: Callable[[Point, Point], int] = manhattan
+    prep_times: Dict[str, int] = field(default_factory=dict)
+    menu_prep: Dict[str, int] = field(default_factory=dict)
+    max_entries: int = 1 << 20
+
+    def __post_init__(self):
+        self.distances = DistanceMatrix(self.locate, self.metric, self.max_entries)
+
+    def locate(self, key: str) -> Point:
+        point = self.locations.get(key)
+        return point if point is not None else hashed_point(key)
+
+    def register_menu(self, menu_items: Iterable[MenuItem]) -> None:
+        for m in menu_items:
+            self.menu_prep[m.id] = m.prep_time
+
+    def order_prep(self, order: Order) -> int:
+        menu_prep = self.menu_prep
+        return max((menu_prep.get(menu_id, 0) for menu_id, _ in order.items), default=0)
+
+    def prep_for(self, orders: Iterable[Order]) -> Tuple[int, ...]:
+        """Время готовности заказов в минутах, в порядке orders"""
+        return tuple(self.order_prep(o) for o in orders)
+
+    def register_orders(self, orders: Iterable[Order]) -> None:
+        """Запоминает время готовности заказов для route_cost без явного prep"""
+        for o in orders:
+            self.prep_times[o.id] = self.order_prep(o)
+            _trim(self.prep_times, self.max_entries)
+
+    def plan(self, start: str, stops: Sequence[str],
+             prep: Optional[Sequence[int]] = None) -> Tuple[List[str], int, int]:
+        """(порядок остановок, расстояние в метрах, длительность в минутах)"""
+        if not stops:
+            return [], 0, 0
+        keys = [start, *stops]
+        dist = self.distances.matrix(keys)
+        tour = two_opt(nearest_neighbour(dist), dist)
+        ready = [0, *(prep if prep is not None else (self.prep_times.get(s, 0) for s in stops))]
+
+        speed = self.speed_m_per_min
+        minutes = 0.0
+        for k in range(1, len(tour)):
+            minutes += dist[tour[k - 1]][tour[k]] / speed
+            # Заказ можно забрать не раньше, чем он приготовлен
+            minutes = max(minutes, ready[tour[k]]) + self.service_min
+        return [keys[i] for i in tour[1:]], path_length(tour, dist), round(minutes)
+
+    def route_cost(self, route_id: str, order_ids: Tuple[str, ...], courier_ids: Tuple[str, ...],
+                   prep: Optional[Tuple[int, ...]] = None) -> Dict[str, Any]:
+        start = courier_ids[0] if courier_ids else route_id
+        sequence, distance, duration = self.plan(start, order_ids, prep)
+        cost = len(order_ids) * self.per_order + distance * self.per_km // 1000 + duration * self.per_min
+        return {
+            "distance": distance,
+            "duration": duration,
+            "cost": cost,
+            "orders_count": len(order_ids),
+            "route_id": route_id,
+            "sequence": sequence,
+        }
+
+
+def to_route(result: Mapping[str, Any], courier_id: str) -> Route:
+    """Route из словаря стоимости: заказы в порядке обхода"""
+    return Route(result["route_id"], courier_id, tuple(result["sequence"]), result["distance"], result["duration"])
+
+
+def plan_route(route_id: str, orders: Tuple[Order, ...], courier: Optional[Courier],
+               model: Optional[CostModel] = None) -> Route:
+    """Строит маршрут курьера по заказам без кэша"""
+    model = model or CostModel()
+    courier_ids = (courier.id,) if courier else ()
+    result = model.route_cost(route_id, tuple(o.id for o in orders), courier_ids, model.prep_for(orders))
+    return to_route(result, courier.id if courier else "")
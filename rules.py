@@ -0,0 +1,267 @@
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from .domain import Courier, Order, Rule
+from .ftypes import Either
+from .timeindex import to_epoch
+
+ORDER = "order"
+PAIR = "pair"
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    """Правило, скомпилированное в функцию: check(order) или check(order, courier) -> bool"""
+    id: str
+    kind: str
+    target: str
+    cost: int
+    check: Callable[..., bool]
+    error: str
+    payload: Dict[str, Any]
+
+
+# Компиляторы по видам правил: (стоимость проверки, цель, фабрика функции)
+COMPILERS: Dict[str, Tuple[int, str, Callable[[Dict[str, Any]], Callable[..., bool]]]] = {}
+
+# Поля курьера, которые читают парные проверки: курьеры с равными полями
+# проходят правила одинаково, и assignment проверяет из них только первого
+PAIR_COURIER_FIELDS = ("vehicle", "zone")
+
+
+def compiler(kind: str, cost: int, target: str = ORDER):
+    def register(factory):
+        COMPILERS[kind] = (cost, target, factory)
+        return factory
+    return register
+
+
+@compiler("max_total", cost=1)
+def _max_total(payload):
+    limit = payload["limit"]
+    return lambda o: o.total <= limit
+
+
+@compiler("min_total", cost=1)
+def _min_total(payload):
+    limit = payload["limit"]
+    return lambda o: o.total >= limit
+
+
+@compiler("status_in", cost=2)
+def _status_in(payload):
+    statuses = frozenset(payload["statuses"])
+    return lambda o: o.status in statuses
+
+
+@compiler("restaurant_in", cost=2)
+def _restaurant_in(payload):
+    ids = frozenset(payload["ids"])
+    return lambda o: o.rest_id in ids
+
+
+@compiler("restaurant_not_in", cost=2)
+def _restaurant_not_in(payload):
+    ids = frozenset(payload["ids"])
+    return lambda o: o.rest_id not in ids
+
+
+@compiler("ts_between", cost=4)
+def _ts_between(payload):
+    lo, hi = to_epoch(payload["start"]), to_epoch(payload["end"])
+    return lambda o: lo <= o.epoch <= hi
+
+
+@compiler("max_items", cost=5)
+def _max_items(payload):
+    limit = payload["limit"]
+    return lambda o: sum(qty for _, qty in o.items) <= limit
+
+
+@compiler("vehicle_max_total", cost=1, target=PAIR)
+def _vehicle_max_total(payload):
+    vehicle, limit = payload["vehicle"], payload["limit"]
+    return lambda o, c: o.total <= limit or c.vehicle != vehicle
+
+
+@compiler("vehicle_in", cost=2, target=PAIR)
+def _vehicle_in(payload):
+    vehicles = frozenset(payload["vehicles"])
+    return lambda o, c: c.vehicle in vehicles
+
+
+@compiler("same_zone", cost=3, target=PAIR)
+def _same_zone(payload):
+    zones = dict(payload["zones"])
+    return lambda o, c: zones.get(o.rest_id, c.zone) == c.zone
+
+
+def compile_rule(rule: Rule) -> CompiledRule:
+    if rule.kind not in COMPILERS:
+        raise ValueError(f"Unknown rule kind: {rule.kind}")
+    cost, target, factory = COMPILERS[rule.kind]
+    error = rule.payload.get("error", f"Rule {rule.id} failed")
+    return CompiledRule(rule.id, rule.kind, target, rule.payload.get("cost", cost), factory(rule.payload),
+                        error, rule.payload)
+
+
+def _intersection(key):
+    return lambda payloads: {key: frozenset.intersection(*(frozenset(p[key]) for p in payloads))}
+
+
+def _union(key):
+    return lambda payloads: {key: frozenset.union(*(frozenset(p[key]) for p in payloads))}
+
+
+# Слияние правил одного вида в одну проверку: заказ проходит слитую проверку
+# тогда и только тогда, когда проходит все правила группы
+FUSERS: Dict[str, Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = {
+    "max_total": lambda payloads: {"limit": min(p["limit"] for p in payloads)},
+    "min_total": lambda payloads: {"limit": max(p["limit"] for p in payloads)},
+    "max_items": lambda payloads: {"limit": min(p["limit"] for p in payloads)},
+    "status_in": _intersection("statuses"),
+    "restaurant_in": _intersection("ids"),
+    "restaurant_not_in": _union("ids"),
+    "vehicle_in": _intersection("vehicles"),
+}
+
+Check = Tuple[Callable[..., bool], Dict[str, str], Optional[tuple]]
+
+
+def _checks(rules: Sequence[CompiledRule]) -> Tuple[Check, ...]:
+    """Тройки (проверка, ошибка, правила группы) с группами для однотипных правил"""
+    checks = []
+    for (kind, _cost), group in groupby(rules, key=lambda c: (c.kind, c.cost)):
+        group = list(group)
+        singles = tuple((c.check, {"error": c.error, "rule": c.id}, None) for c in group)
+        if len(group) > 1 and kind in FUSERS:
+            fused = COMPILERS[kind][2](FUSERS[kind]([c.payload for c in group]))
+            # Ошибка ищется по правилам группы только когда слитая проверка не прошла
+            checks.append((fused, None, singles))
+        else:
+            checks.extend(singles)
+    return tuple(checks)
+
+
+def _first_failure(checks: Sequence[Check], *args) -> Any:
+    for check, error, group in checks:
+        if not check(*args):
+            return error if group is None else _first_failure(group, *args)
+    return None
+
+
+class RuleSet:
+    """Набор правил, скомпилированный один раз.
+
+    Правила упорядочены по стоимости проверки (при равной - по виду, затем
+    в исходном порядке), проверка останавливается на первом нарушенном
+    правиле. Однотипные правила сливаются в одну проверку: сотня лимитов
+    суммы стоит одного сравнения.
+    Результаты - Either: Right(order) или Left({"error": ..., "rule": ...}).
+    """
+
+    __slots__ = ("rules", "order_rules", "pair_rules", "_order_checks", "_pair_checks")
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        compiled = sorted((compile_rule(r) for r in rules), key=lambda c: (c.cost, c.kind))
+        self.rules = tuple(compiled)
+        self.order_rules = tuple(c for c in compiled if c.target == ORDER)
+        self.pair_rules = tuple(c for c in compiled if c.target == PAIR)
+        # Ошибки собираются заранее, чтобы при отказе не строить словарь заново
+        self._order_checks = _checks(self.order_rules)
+        self._pair_checks = _checks(self.pair_rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def check_order(self, order: Order) -> Either:
+        error = _first_failure(self._order_checks, order)
+        return Either.right(order) if error is None else Either.left(dict(error))
+
+    def check_pair(self, order: Order, courier: Courier) -> Either:
+        error = _first_failure(self._pair_checks, order, courier)
+        return Either.right(order) if error is None else Either.left(dict(error))
+
+    def allows(self, order: Order, courier: Courier) -> bool:
+        """Проходит ли пара все парные правила, без построения Either"""
+        for check, _, _ in self._pair_checks:
+            if not check(order, courier):
+                return False
+        return True
+
+    def validate(self, order: Order, couriers: Sequence[Courier] = ()) -> Either:
+        """Правила заказа, затем - есть ли курьер, проходящий парные правила"""
+        result = self.check_order(order)
+        if result.is_left() or not couriers or not self._pair_checks:
+            return result
+        error = None
+        for courier in couriers:
+            error = _first_failure(self._pair_checks, order, courier)
+            if error is None:
+                return result
+        return Either.left(dict(error))
+
+    def check_orders(self, orders: Sequence[Order]) -> Tuple[Either, ...]:
+        """Пакетная проверка: правило за правилом по еще не отклоненным заказам"""
+        errors: List[Any] = [None] * len(orders)
+        pending = range(len(orders))
+        for check, error, group in self._order_checks:
+            survivors = []
+            for i in pending:
+                if check(orders[i]):
+                    survivors.append(i)
+                else:
+                    errors[i] = error if group is None else _first_failure(group, orders[i])
+            pending = survivors
+            if not pending:
+                break
+        return tuple(Either.right(o) if e is None else Either.left(dict(e)) for o, e in zip(orders, errors, strict=True))
+
+    def check_pairs(self, pairs: Sequence[Tuple[Order, Courier]]) -> Tuple[Either, ...]:
+        """Пакетная проверка пар (заказ, курьер) парными правилами"""
+        errors: List[Any] = [None] * len(pairs)
+        pending = range(len(pairs))
+        for check, error, group in self._pair_checks:
+            survivors = []
+            for i in pending:
+                order, courier = pairs[i]
+                if check(order, courier):
+                    survivors.append(i)
+                else:
+                    errors[i] = error if group is None else _first_failure(group, order, courier)
+            pending = survivors
+            if not pending:
+                break
+        return tuple(Either.right(p[0]) if e is None else Either.left(dict(e)) for p, e in zip(pairs, errors, strict=True))
+
+
+DEFAULT_ORDER_RULES = (
+    Rule("max-total", "max_total", {"limit": 10000, "error": "Order too expensive"}),
+)
+DEFAULT_PAIR_RULES = (
+    Rule("bike-heavy", "vehicle_max_total",
+         {"vehicle": "bike", "limit": 5000, "error": "Heavy order cannot be delivered by bike"}),
+)
+
+# Скомпилированные наборы по идентичности кортежа правил: вызывающий код
+# обычно передает один и тот же кортеж, и компиляция происходит один раз
+_compiled: Dict[int, Tuple[Tuple[Rule, ...], RuleSet]] = {}
+_MAX_COMPILED = 64
+
+
+def compile_rules(rules: Tuple[Rule, ...]) -> RuleSet:
+    if not isinstance(rules, tuple):
+        return RuleSet(rules)
+    entry = _compiled.get(id(rules))
+    if entry is not None and entry[0] is rules:
+        return entry[1]
+    ruleset = RuleSet(rules)
+    if len(_compiled) >= _MAX_COMPILED:
+        _compiled.pop(next(iter(_compiled)))
+    # Кортеж хранится вместе с набором, чтобы его id не переиспользовался
+    _compiled[id(rules)] = (rules, ruleset)
+    return ruleset
+
+
+DEFAULT_ORDER_RULESET = compile_rules(DEFAULT_ORDER_RULES)
+DEFAULT_PAIR_RULESET = compile_rules(DEFAULT_PAIR_RULES)
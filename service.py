@@ -1,24 +1,69 @@
-from functools import reduce
-from typing import Tuple
-from .domain import Order, Slot
-from .transforms import add_order, assign_slot, total_revenue
+from dataclasses import replace
+from typing import Dict, Optional, Tuple
+from .aggregates import Aggregates
+from .domain import Order, Restaurant, Slot
+from .ftypes import Either
+from .intervals import SlotIndex, check_slot
+from .transforms import add_order, assign_slot
+from .persistent import PMap, PVector
+from .store import as_store
 
 
 class DeliveryService:
-    def __init__(self, orders: Tuple[Order, ...], slots: Tuple[Slot, ...]):
-        self.orders = orders
-        self.slots = slots
+    def __init__(self, orders: Tuple[Order, ...], slots: Tuple[Slot, ...],
+                 restaurants: Tuple[Restaurant, ...] = (), aggregates: Optional[Aggregates] = None,
+                 slot_index: Optional[SlotIndex] = None):
+        # Заказы и слоты хранятся в персистентных коллекциях: новая версия
+        # сервиса разделяет с предыдущей всю неизменившуюся структуру
+        self.orders = as_store(orders)
+        self.slots = slots if isinstance(slots, PVector) else PVector(slots)
+        if aggregates is None:
+            zones = {}
+            for r in restaurants:
+                zones.setdefault(r.id, r.zone)
+            aggregates = Aggregates.from_orders(self.orders, PMap(zones))
+        # Агрегаты ведутся вместе с заказами: чтение для дашборда - O(1)
+        self.aggregates = aggregates
+        self.slot_index = SlotIndex(self.slots) if slot_index is None else slot_index
 
     def place_order(self, order: Order) -> 'DeliveryService':
         new_orders = add_order(self.orders, order)
-        return DeliveryService(new_orders, self.slots)
+        return DeliveryService(new_orders, self.slots, aggregates=self.aggregates.add(order),
+                               slot_index=self.slot_index)
+
+    def update_status(self, order_id: str, status: str) -> 'DeliveryService':
+        """Переход заказа в новый статус; KeyError для неизвестного id"""
+        old = self.orders.get(order_id)
+        if old is None:
+            raise KeyError(order_id)
+        new = replace(old, status=status)
+        return DeliveryService(self.orders.update(new), self.slots,
+                               aggregates=self.aggregates.replace(old, new), slot_index=self.slot_index)
 
     def assign_courier_slot(self, slot: Slot) -> 'DeliveryService':
+        """Добавляет слот; ValueError, если он пересекается со слотами того же курьера"""
+        checked = check_slot(self.slot_index, slot)
+        if checked.is_left():
+            raise ValueError(checked.error["error"])
         new_slots = assign_slot(self.slots, slot)
-        return DeliveryService(self.orders, new_slots)
+        return DeliveryService(self.orders, new_slots, aggregates=self.aggregates,
+                               slot_index=self.slot_index.add(slot))
+
+    def check_slot(self, slot: Slot) -> Either:
+        """Either-вариант проверки слота без изменения сервиса"""
+        return check_slot(self.slot_index, slot)
 
     def get_revenue(self) -> int:
-        return total_revenue(self.orders)
+        return self.aggregates.revenue
+
+    def get_status_counts(self) -> Dict[str, int]:
+        return dict(self.aggregates.status_counts.items())
+
+    def get_revenue_by_restaurant(self) -> Dict[str, int]:
+        return dict(self.aggregates.rest_revenue.items())
+
+    def get_revenue_by_zone(self) -> Dict[str, int]:
+        return dict(self.aggregates.zone_revenue.items())
 
     def get_orders_by_status(self, status: str) -> Tuple[Order, ...]:
-        return tuple(filter(lambda o: o.status == status, self.orders))
\ No newline at end of file
+        return tuple(self.orders.by_status(status))
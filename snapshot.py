@@ -0,0 +1,295 @@
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from typing import Callable, Dict, List, Optional, Tuple
+from .domain import Restaurant, MenuItem, Order, Courier, Slot
+
+# Формат снапшота (little-endian):
+#   заголовок | смещения строк (Q * (n+1)) | байты строк (UTF-8) | выравнивание до 8
+#   | рестораны | позиции меню | заказы | позиции заказов | курьеры | слоты
+# Все записи фиксированной ширины, строки хранятся индексами в таблице строк.
+# С версии 2 заголовок хранит размер и SHA-256 seed, из которого собран снапшот.
+MAGIC = b"FSDSNAP1"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sI7IQQ32s")
+_HEADERS = {1: struct.Struct("<8sI7IQ"), VERSION: _HEADER}
+_VERSION = struct.Struct("<I")
+_RESTAURANT = struct.Struct("<III")
+_MENU_ITEM = struct.Struct("<IIIqI")
+_ORDER = struct.Struct("<IIqIIQI")
+_ITEM = struct.Struct("<Iq")
+_COURIER = struct.Struct("<IIII")
+_SLOT = struct.Struct("<IIII")
+_OFFSET = struct.Struct("<Q")
+
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[bytes] = []
+
+    def __call__(self, value: str) -> int:
+        idx = self.index.get(value)
+        if idx is None:
+            idx = self.index[value] = len(self.strings)
+            self.strings.append(value.encode("utf-8"))
+        return idx
+
+
+def file_digest(path) -> str:
+    """SHA-256 содержимого файла (hex), чтение блоками по 1 МБ"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_snapshot(path, restaurants: Tuple[Restaurant, ...], menu_items: Tuple[MenuItem, ...],
+                   orders: Tuple[Order, ...], couriers: Tuple[Courier, ...], slots: Tuple[Slot, ...],
+                   seed_size: int = 0, seed_digest: str = "") -> None:
+    """Записывает датасет в бинарный снапшот (атомарно, через временный файл).
+
+    seed_size и seed_digest (SHA-256 в hex) описывают исходный seed: по ним
+    load_cached проверяет, что снапшот собран из того же содержимого.
+    """
+    s = _StringTable()
+    rest_rows = b"".join(_RESTAURANT.pack(s(r.id), s(r.name), s(r.zone)) for r in restaurants)
+    menu_rows = b"".join(_MENU_ITEM.pack(s(m.id), s(m.rest_id), s(m.name), m.price, m.prep_time)
+                         for m in menu_items)
+    order_rows = bytearray()
+    item_rows = bytearray()
+    n_items = 0
+    for o in orders:
+        order_rows += _ORDER.pack(s(o.id), s(o.rest_id), o.total, s(o.ts), s(o.status), n_items, len(o.items))
+        for menu_id, qty in o.items:
+            item_rows += _ITEM.pack(s(menu_id), qty)
+        n_items += len(o.items)
+    courier_rows = b"".join(_COURIER.pack(s(c.id), s(c.name), s(c.vehicle), s(c.zone)) for c in couriers)
+    slot_rows = b"".join(_SLOT.pack(s(sl.id), s(sl.courier_id), s(sl.start), s(sl.end)) for sl in slots)
+
+    offsets = [0]
+    for raw in s.strings:
+        offsets.append(offsets[-1] + len(raw))
+    blob = b"".join(s.strings)
+    header = _HEADER.pack(MAGIC, VERSION, len(s.strings), len(restaurants), len(menu_items), len(orders),
+                          n_items, len(couriers), len(slots), len(blob), seed_size, bytes.fromhex(seed_digest))
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            f.write(blob)
+            f.write(b"\0" * (-len(blob) % 8))
+            for rows in (rest_rows, menu_rows, order_rows, item_rows, courier_rows, slot_rows):
+                f.write(rows)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Недописанный временный файл не должен оставаться рядом со снапшотом
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _Records(Sequence):
+    """Ленивая последовательность записей: объект создается при первом обращении.
+
+    Собранные записи запоминаются, поэтому повторные проходы не распаковывают
+    их заново, а в памяти оказываются только затронутые записи.
+    """
+
+    def __init__(self, count: int, get: Callable[[int], object]):
+        self._count = count
+        self._get = get
+        self._items: Optional[list] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _item(self, i: int):
+        items = self._items
+        if items is None:
+            items = self._items = [None] * self._count
+        item = items[i]
+        if item is None:
+            item = items[i] = self._get(i)
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._item(i) for i in range(*index.indices(self._count)))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot record index out of range")
+        return self._item(index)
+
+    def __iter__(self):
+        item = self._item
+        for i in range(self._count):
+            yield item(i)
+
+
+class Snapshot:
+    """Снапшот, отображенный в память через mmap.
+
+    Заголовок читается при открытии, а объекты Order и остальные записи
+    собираются только при обращении к ним, поэтому открытие не зависит
+    от размера датасета.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # Пустой или короткий файл: mmap и unpack_from дали бы другие исключения
+        head = self._file.read(len(MAGIC) + _VERSION.size)
+        if len(head) < len(MAGIC) + _VERSION.size or head[:len(MAGIC)] != MAGIC:
+            self._file.close()
+            raise ValueError(f"Not a snapshot file: {path}")
+        version, = _VERSION.unpack_from(head, len(MAGIC))
+        header = _HEADERS.get(version)
+        if header is None or size < header.size:
+            self._file.close()
+            raise ValueError(f"Unsupported snapshot version {version}: {path}")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (_, version, n_strings, n_rest, n_menu, n_orders, n_items,
+         n_couriers, n_slots, blob_size, *seed) = header.unpack_from(self._mm, 0)
+        # Снапшоты версии 1 не знают своего seed
+        self.seed_size, seed_digest = seed or (0, b"")
+        self.seed_digest = seed_digest.hex() if any(seed_digest) else ""
+
+        self._offsets_at = header.size
+        self._blob_at = self._offsets_at + (n_strings + 1) * _OFFSET.size
+        pos = self._blob_at + blob_size + (-blob_size % 8)
+        starts = []
+        for count, record in ((n_rest, _RESTAURANT), (n_menu, _MENU_ITEM), (n_orders, _ORDER),
+                              (n_items, _ITEM), (n_couriers, _COURIER), (n_slots, _SLOT)):
+            starts.append(pos)
+            pos += count * record.size
+        if pos > size:
+            self.close()
+            raise ValueError(f"Truncated snapshot file: {path}")
+        self._rest_at, self._menu_at, self._orders_at, self._items_at, self._couriers_at, self._slots_at = starts
+        self._strings: Dict[int, str] = {}
+        self._n_strings = n_strings
+        self._n_items = n_items
+
+        self.restaurants = _Records(n_rest, self._restaurant)
+        self.menu_items = _Records(n_menu, self._menu_item)
+        self.orders = _Records(n_orders, self._order)
+        self.couriers = _Records(n_couriers, self._courier)
+        self.slots = _Records(n_slots, self._slot)
+
+    def _str(self, idx: int) -> str:
+        value = self._strings.get(idx)
+        if value is None:
+            start, end = struct.unpack_from("<QQ", self._mm, self._offsets_at + idx * _OFFSET.size)
+            value = self._strings[idx] = self._mm[self._blob_at + start:self._blob_at + end].decode("utf-8")
+        return value
+
+    def _restaurant(self, i: int) -> Restaurant:
+        id_, name, zone = _RESTAURANT.unpack_from(self._mm, self._rest_at + i * _RESTAURANT.size)
+        s = self._str
+        return Restaurant(s(id_), s(name), s(zone))
+
+    def _menu_item(self, i: int) -> MenuItem:
+        id_, rest_id, name, price, prep_time = _MENU_ITEM.unpack_from(self._mm, self._menu_at + i * _MENU_ITEM.size)
+        s = self._str
+        return MenuItem(s(id_), s(rest_id), s(name), price, prep_time)
+
+    def _order(self, i: int) -> Order:
+        id_, rest_id, total, ts, status, items_start, n_items = _ORDER.unpack_from(
+            self._mm, self._orders_at + i * _ORDER.size)
+        s = self._str
+        at = self._items_at + items_start * _ITEM.size
+        items = tuple((s(menu_id), qty) for menu_id, qty in _ITEM.iter_unpack(self._mm[at:at + n_items * _ITEM.size]))
+        return Order(s(id_), s(rest_id), items, total, s(ts), s(status))
+
+    def _courier(self, i: int) -> Courier:
+        fields = _COURIER.unpack_from(self._mm, self._couriers_at + i * _COURIER.size)
+        return Courier(*map(self._str, fields))
+
+    def _slot(self, i: int) -> Slot:
+        fields = _SLOT.unpack_from(self._mm, self._slots_at + i * _SLOT.size)
+        return Slot(*map(self._str, fields))
+
+    def _all_strings(self) -> List[str]:
+        mm, blob_at = self._mm, self._blob_at
+        offsets = struct.unpack_from(f"<{self._n_strings + 1}Q", mm, self._offsets_at)
+        blob = mm[blob_at:blob_at + offsets[-1]]
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self._n_strings)]
+
+    def _rows(self, at: int, record: struct.Struct, count: int):
+        return record.iter_unpack(self._mm[at:at + count * record.size])
+
+    def materialize(self) -> tuple:
+        """Все записи кортежами за один проход: блоки распаковываются iter_unpack целиком"""
+        s = self._all_strings()
+        items = [(s[menu_id], qty) for menu_id, qty in self._rows(self._items_at, _ITEM, self._n_items)]
+        return (
+            tuple(Restaurant(s[a], s[b], s[c]) for a, b, c in self._rows(self._rest_at, _RESTAURANT, len(self.restaurants))),
+            tuple(MenuItem(s[a], s[b], s[c], price, prep) for a, b, c, price, prep
+                  in self._rows(self._menu_at, _MENU_ITEM, len(self.menu_items))),
+            tuple(Order(s[id_], s[rest_id], tuple(items[start:start + n]), total, s[ts], s[status])
+                  for id_, rest_id, total, ts, status, start, n in self._rows(self._orders_at, _ORDER, len(self.orders))),
+            tuple(Courier(s[a], s[b], s[c], s[d]) for a, b, c, d in self._rows(self._couriers_at, _COURIER, len(self.couriers))),
+            tuple(Slot(s[a], s[b], s[c], s[d]) for a, b, c, d in self._rows(self._slots_at, _SLOT, len(self.slots))),
+        )
+
+    def as_tuple(self) -> tuple:
+        """(restaurants, menu_items, orders, couriers, slots), заказы остаются ленивыми"""
+        return self.restaurants, self.menu_items, self.orders, self.couriers, self.slots
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def snapshot_path_for(seed_path) -> str:
+    return f"{os.fspath(seed_path)}.snap"
+
+
+def load_cached(seed_path, snapshot_path=None, digest: Optional[str] = None) -> tuple:
+    """Датасет через снапшот рядом с seed-файлом: быстрый старт вместо разбора JSON.
+
+    Снапшот пересобирается из seed, если его нет, он поврежден или собран
+    из другого содержимого: размер и SHA-256 seed сверяются с заголовком.
+    digest - уже посчитанный SHA-256 seed, чтобы не читать файл повторно.
+    Ошибка записи (например, каталог только для чтения) не мешает загрузке.
+
+    Возвращает (restaurants, menu_items, orders, couriers, slots). Из
+    актуального снапшота это ленивые последовательности Snapshot: запись
+    собирается при первом обращении, а файл остается отображенным, пока они
+    живы. После пересборки из seed - кортежи.
+    """
+    from .loader import load_seed_file
+
+    snapshot_path = snapshot_path or snapshot_path_for(seed_path)
+    seed_size = os.stat(seed_path).st_size
+    digest = digest or file_digest(seed_path)
+    try:
+        snap = Snapshot(snapshot_path)
+    except (OSError, ValueError):
+        pass
+    else:
+        if (snap.seed_size, snap.seed_digest) == (seed_size, digest):
+            return snap.as_tuple()
+        snap.close()
+    data = load_seed_file(seed_path)
+    try:
+        write_snapshot(snapshot_path, *data, seed_size=seed_size, seed_digest=digest)
+    except OSError:
+        pass
+    return data
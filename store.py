@@ -0,0 +1,236 @@
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .domain import Order
+from .persistent import PMap, PVector
+from .timeindex import TimeIndex, Timestamp
+
+_NO_TAIL = PVector()
+
+
+class OrderStore(Sequence):
+    """Неизменяемая коллекция заказов с хеш-индексами по id, rest_id и status.
+
+    Ведет себя как Tuple[Order, ...]: поддерживает len, итерацию, индексацию
+    и срезы, поэтому ее можно передавать везде, где ожидается кортеж заказов.
+    Заказы и индексы лежат в персистентных PVector/PMap, так что добавление
+    и замена заказа стоят O(log n), а старые версии хранилища не меняются.
+    Группы по rest_id и status хранят PMap позиция -> заказ: update переносит
+    заказ между группами, и в индексах хранится только текущая версия.
+    Кортеж группы в порядке хранилища кэшируется, add дописывает его хвост.
+    """
+
+    __slots__ = ("_orders", "_by_id", "_pos", "_by_rest", "_by_status", "_ts_index", "_updated")
+
+    def __init__(self, orders: Iterable[Order] = ()):
+        orders = tuple(orders)
+        by_id = {}
+        pos = {}
+        by_rest = {}
+        by_status = {}
+        for i, order in enumerate(orders):
+            if order.id not in by_id:
+                by_id[order.id] = order
+                pos[order.id] = i
+            by_rest.setdefault(order.rest_id, []).append((i, order))
+            by_status.setdefault(order.status, []).append((i, order))
+        self._orders = PVector(orders)
+        self._by_id = PMap(by_id)
+        self._pos = PMap(pos)
+        self._by_rest = PMap((k, _Group.of(v)) for k, v in by_rest.items())
+        self._by_status = PMap((k, _Group.of(v)) for k, v in by_status.items())
+        self._ts_index = None
+        # Были ли замены через update: только тогда индекс времени сверяется с _by_id
+        self._updated = False
+
+    # Интерфейс последовательности
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[Order]:
+        return iter(self._orders)
+
+    def __getitem__(self, index):
+        return self._orders[index]
+
+    def __contains__(self, order) -> bool:
+        found = self._by_id.get(getattr(order, "id", None))
+        return found is not None and (found == order or order in self._orders)
+
+    def __add__(self, other) -> 'OrderStore':
+        store = self
+        for order in other:
+            store = store.add(order)
+        return store
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, OrderStore):
+            return self._orders == other._orders
+        if isinstance(other, tuple):
+            return self._orders == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._orders)
+
+    def __repr__(self) -> str:
+        return f"OrderStore({len(self._orders)} orders)"
+
+    # Индексированные запросы
+    def get(self, oid: str) -> Optional[Order]:
+        """Заказ по id за O(1)"""
+        return self._by_id.get(oid)
+
+    def by_rest_id(self, rest_id: str) -> Tuple[Order, ...]:
+        """Заказы ресторана за O(k), кортеж в порядке хранилища"""
+        group = self._by_rest.get(rest_id)
+        return group.rows() if group is not None else ()
+
+    def by_status(self, status: str) -> Tuple[Order, ...]:
+        """Заказы с данным статусом за O(k), кортеж в порядке хранилища"""
+        group = self._by_status.get(status)
+        return group.rows() if group is not None else ()
+
+    def count_rest_id(self, rest_id: str) -> int:
+        """Число заказов ресторана за O(1), без сборки кортежа"""
+        return len(self._by_rest.get(rest_id, ()))
+
+    def count_status(self, status: str) -> int:
+        """Число заказов с данным статусом за O(1), без сборки кортежа"""
+        return len(self._by_status.get(status, ()))
+
+    @property
+    def has_ts_index(self) -> bool:
+        return self._ts_index is not None
+
+    def ts_index(self) -> TimeIndex:
+        """Индекс по времени; строится при первом запросе и дальше ведется в add"""
+        if self._ts_index is None:
+            self._ts_index = TimeIndex(self._orders)
+        return self._ts_index
+
+    def by_ts_range(self, start: Timestamp, end: Timestamp) -> Tuple[Order, ...]:
+        """Заказы с start <= ts <= end за O(log n + k), в порядке времени"""
+        return self._current(self.ts_index().range(start, end))
+
+    def in_last_minutes(self, minutes: int, now: Optional[Timestamp] = None) -> Tuple[Order, ...]:
+        return self._current(self.ts_index().last_minutes(minutes, now))
+
+    def in_store_order(self, orders: Iterable[Order]) -> Tuple[Order, ...]:
+        """Заказы хранилища, переупорядоченные по позиции в нем, за O(k log k)"""
+        pos = self._pos
+        return tuple(sorted(orders, key=lambda o: pos.get(o.id, -1)))
+
+    def _current(self, orders: Tuple[Order, ...]) -> Tuple[Order, ...]:
+        # Время заказа при update не меняется, поэтому позиция в индексе верна;
+        # индекс общий для версий, текущий заказ берется из _by_id
+        if not self._updated:
+            return orders
+        by_id = self._by_id
+        return tuple(by_id.get(o.id, o) for o in orders)
+
+    def as_tuple(self) -> Tuple[Order, ...]:
+        return tuple(self._orders)
+
+    def add(self, order: Order) -> 'OrderStore':
+        """Новая версия хранилища с добавленным заказом за O(log n)"""
+        store = OrderStore.__new__(OrderStore)
+        store._orders = self._orders.append(order)
+        pos = len(self._orders)
+        if order.id in self._by_id:
+            store._by_id, store._pos = self._by_id, self._pos
+        else:
+            store._by_id = self._by_id.set(order.id, order)
+            store._pos = self._pos.set(order.id, pos)
+        store._by_rest = _group_add(self._by_rest, order.rest_id, pos, order)
+        store._by_status = _group_add(self._by_status, order.status, pos, order)
+        store._ts_index = self._ts_index.add(order) if self._ts_index is not None else None
+        store._updated = self._updated
+        return store
+
+    def update(self, order: Order) -> 'OrderStore':
+        """Новая версия, где заказ с тем же id заменен на order, за O(log n).
+
+        Время заказа должно остаться прежним (меняются статус, состав и т.п.).
+        """
+        old = self._by_id.get(order.id)
+        if old is None:
+            raise KeyError(order.id)
+        if old.ts != order.ts:
+            raise ValueError(f"Order {order.id}: ts cannot change on update")
+        pos = self._pos[order.id]
+        store = OrderStore.__new__(OrderStore)
+        store._orders = self._orders.set(pos, order)
+        store._by_id = self._by_id.set(order.id, order)
+        store._pos = self._pos
+        store._by_rest = _group_move(self._by_rest, old.rest_id, order.rest_id, pos, order)
+        store._by_status = _group_move(self._by_status, old.status, order.status, pos, order)
+        store._ts_index = self._ts_index
+        store._updated = True
+        return store
+
+
+class _Group:
+    """Заказы одного rest_id или status.
+
+    members - PMap позиция -> заказ; rows - кэш кортежа в порядке позиций,
+    tail - заказы, дописанные add после построения кэша. Кэш заполняется
+    при чтении: после add это склейка за O(k), после update - сортировка.
+    """
+
+    __slots__ = ("members", "_rows", "_tail")
+
+    def __init__(self, members: PMap, rows: Optional[Tuple[Order, ...]], tail: PVector = _NO_TAIL):
+        self.members = members
+        self._rows = rows
+        self._tail = tail
+
+    @classmethod
+    def of(cls, items: List[Tuple[int, Order]]) -> '_Group':
+        """Группа из пар (позиция, заказ), уже упорядоченных по позиции"""
+        return cls(PMap(items), tuple(order for _, order in items))
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def rows(self) -> Tuple[Order, ...]:
+        if self._rows is None:
+            self._rows = tuple(order for _, order in sorted(self.members.items(), key=_position))
+        elif self._tail:
+            self._rows += tuple(self._tail)
+            self._tail = _NO_TAIL
+        return self._rows
+
+    def append(self, pos: int, order: Order) -> '_Group':
+        # Позиция add больше всех позиций группы: кэш дополняется хвостом
+        tail = self._tail.append(order) if self._rows is not None else _NO_TAIL
+        return _Group(self.members.set(pos, order), self._rows, tail)
+
+    def put(self, pos: int, order: Order) -> '_Group':
+        return _Group(self.members.set(pos, order), None)
+
+    def remove(self, pos: int) -> Optional['_Group']:
+        members = self.members.remove(pos)
+        return _Group(members, None) if members else None
+
+
+def _position(item: tuple) -> int:
+    return item[0]
+
+
+def _group_add(groups: PMap, key, pos: int, order: Order) -> PMap:
+    group = groups.get(key)
+    return groups.set(key, group.append(pos, order) if group is not None else _Group.of([(pos, order)]))
+
+
+def _group_move(groups: PMap, old_key, new_key, pos: int, order: Order) -> PMap:
+    """Заказ на позиции pos переходит из группы old_key в new_key (или заменяется в ней)"""
+    if old_key != new_key:
+        rest = groups[old_key].remove(pos)
+        groups = groups.set(old_key, rest) if rest is not None else groups.remove(old_key)
+    group = groups.get(new_key)
+    return groups.set(new_key, group.put(pos, order) if group is not None else _Group.of([(pos, order)]))
+
+
+def as_store(orders: Iterable[Order]) -> OrderStore:
+    """Оборачивает заказы в OrderStore, если они еще не проиндексированы"""
+    return orders if isinstance(orders, OrderStore) else OrderStore(orders)
@@ -0,0 +1,83 @@
+import pytest
+from core.aggregates import Aggregates
+from core.domain import Order, Restaurant
+from core.persistent import PMap
+from core.service import DeliveryService
+from core.store import OrderStore
+from core.transforms import total_revenue
+
+
+def _restaurants():
+    return (Restaurant("r1", "R1", "north"), Restaurant("r2", "R2", "south"))
+
+
+def _orders():
+    return (
+        Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed"),
+        Order("o2", "r2", (("m2", 1),), 1500, "2024-01-15 11:00:00", "delivered"),
+        Order("o3", "r1", (("m1", 2),), 2000, "2024-01-15 12:00:00", "placed"),
+    )
+
+
+def test_initial_aggregates():
+    """Тест агрегатов, посчитанных при создании сервиса"""
+    service = DeliveryService(_orders(), (), _restaurants())
+
+    assert service.get_revenue() == total_revenue(_orders()) == 4500
+    assert service.get_status_counts() == {"placed": 2, "delivered": 1}
+    assert service.get_revenue_by_restaurant() == {"r1": 3000, "r2": 1500}
+    assert service.get_revenue_by_zone() == {"north": 3000, "south": 1500}
+
+
+def test_place_order_updates_aggregates():
+    """Тест инкрементального обновления при place_order; старая версия не меняется"""
+    service = DeliveryService(_orders(), (), _restaurants())
+    new = service.place_order(Order("o4", "r2", (), 500, "2024-01-15 13:00:00", "assigned"))
+
+    assert new.get_revenue() == 5000
+    assert new.get_status_counts()["assigned"] == 1
+    assert new.get_revenue_by_zone() == {"north": 3000, "south": 2000}
+    assert service.get_revenue() == 4500
+    assert "assigned" not in service.get_status_counts()
+    assert new.aggregates == Aggregates.from_orders(new.orders, service.aggregates.zones)
+
+
+def test_update_status():
+    """Тест смены статуса: счетчики, индекс статусов и заказ в хранилище"""
+    service = DeliveryService(_orders(), (), _restaurants())
+    new = service.update_status("o1", "delivered")
+
+    assert new.get_status_counts() == {"placed": 1, "delivered": 2}
+    assert new.get_revenue() == 4500
+    assert [o.id for o in new.get_orders_by_status("delivered")] == ["o1", "o2"]
+    assert [o.id for o in new.get_orders_by_status("placed")] == ["o3"]
+    assert new.orders.get("o1").status == "delivered"
+    assert new.orders[0].status == "delivered"
+    assert [o.id for o in service.get_orders_by_status("placed")] == ["o1", "o3"]
+    with pytest.raises(KeyError):
+        service.update_status("missing", "delivered")
+
+
+def test_store_update_keeps_indexes_consistent():
+    """Тест замены заказа в OrderStore вместе с индексами"""
+    store = OrderStore(_orders())
+    store.ts_index()
+    updated = store.update(Order("o2", "r2", (("m2", 1),), 1500, "2024-01-15 11:00:00", "cancelled"))
+
+    assert [o.status for o in updated.by_rest_id("r2")] == ["cancelled"]
+    assert updated.by_status("delivered") == ()
+    assert updated.by_ts_range("2024-01-15 11:00:00", "2024-01-15 11:00:00")[0].status == "cancelled"
+    assert store.get("o2").status == "delivered"
+    with pytest.raises(ValueError):
+        store.update(Order("o2", "r2", (), 1500, "2024-01-16 11:00:00", "cancelled"))
+
+
+def test_counts_drop_to_zero():
+    """Тест удаления ключа, когда счетчик становится нулевым"""
+    aggregates = Aggregates.from_orders(_orders(), PMap({"r1": "north"}))
+    aggregates = aggregates.remove(_orders()[1])
+
+    assert "delivered" not in aggregates.status_counts
+    assert "r2" not in aggregates.rest_revenue
+    assert aggregates.count == 2
+    assert aggregates.status_count("placed") == 2
@@ -0,0 +1,122 @@
+import pytest
+from core.assignment import AvailabilityIndex, GREEDY, OPTIMAL, apply_assignment, assign_orders
+from core.domain import Courier, Order, Restaurant, Slot
+from core.service import DeliveryService
+
+
+def _order(oid, total=1000, rest_id="r1", ts="2024-01-15 10:30:00", status="placed"):
+    return Order(oid, rest_id, (("m1", 1),), total, ts, status)
+
+
+RESTAURANTS = (Restaurant("r1", "R1", "north"), Restaurant("r2", "R2", "south"))
+
+
+def test_index_by_zone_and_time():
+    """Тест индекса доступности: зона и покрытие времени слотом"""
+    couriers = (Courier("c1", "A", "car", "north"), Courier("c2", "B", "car", "south"))
+    slots = (Slot("s1", "c1", "10:00", "12:00"), Slot("s2", "c1", "13:00", "14:00"), Slot("s3", "c2", "10:00", "12:00"))
+    index = AvailabilityIndex(couriers, slots)
+
+    found = index.candidates("north", 10 * 3600 + 1800)
+    assert [index.units[i].slot_id for i in found] == ["s1"]
+    assert index.candidates("north", 12 * 3600 + 1800) == []
+    assert index.candidates("west", 10 * 3600) == []
+
+
+def test_index_overnight_slots_and_occupancy():
+    """Тест ночного слота через полночь и мест, занятых прошлыми назначениями"""
+    couriers = (Courier("c1", "A", "car", "north"), Courier("c2", "B", "car", "north"))
+    slots = (Slot("s1", "c1", "22:00", "02:00"), Slot("s2", "c2", "10:00", "12:00"))
+    index = AvailabilityIndex(couriers, slots, per_slot=2, occupied={"s2": 1})
+
+    assert [index.units[i].slot_id for i in index.candidates("north", 23 * 3600)] == ["s1", "s1"]
+    assert [index.units[i].slot_id for i in index.candidates("north", 3600)] == ["s1", "s1"]
+    assert index.candidates("north", 3 * 3600) == []
+    assert [index.units[i].slot_id for i in index.candidates("north", 11 * 3600)] == ["s2"]
+
+    orders = (_order("o1", ts="2024-01-15 10:30:00"), _order("o2", ts="2024-01-15 10:45:00"))
+    first = assign_orders(orders[:1], couriers, slots[1:], RESTAURANTS)
+    second = assign_orders(orders[1:], couriers, slots[1:], RESTAURANTS, existing=first.pairs)
+    assert first.by_order() == {"o1": "c2"}
+    assert second.unassigned == ("o2",)
+
+
+def test_respects_zone_vehicle_and_slots():
+    """Тест ограничений: зона ресторана, велосипед и тяжелый заказ, время слота"""
+    couriers = (Courier("c1", "A", "bike", "north"), Courier("c2", "B", "car", "south"))
+    slots = (Slot("s1", "c1", "10:00", "12:00"), Slot("s2", "c2", "10:00", "12:00"))
+    orders = (
+        _order("o1"),
+        _order("o2", total=8000),
+        _order("o3", rest_id="r2"),
+        _order("o4", rest_id="r2", ts="2024-01-15 15:00:00"),
+        _order("o5", status="delivered"),
+    )
+    result = assign_orders(orders, couriers, slots, RESTAURANTS)
+
+    assert result.by_order() == {"o1": "c1", "o3": "c2"}
+    assert sorted(result.unassigned) == ["o2", "o4"]
+    assert result.seconds >= 0
+
+
+def test_optimal_beats_greedy():
+    """Тест что оптимальный режим назначает не меньше заказов, чем жадный"""
+    couriers = (Courier("c1", "A", "car", "north"), Courier("c2", "B", "car", "north"))
+    slots = (Slot("s1", "c1", "10:00", "12:00"), Slot("s2", "c2", "10:00", "11:00"))
+    # o1 подходит к обоим слотам, o2 - только к s1 (после 11:00)
+    orders = (_order("o1", ts="2024-01-15 10:30:00"), _order("o2", ts="2024-01-15 11:30:00"))
+
+    optimal = assign_orders(orders, couriers, slots, RESTAURANTS, mode=OPTIMAL)
+    greedy = assign_orders(orders, couriers, slots, RESTAURANTS, mode=GREEDY)
+    assert optimal.by_order() == {"o1": "c2", "o2": "c1"}
+    assert len(greedy.pairs) <= len(optimal.pairs)
+    assert len({slot for _, _, slot in optimal.pairs}) == len(optimal.pairs)
+
+
+def test_optimal_on_larger_backlog():
+    """Тест максимального паросочетания на большом бэклоге"""
+    couriers = tuple(Courier(f"c{i}", "X", "car", "north") for i in range(30))
+    slots = tuple(Slot(f"s{i}", f"c{i}", f"{8 + i % 4:02d}:00", f"{10 + i % 5:02d}:00") for i in range(30))
+    orders = tuple(_order(f"o{i}", ts=f"2024-01-15 {8 + i % 6:02d}:15:00") for i in range(60))
+
+    optimal = assign_orders(orders, couriers, slots, RESTAURANTS, mode=OPTIMAL, per_slot=2)
+    greedy = assign_orders(orders, couriers, slots, RESTAURANTS, mode=GREEDY, per_slot=2)
+    assert len(greedy.pairs) <= len(optimal.pairs) <= 60
+    used = [(c, s) for _, c, s in optimal.pairs]
+    assert all(used.count(u) <= 2 for u in used)
+
+
+def test_greedy_checks_rules_per_courier_group():
+    """Тест: жадный режим не перебирает все пары и соблюдает правила и емкость"""
+    couriers = tuple(Courier(f"c{i}", "X", ("bike", "car")[i % 2], "north") for i in range(200))
+    slots = tuple(Slot(f"s{i}", f"c{i}", "23:00", "02:00") for i in range(200))
+    orders = tuple(_order(f"o{i}", total=9000 if i % 3 == 0 else 1000, ts=f"2024-01-15 {(23, 0, 1)[i % 3]:02d}:30:00")
+                   for i in range(300))
+    calls = []
+
+    class Counting:
+        def allows(self, order, courier):
+            calls.append(courier.id)
+            return courier.vehicle != "bike" or order.total <= 5000
+
+    result = assign_orders(orders, couriers, slots, RESTAURANTS, rules=Counting())
+    by_id = {c.id: c for c in couriers}
+    heavy = {o.id for o in orders if o.total > 5000}
+
+    assert len(calls) <= 2 * len(orders)
+    assert len(result.pairs) == 200
+    assert len({slot for _, _, slot in result.pairs}) == 200
+    assert all(by_id[c].vehicle == "car" for o, c, _ in result.pairs if o in heavy)
+
+
+def test_apply_assignment_and_errors():
+    """Тест перевода назначенных заказов в assigned и неизвестного режима"""
+    couriers = (Courier("c1", "A", "car", "north"),)
+    slots = (Slot("s1", "c1", "10:00", "12:00"),)
+    service = DeliveryService((_order("o1"), _order("o2")), slots, RESTAURANTS)
+    result = assign_orders(service.orders, couriers, slots, RESTAURANTS)
+
+    updated = apply_assignment(service, result)
+    assert updated.get_status_counts() == {"assigned": 1, "placed": 1}
+    with pytest.raises(ValueError):
+        assign_orders((), couriers, slots, RESTAURANTS, mode="random")
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+import pytest
+from core import batch
+from core.batch import compute_route_costs, acompute_route_costs, aiter_route_costs
+from core.cache import RouteCostCache
+from core.disk_cache import DiskRouteCache
+from core.domain import Order, Courier
+
+
+def _request(route_id, n_orders=2):
+    orders = tuple(Order(f"o{i}", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed") for i in range(n_orders))
+    return route_id, orders, (Courier("c1", "Alice", "bike", "north"),)
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Подменяет вычисление медленной функцией со счетчиком вызовов"""
+    calls = []
+    lock = threading.Lock()
+
+    def compute(key):
+        with lock:
+            calls.append(key[0])
+        time.sleep(0.05)
+        return {"route_id": key[0], "orders_count": len(key[1])}
+
+    monkeypatch.setattr(batch, "_compute", compute)
+    return calls
+
+
+def test_ordered_results_and_dedup(counted):
+    """Тест порядка результатов и дедупликации одинаковых запросов"""
+    requests = [_request("a"), _request("b", 3), _request("a"), _request("a")]
+
+    results = list(compute_route_costs(requests, max_workers=4, cache=RouteCostCache()))
+
+    assert [r["route_id"] for r in results] == ["a", "b", "a", "a"]
+    assert results[1]["orders_count"] == 3
+    assert sorted(counted) == ["a", "b"]
+
+
+def test_only_misses_are_computed(counted):
+    """Тест что попадания в кэш не вычисляются повторно"""
+    cache = RouteCostCache()
+    list(compute_route_costs([_request("a")], cache=cache))
+
+    list(compute_route_costs([_request("a"), _request("b")], cache=cache))
+
+    assert counted == ["a", "b"]
+    assert cache.stats().hits == 1
+
+
+def test_unordered_yields_indices(counted):
+    """Тест выдачи результатов по мере готовности"""
+    requests = [_request(f"r{i}") for i in range(5)] + [_request("r0")]
+
+    results = dict(compute_route_costs(requests, max_workers=3, ordered=False, cache=RouteCostCache()))
+
+    assert sorted(results) == list(range(6))
+    assert results[5]["route_id"] == "r0"
+    assert len(counted) == 5
+
+
+def test_async_variant(counted):
+    """Тест асинхронного API"""
+    requests = [_request("a"), _request("b"), _request("a")]
+
+    async def run():
+        ordered = await acompute_route_costs(requests, cache=RouteCostCache())
+        unordered = [i async for i, _ in aiter_route_costs(requests, ordered=False, cache=RouteCostCache())]
+        return ordered, unordered
+
+    ordered, unordered = asyncio.run(run())
+
+    assert [r["route_id"] for r in ordered] == ["a", "b", "a"]
+    assert sorted(unordered) == [0, 1, 2]
+
+
+def test_process_pool():
+    """Тест расчета в пуле процессов"""
+    results = list(compute_route_costs([_request("p1"), _request("p2", 1)], executor="process",
+                                       max_workers=2, cache=RouteCostCache()))
+
+    assert [r["orders_count"] for r in results] == [2, 1]
+
+
+def test_process_pool_sees_prep_times(monkeypatch):
+    """Тест: время готовности приходит в процесс вместе с ключом"""
+    from core import memo
+    from core.domain import MenuItem
+    from core.routing import CostModel
+
+    monkeypatch.setattr(memo, "cost_model", CostModel())
+    memo.register_menu((MenuItem("m1", "r1", "Soup", 300, 45),))
+    request = _request("prep", 1)
+    result, = compute_route_costs([request], executor="process", max_workers=1, cache=RouteCostCache())
+
+    assert batch._route_key(request)[3] == (45,)
+    assert result["duration"] >= 45
+
+
+def test_disk_tier_ttl_matches_single_calls(counted, tmp_path):
+    """Тест: пакетный расчет пишет на диск с TTL кэша, а запись с диска живет в памяти остаток срока"""
+    now = [1000.0]
+    disk = DiskRouteCache(tmp_path / "routes.sqlite", clock=lambda: now[0])
+    cache = RouteCostCache(ttl=10, backing=disk, clock=lambda: now[0])
+    key = batch._route_key(_request("a"))
+
+    list(compute_route_costs([_request("a")], cache=cache))
+    assert disk.get_entry(key)[1] == pytest.approx(10)
+
+    now[0] += 6
+    fresh = RouteCostCache(ttl=10, backing=disk, clock=lambda: now[0])
+    list(compute_route_costs([_request("a")], cache=fresh))
+    assert counted == ["a"] and fresh.stats().backing_hits == 1
+
+    now[0] += 5
+    list(compute_route_costs([_request("a")], cache=fresh))
+    assert counted == ["a", "a"]
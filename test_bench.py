@@ -0,0 +1,58 @@
+import json
+from core.bench import bench_compose, bench_suite, compare, generate_seed, main, run_case, workload_sizes, write_seed
+from core.loader import load_seed_file
+from core.transforms import load_seed
+
+
+def test_generator_is_deterministic():
+    """Тест детерминированности генератора и схемы seed.json"""
+    first = generate_seed(500, seed=1)
+    assert first == generate_seed(500, seed=1)
+    assert first != generate_seed(500, seed=2)
+    assert {k: len(v) for k, v in first.items()} == workload_sizes(500)
+
+    restaurants, menu_items, orders, couriers, slots = load_seed(first)
+    assert len(orders) == 500
+    assert {o.rest_id for o in orders} <= {r.id for r in restaurants}
+
+
+def test_streamed_seed_file_matches(tmp_path):
+    """Тест потоковой записи: файл читается загрузчиком в те же объекты"""
+    path = tmp_path / "seed.json"
+    write_seed(str(path), 300)
+    assert load_seed_file(path) == load_seed(generate_seed(300))
+
+
+def test_run_case_metrics():
+    """Тест метрик замера: ops/s, перцентили, пиковая память"""
+    calls = []
+    result = run_case(lambda state: calls.append(sum(state)), lambda: list(range(1000)), ops=1000, repeat=4, warmup=2)
+
+    assert len(calls) == 2 + 4 + 1
+    assert set(result) == {"ops", "ops_per_s", "p50_ms", "p99_ms", "mean_ms", "peak_kib"}
+    assert result["p50_ms"] <= result["p99_ms"]
+    assert result["ops_per_s"] > 0
+
+
+def test_compare_against_baseline(tmp_path):
+    """Тест сравнения с базовым прогоном и кода возврата CLI"""
+    results = bench_suite(200, repeat=2, warmup=0, cases=["total_revenue"])
+    slower = {"cases": {"total_revenue": dict(results["cases"]["total_revenue"])}}
+    slower["cases"]["total_revenue"]["p50_ms"] = results["cases"]["total_revenue"]["p50_ms"] / 10
+
+    assert compare(results, results) == []
+    assert compare(results, slower)[0]["case"] == "total_revenue"
+
+    baseline = tmp_path / "base.json"
+    baseline.write_text(json.dumps(slower))
+    assert main(["suite", "--n", "200", "--repeat", "2", "--case", "total_revenue",
+                 "--baseline", str(baseline)]) == 1
+
+
+def test_bench_compose():
+    """Тест сравнения скомпилированного конвейера с вложенными вызовами"""
+    result = bench_compose(2000)
+
+    assert set(result) == {"nested_s", "compiled_s", "compile_s", "speedup", "nested_result", "compiled_result"}
+    assert result["compiled_result"] == result["nested_result"] > 0
+    assert result["speedup"] > 0
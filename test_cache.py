@@ -0,0 +1,96 @@
+from core.cache import RouteCostCache, cached, MISSING
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _key(route_id, order_ids=("o1",), courier_ids=("c1",)):
+    return (route_id, order_ids, courier_ids)
+
+
+def test_lru_eviction_by_entries():
+    """Тест вытеснения LRU по числу записей"""
+    cache = RouteCostCache(max_entries=2)
+    cache.put(_key("a"), 1)
+    cache.put(_key("b"), 2)
+    cache.get(_key("a"))
+    cache.put(_key("c"), 3)
+
+    assert _key("b") not in cache
+    assert cache.get(_key("a")) == 1
+    assert cache.stats().evictions == 1
+
+
+def test_lfu_eviction():
+    """Тест вытеснения LFU: остается часто используемая запись"""
+    cache = RouteCostCache(max_entries=2, policy="lfu")
+    cache.put(_key("a"), 1)
+    cache.put(_key("b"), 2)
+    for _ in range(3):
+        cache.get(_key("b"))
+    cache.get(_key("a"))
+    cache.put(_key("c"), 3)
+
+    assert _key("a") not in cache
+    assert _key("b") in cache
+    assert _key("c") in cache
+
+
+def test_eviction_by_bytes():
+    """Тест ограничения по приблизительному объему"""
+    cache = RouteCostCache(max_entries=None, max_bytes=2000)
+    for i in range(50):
+        cache.put(_key(f"r{i}"), {"route_id": f"r{i}", "cost": i})
+
+    stats = cache.stats()
+    assert 0 < stats.entries < 50
+    assert stats.size_bytes <= 2000
+
+
+def test_ttl_expiry():
+    """Тест истечения срока жизни записи"""
+    clock = FakeClock()
+    cache = RouteCostCache(ttl=10, clock=clock)
+    cache.put(_key("a"), 1)
+    cache.put(_key("b"), 2, ttl=100)
+
+    clock.now = 50
+    assert cache.get(_key("a")) is MISSING
+    assert cache.get(_key("b")) == 2
+    assert cache.stats().expirations == 1
+
+
+def test_invalidation_by_order_and_courier():
+    """Тест инвалидации по заказу и курьеру"""
+    cache = RouteCostCache()
+    cache.put(_key("a", ("o1", "o2"), ("c1",)), 1)
+    cache.put(_key("b", ("o2",), ("c2",)), 2)
+    cache.put(_key("c", ("o3",), ("c2",)), 3)
+
+    assert cache.invalidate_order("o2") == 2
+    assert len(cache) == 1
+    assert cache.invalidate_courier("c2") == 1
+    assert len(cache) == 0
+    assert cache.stats().invalidations == 3
+
+
+def test_cached_decorator_counts_hits():
+    """Тест декоратора cached и статистики попаданий"""
+    calls = []
+
+    @cached(RouteCostCache())
+    def compute(route_id, order_ids, courier_ids):
+        calls.append(route_id)
+        return {"route_id": route_id}
+
+    compute("r1", ("o1",), ("c1",))
+    compute("r1", ("o1",), ("c1",))
+
+    assert calls == ["r1"]
+    assert compute.cache_info().hits == 1
+    assert compute.cache.stats().hit_ratio == 0.5
@@ -0,0 +1,90 @@
+import json
+from core.categorical import Categories, MISSING_CODE, Vocabulary, group_sum
+from core.domain import Restaurant, Order
+from core.frame import OrderFrame
+from core.loader import make_builders, load_seed_file
+
+
+def test_codes_roundtrip():
+    """Тест двунаправленного словаря: код <-> значение"""
+    cats = Categories("color", ("red", "green"))
+    assert cats.code("red") == 0
+    assert cats.code("blue") == 2
+    assert cats.value(2) == "blue"
+    assert cats.get_code("missing") is None
+    assert "missing" not in cats
+    assert cats.decode(cats.encode(["green", "red", "blue"])) == ("green", "red", "blue")
+
+
+def test_intern_returns_canonical_object():
+    """Тест интернирования: равные строки становятся одним объектом"""
+    cats = Categories("zone")
+    a = "".join(["no", "rth"])
+    b = "".join(["nor", "th"])
+    assert a is not b
+    assert cats.intern(a) is cats.intern(b)
+
+
+def test_code_width():
+    """Тест расширения колонки кодов: байт до 255 значений, затем 'H'"""
+    cats = Categories("many", (str(i) for i in range(MISSING_CODE)))
+    assert cats.encode(["0", "254"]).typecode == 'B'
+    assert cats.code("overflow") == MISSING_CODE
+    column = cats.encode(["0", "overflow"])
+    assert column.typecode == 'H'
+    assert cats.decode(column) == ("0", "overflow")
+
+
+def test_loader_interns_categoricals():
+    """Тест интернирования зон, статусов и транспорта при загрузке"""
+    vocab = Vocabulary()
+    builders = make_builders(vocab)
+    r = builders["restaurants"]({"id": "r1", "name": "R", "zone": "".join(["cen", "ter"])})
+    c = builders["couriers"]({"id": "c1", "name": "C", "vehicle": "".join(["bi", "ke"]), "zone": "".join(["ce", "nter"])})
+    o = builders["orders"]({"id": "o1", "rest_id": "r1", "items": [["m1", 1]], "total": 100,
+                            "ts": "2024-01-15 10:00:00", "status": "".join(["pla", "ced"])})
+    assert r.zone is c.zone is vocab.zones.intern("center")
+    assert o.status is vocab.statuses.intern("placed")
+    assert c.vehicle == "bike"
+    assert vocab.zones.values == ("center",)
+
+
+def test_many_zones_load_per_dataset(tmp_path):
+    """Тест: seed с 300 зонами загружается, а словари не общие между загрузками"""
+    seed = tmp_path / "seed.json"
+    seed.write_text(json.dumps({
+        "restaurants": [{"id": f"r{i}", "name": "R", "zone": f"z{i}"} for i in range(300)],
+        "orders": [{"id": f"o{i}", "rest_id": f"r{i}", "items": [], "total": i, "ts": "2024-01-15 10:00:00",
+                    "status": "placed"} for i in range(300)],
+    }), encoding="utf-8")
+
+    restaurants, _, orders, _, _ = load_seed_file(seed)
+    again = load_seed_file(seed)[0]
+    assert len({r.zone for r in restaurants}) == 300
+    assert Vocabulary().zones.values == ()
+
+    frame = OrderFrame.from_orders(orders, restaurants + again)
+    assert frame.zone.typecode == 'H'
+    assert [o.id for o in frame.select(frame.zone_mask("z299"))] == ["o299"]
+    assert frame.revenue_by_zone()["z299"] == 299
+
+
+def test_frame_zone_codes():
+    """Тест зонной колонки OrderFrame и группировки по кодам"""
+    restaurants = (Restaurant("r1", "R1", "north"), Restaurant("r2", "R2", "south"))
+    orders = (
+        Order("o1", "r1", (), 1000, "2024-01-15 10:00:00", "placed"),
+        Order("o2", "r2", (), 2000, "2024-01-15 11:00:00", "placed"),
+        Order("o3", "r1", (), 500, "2024-01-15 12:00:00", "delivered"),
+        Order("o4", "rx", (), 700, "2024-01-15 12:00:00", "delivered"),
+    )
+    frame = OrderFrame.from_orders(orders, restaurants)
+
+    assert frame.zone.itemsize == 1
+    assert frame.zones == ("north", "south")
+    assert [o.id for o in frame.select(frame.zone_mask("north"))] == ["o1", "o3"]
+    assert frame.zone[3] == MISSING_CODE
+    assert frame.revenue_by_zone() == {"north": 1500, "south": 2000}
+    assert frame.revenue_by_zone(frame.status_mask("placed")) == {"north": 1000, "south": 2000}
+    assert frame.zone_mask("nowhere").count(1) == 0
+    assert group_sum([0, 1, 0], [5, 6, 7], 2) == [12, 6]
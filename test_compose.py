@@ -0,0 +1,75 @@
+from core.compose import Pipeline, compose, each, keep, metrics_hook, pipe
+from core.domain import Order
+from core.filters import by_restaurant, by_status, by_total_range
+from core.metrics import Registry
+from core.transforms import filter_orders, map_orders, total_revenue
+
+
+def _orders(n=50):
+    return tuple(Order(f"o{i}", f"r{i % 3}", (("m1", 1),), 100 * i, f"2024-01-01T10:{i % 60:02d}:00",
+                       "placed" if i % 2 else "delivered") for i in range(n))
+
+
+def test_compose_and_pipe_order():
+    """Тест порядка применения функций"""
+    def inc(x):
+        return x + 1
+
+    def double(x):
+        return x * 2
+
+    assert compose(inc, double)(5) == 11
+    assert pipe(inc, double)(5) == 12
+    assert compose()(7) == 7
+
+
+def test_pipeline_matches_nested_calls():
+    """Тест: скомпилированный конвейер равен вложенным вызовам transforms"""
+    orders = _orders()
+    pipeline = Pipeline(by_restaurant("r1"), by_status("placed"), by_total_range(500, 4000),
+                        each(lambda o: o.total // 100), sum)
+    nested = sum(map_orders(filter_orders(filter_orders(filter_orders(
+        orders, by_restaurant("r1")), by_status("placed")), by_total_range(500, 4000)), lambda o: o.total // 100))
+
+    assert pipeline(orders) == nested
+    assert Pipeline(keep(lambda o: o.total > 1000), total_revenue)(orders) == sum(o.total for o in orders[11:])
+
+
+def test_consecutive_predicates_fused():
+    """Тест слияния соседних предикатов и подстановки их выражениями"""
+    pipeline = Pipeline(by_restaurant("r1"), by_status("placed"), each(lambda o: o.id), keep(lambda i: i != "o1"))
+    pipeline.compile()
+
+    assert [s.kind for s in pipeline.stages] == ["filter", "map", "filter"]
+    assert "x.rest_id ==" in pipeline.source and "x.status ==" in pipeline.source
+    assert pipeline.source.count("for x in items") == 1
+    assert pipeline(_orders(10)) == ("o7",)
+
+
+def test_predicate_operators_compile():
+    """Тест: |, ~ и произвольные функции дают тот же результат, что и вызов предиката"""
+    p = (by_restaurant("r0") | by_total_range(4000, 4500)) & ~by_status("placed")
+    orders = _orders()
+
+    assert Pipeline(p)(orders) == tuple(filter(p, orders))
+    assert Pipeline(keep(str.isupper), each(str.lower, "lower"))(("A", "b")) == ("a",)
+
+
+def test_run_timed_hook():
+    """Тест пошаговых замеров: hook вызывается на каждый шаг с числом строк"""
+    calls = []
+    pipeline = Pipeline(by_restaurant("r1"), each(lambda o: o.total), sum)
+    result = pipeline.run_timed(_orders(9), lambda name, ns, rows: calls.append((name, rows)))
+
+    assert result == pipeline(_orders(9))
+    assert calls == [("rest_id == 'r1'", 3), ("<lambda>", 3), ("sum", 1)]
+
+
+def test_metrics_hook(monkeypatch):
+    """Тест записи времени шагов в реестр метрик"""
+    import core.metrics
+    registry = Registry(enabled=True)
+    monkeypatch.setattr(core.metrics, "REGISTRY", registry)
+    Pipeline(by_status("placed"), len).run_timed(_orders(), metrics_hook("p"))
+
+    assert set(registry.snapshot()["timers"]) == {"p.status == 'placed'", "p.len"}
@@ -0,0 +1,112 @@
+import threading
+import pytest
+from core import memo
+from core.cache import RouteCostCache, MISSING
+from core.disk_cache import DiskRouteCache, stable_key, known_routes, warm_up
+from core.domain import Order, Courier, Restaurant
+
+
+def _key(route_id, order_ids=("o1", "o2"), courier_ids=("c1",)):
+    return (route_id, order_ids, courier_ids)
+
+
+def test_stable_key():
+    """Тест что ключ не зависит от процесса и различает входные данные"""
+    assert stable_key(_key("r1")) == stable_key(_key("r1"))
+    assert stable_key(_key("r1")) != stable_key(_key("r1", ("o2", "o1")))
+    assert len(stable_key(_key("r1"))) == 64
+
+
+def test_disk_cache_shared_between_instances(tmp_path):
+    """Тест что значение видно другому экземпляру (как другому процессу)"""
+    path = tmp_path / "routes.sqlite"
+    writer = DiskRouteCache(path)
+    reader = DiskRouteCache(path)
+
+    writer.put(_key("r1"), {"cost": 100, "route_id": "r1"})
+
+    assert reader.get(_key("r1")) == {"cost": 100, "route_id": "r1"}
+    assert reader.get(_key("r2")) is MISSING
+    assert reader.invalidate_order("o2") == 1
+    assert len(writer) == 0
+
+
+def test_concurrent_writers(tmp_path):
+    """Тест конкурентной записи из нескольких потоков"""
+    disk = DiskRouteCache(tmp_path / "routes.sqlite")
+
+    def write(worker):
+        for i in range(20):
+            disk.put(_key(f"w{worker}-{i}"), {"cost": i})
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(disk) == 80
+
+
+def test_memory_tier_falls_back_to_disk(tmp_path):
+    """Тест что промах в памяти берется с диска без вычисления"""
+    disk = DiskRouteCache(tmp_path / "routes.sqlite")
+    disk.put(_key("r1"), {"cost": 7})
+    cache = RouteCostCache(backing=disk)
+    calls = []
+
+    value = cache.get_or_compute(_key("r1"), lambda: calls.append(1) or {"cost": 0})
+    computed = cache.get_or_compute(_key("r2"), lambda: {"cost": 9})
+
+    assert value == {"cost": 7}
+    assert calls == []
+    assert cache.stats().backing_hits == 1
+    assert disk.get(_key("r2")) == computed
+
+
+def test_warm_up(tmp_path, monkeypatch):
+    """Тест предварительного расчета известных маршрутов"""
+    restaurants = (Restaurant("r1", "R1", "north"),)
+    orders = (Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed"),)
+    couriers = (Courier("c1", "Alice", "bike", "north"), Courier("c2", "Bob", "car", "south"))
+    disk = DiskRouteCache(tmp_path / "routes.sqlite")
+    monkeypatch.setattr(memo, "route_cache", RouteCostCache(backing=disk))
+    monkeypatch.setattr(memo.compute_route_cost_cached, "cache", memo.route_cache)
+
+    routes = known_routes(restaurants, orders, couriers)
+
+    assert [r.id for r in routes] == ["c1-north"]
+    assert warm_up(routes, orders, couriers) == 1
+    assert len(disk) == 1
+
+
+def test_ttl_applies_with_disk_tier(tmp_path):
+    """Тест: истекшая в памяти запись не возвращается с диска со свежим TTL"""
+    now = [1000.0]
+    disk = DiskRouteCache(tmp_path / "routes.sqlite", clock=lambda: now[0])
+    cache = RouteCostCache(ttl=10, backing=disk, clock=lambda: now[0])
+    calls = []
+
+    cache.get_or_compute(_key("r1"), lambda: calls.append(1) or {"cost": 1})
+    now[0] += 11
+    cache.get_or_compute(_key("r1"), lambda: calls.append(1) or {"cost": 2})
+
+    assert calls == [1, 1]
+    assert cache.stats().backing_hits == 0
+    assert disk.get(_key("r1")) == {"cost": 2}
+
+    now[0] += 5
+    assert disk.get_entry(_key("r1"))[1] == pytest.approx(5)
+    now[0] += 6
+    assert disk.get(_key("r1")) is MISSING
+
+
+def test_configure_route_cache_keeps_backing(tmp_path, monkeypatch):
+    """Тест: пересоздание общего кэша сохраняет дисковый уровень"""
+    disk = DiskRouteCache(tmp_path / "routes.sqlite")
+    monkeypatch.setattr(memo, "route_cache", RouteCostCache(backing=disk))
+    for attr in ("cache", "cache_clear", "cache_info"):
+        monkeypatch.setattr(memo.compute_route_cost_cached, attr, getattr(memo.compute_route_cost_cached, attr))
+
+    assert memo.configure_route_cache(max_entries=10).backing is disk
+    assert memo.configure_route_cache(max_entries=10, backing=None).backing is None
@@ -1,3 +1,4 @@
+import pickle
 import pytest
 from core.domain import Restaurant, Order, Courier, Slot
 
@@ -29,4 +30,27 @@ def test_slot_creation():
     """Тест создания Slot"""
     slot = Slot("s1", "c1", "10:00", "12:00")
     assert slot.courier_id == "c1"
-    assert slot.start == "10:00"
\ No newline at end of file
+    assert slot.start == "10:00"
+
+
+def test_order_slotted_with_cached_hash():
+    """Тест что Order без __dict__, хеш кэшируется и не попадает в сравнение"""
+    order = Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed")
+    same = Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed")
+
+    assert not hasattr(order, "__dict__")
+    assert hash(order) == hash(order) == hash(same)
+    assert order == same
+    assert order != Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "delivered")
+
+
+def test_slotted_objects_pickle():
+    """Тест сериализации слотовых объектов"""
+    order = Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed")
+    courier = Courier("c1", "Alice", "bike", "north")
+    hash(order)
+
+    assert pickle.loads(pickle.dumps(order)) == order
+    assert hash(pickle.loads(pickle.dumps(courier))) == hash(courier)
+    assert pickle.loads(pickle.dumps(Restaurant("r1", "R", "north"))).zone == "north"
+
@@ -0,0 +1,79 @@
+import os
+import pytest
+from core.domain import Order, Restaurant, Slot
+from core.events import EventLog, EventSourcedService, LOG_NAME, apply_event, order_placed, replay_throughput
+from core.service import DeliveryService
+
+
+def _order(i, status="placed"):
+    return Order(f"o{i}", "r1", (("m1", 1),), 100 * i, "2024-01-15 10:00:00", status)
+
+
+def _restaurants():
+    return (Restaurant("r1", "R1", "north"),)
+
+
+def test_apply_event_is_pure():
+    """Тест перехода состояния по событию"""
+    service = DeliveryService((), ())
+    event = order_placed(_order(1), "2024-01-15 10:00:00")
+
+    new = apply_event(service, event)
+    assert [o.id for o in new.orders] == ["o1"]
+    assert new.orders[0] == _order(1)
+    assert len(service.orders) == 0
+
+
+def test_commands_are_logged_and_replayed(tmp_path):
+    """Тест журнала: после переоткрытия состояние восстанавливается из событий"""
+    with EventSourcedService(tmp_path, _restaurants(), snapshot_every=100) as es:
+        es.place_order(_order(1))
+        es.place_order(_order(2))
+        es.assign_courier_slot(Slot("s1", "c1", "10:00", "12:00"))
+        es.update_status("o1", "delivered")
+
+    with EventSourcedService(tmp_path) as es:
+        assert es.seq == 4
+        assert es.replay_stats.events == 4
+        assert es.service.get_status_counts() == {"placed": 1, "delivered": 1}
+        assert es.service.get_revenue() == 300
+        assert [s.id for s in es.service.slots] == ["s1"]
+
+
+def test_recovery_starts_from_latest_snapshot(tmp_path):
+    """Тест что воспроизводятся только события после последнего снапшота"""
+    with EventSourcedService(tmp_path, _restaurants(), snapshot_every=5) as es:
+        for i in range(12):
+            es.place_order(_order(i))
+
+    with EventSourcedService(tmp_path) as es:
+        assert es.replay_stats.snapshot_seq == 10
+        assert es.replay_stats.events == 2
+        assert len(es.service.orders) == 12
+        assert es.service.get_revenue_by_zone() == {"north": sum(100 * i for i in range(12))}
+        assert es.replay_stats.events_per_second >= 0
+    # Хранится не больше keep_snapshots снапшотов
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".snap")]) == 2
+
+
+def test_torn_tail_is_discarded(tmp_path):
+    """Тест восстановления после оборванной записи в конце журнала"""
+    with EventSourcedService(tmp_path) as es:
+        es.place_order(_order(1))
+    with open(tmp_path / LOG_NAME, "ab") as f:
+        f.write(b'{"seq":2,"id":"x","ts"')
+
+    with EventSourcedService(tmp_path) as es:
+        assert es.seq == 1
+        es.place_order(_order(2))
+    assert [seq for seq, _, _ in EventLog(tmp_path / LOG_NAME).read()] == [1, 2]
+    assert replay_throughput(tmp_path)["events"] == 2
+
+
+def test_invalid_command_is_not_logged(tmp_path):
+    """Тест что недопустимое изменение не попадает в журнал"""
+    with EventSourcedService(tmp_path) as es:
+        with pytest.raises(KeyError):
+            es.update_status("missing", "delivered")
+        assert es.seq == 0
+    assert list(EventLog(tmp_path / LOG_NAME).read()) == []
@@ -55,4 +55,11 @@ def test_filter_closure_state():
     order = Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed")
 
     # Фильтр должен "помнить" свой rest_id
-    assert filter_func(order) == True
\ No newline at end of file
+    assert filter_func(order) == True
+
+def test_by_time_range_compares_epochs():
+    """Тест: границы разбираются в эпохи, формат с 'T' равен формату с пробелом"""
+    order = Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15T10:30:00", "placed")
+
+    assert by_time_range("2024-01-15 10:00:00", "2024-01-15 11:00:00")(order)
+    assert not by_time_range("2024-01-15 11:00:00", "2024-01-15 12:00:00")(order)
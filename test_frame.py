@@ -0,0 +1,68 @@
+import random
+from core.frame import OrderFrame, mask_and, mask_or, mask_not, to_epoch
+from core.transforms import total_revenue
+from core.domain import Order, Restaurant
+
+
+def _orders():
+    return (
+        Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed"),
+        Order("o2", "r2", (("m2", 1),), 2500, "2024-01-15 11:00:00", "delivered"),
+        Order("o3", "r1", (("m1", 2),), 4000, "2024-01-15 12:00:00", "delivered"),
+        Order("o4", "r3", (("m3", 1),), 700, "2024-01-15 13:00:00", "returned"),
+    )
+
+
+def test_to_epoch():
+    """Тест перевода времени в epoch"""
+    assert to_epoch("1970-01-01 00:00:00") == 0
+    assert to_epoch("2024-01-15 10:00:01") - to_epoch("2024-01-15 10:00:00") == 1
+
+
+def test_frame_aggregates():
+    """Тест выручки и подсчета статусов"""
+    orders = _orders()
+    frame = OrderFrame.from_orders(orders, (Restaurant("r1", "R1", "north"),))
+
+    assert len(frame) == 4
+    assert frame.revenue() == total_revenue(orders)
+    counts = frame.status_counts()
+    assert counts["delivered"] == 2
+    assert counts["placed"] == 1
+    assert counts["assigned"] == 0
+    assert counts["returned"] == 1
+    assert frame.rest_ids[0] == "r1"
+
+
+def test_frame_masks():
+    """Тест масок по цене, времени, статусу и ресторану"""
+    frame = OrderFrame.from_orders(_orders())
+
+    price = frame.price_mask(1000, 3000)
+    time = frame.time_mask("2024-01-15 10:30:00", "2024-01-15 12:00:00")
+
+    assert [o.id for o in frame.select(price)] == ["o1", "o2"]
+    assert [o.id for o in frame.select(time)] == ["o2", "o3"]
+    assert [o.id for o in frame.select(mask_and(price, time))] == ["o2"]
+    assert [o.id for o in frame.select(mask_or(price, time))] == ["o1", "o2", "o3"]
+    assert [o.id for o in frame.select(mask_not(price))] == ["o3", "o4"]
+    assert frame.revenue(frame.status_mask("delivered")) == 6500
+    assert frame.restaurant_mask("r1").count(1) == 2
+    assert frame.restaurant_mask("missing").count(1) == 0
+
+
+def test_bulk_masks_match_row_checks():
+    """Тест: маски по срезам совпадают с построчной проверкой"""
+    rng = random.Random(7)
+    orders = tuple(Order(f"o{i}", f"r{rng.randrange(300)}", (), rng.randrange(100), f"2024-01-15 10:{rng.randrange(60):02d}:00",
+                         rng.choice(("placed", "delivered"))) for i in range(500))
+    frame = OrderFrame.from_orders(orders)
+
+    for lo, hi in ((10, 20), (5, 95), (0, 99), (50, 40), (200, 300)):
+        assert frame.price_mask(lo, hi) == bytearray(lo <= o.total <= hi for o in orders)
+    assert frame.time_mask("2024-01-15 10:30:00", "2024-01-15 10:59:00") == bytearray(o.ts >= "2024-01-15 10:30:00" for o in orders)
+    for rest_id in ("r0", "r299", "r256"):
+        assert frame.restaurant_mask(rest_id) == bytearray(o.rest_id == rest_id for o in orders)
+    assert frame.status_mask("delivered") == bytearray(o.status == "delivered" for o in orders)
+    empty = OrderFrame.from_orders(())
+    assert empty.price_mask(0, 10) == empty.status_mask("placed") == bytearray()
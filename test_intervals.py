@@ -0,0 +1,115 @@
+import random
+import pytest
+from core.domain import Slot
+from core.intervals import IntervalTree, SlotIndex, check_slot
+from core.service import DeliveryService
+
+
+def test_tree_matches_brute_force():
+    """Тест запросов точки и окна против полного перебора"""
+    rng = random.Random(7)
+    intervals = []
+    for i in range(300):
+        start = rng.randrange(0, 1000)
+        intervals.append((start, start + rng.randrange(1, 80), i))
+    tree = IntervalTree(intervals)
+
+    assert len(tree) == 300
+    for _ in range(100):
+        lo = rng.randrange(0, 1100)
+        hi = lo + rng.randrange(1, 50)
+        expected = sorted(v for s, e, v in intervals if s < hi and e > lo)
+        assert sorted(tree.overlapping(lo, hi)) == expected
+        assert sorted(tree.stab(lo)) == sorted(v for s, e, v in intervals if s <= lo < e)
+
+
+def test_tree_is_persistent():
+    """Тест что вставка не меняет старую версию дерева"""
+    first = IntervalTree([(0, 10, "a")])
+    second = first.insert(5, 15, "b")
+
+    assert first.stab(7) == ("a",)
+    assert second.stab(7) == ("a", "b")
+    assert list(second) == ["a", "b"]
+
+
+def test_slot_index_queries():
+    """Тест индекса слотов: доступные курьеры, окна и слоты курьера"""
+    slots = (
+        Slot("s1", "c1", "2024-01-15 10:00:00", "2024-01-15 12:00:00"),
+        Slot("s2", "c1", "2024-01-15 13:00:00", "2024-01-15 15:00:00"),
+        Slot("s3", "c2", "2024-01-15 11:00:00", "2024-01-15 14:00:00"),
+    )
+    index = SlotIndex(slots)
+
+    assert index.available_at("2024-01-15 11:30:00") == ("c1", "c2")
+    assert index.available_at("2024-01-15 12:30:00") == ("c2",)
+    assert [s.id for s in index.overlapping("2024-01-15 11:30:00", "2024-01-15 13:30:00")] == ["s1", "s3", "s2"]
+    assert [s.id for s in index.for_courier("c1")] == ["s1", "s2"]
+
+
+def test_check_slot():
+    """Тест проверки конфликтов: пересечение, соседние слоты, перевернутый слот с датами"""
+    index = SlotIndex((Slot("s1", "c1", "10:00", "12:00"),))
+
+    conflict = check_slot(index, Slot("s2", "c1", "11:00", "13:00"))
+    assert conflict.is_left() and conflict.error["conflicts"] == ("s1",)
+    assert check_slot(index, Slot("s3", "c1", "12:00", "13:00")).is_right()
+    assert check_slot(index, Slot("s4", "c2", "11:00", "13:00")).is_right()
+    # Ночной ежедневный слот 14:00-13:00 идет через полночь и накрывает s1
+    assert check_slot(index, Slot("s5", "c1", "14:00", "13:00")).error["conflicts"] == ("s1",)
+    assert check_slot(index, Slot("s6", "c1", "2024-01-15 14:00:00", "2024-01-15 13:00:00")).is_left()
+
+
+def test_daily_and_dated_slots_conflict():
+    """Тест смешанных слотов: ежедневный 'HH:MM' проецируется на дату запроса"""
+    daily = Slot("s1", "c1", "10:00", "12:00")
+    dated = Slot("s2", "c1", "2024-01-15 10:30:00", "2024-01-15 11:00:00")
+
+    assert check_slot(SlotIndex((daily,)), dated).error["conflicts"] == ("s1",)
+    assert check_slot(SlotIndex((dated,)), daily).error["conflicts"] == ("s2",)
+    assert check_slot(SlotIndex((daily,)), Slot("s3", "c1", "2024-01-15 12:00:00", "2024-01-15 13:00:00")).is_right()
+
+    index = SlotIndex((daily, Slot("s4", "c2", "2024-01-15 09:00:00", "2024-01-15 11:30:00")))
+    assert set(index.available_at("2024-01-15 11:00:00")) == {"c1", "c2"}
+    assert index.available_at("2024-01-16 11:45:00") == ("c1",)
+    assert [s.id for s in index.overlapping("2024-01-16 08:00:00", "2024-01-16 10:30:00")] == ["s1"]
+    # Запрос 'HH:MM' смотрит только на ежедневные слоты
+    assert index.available_at("11:00") == ("c1",)
+
+
+def test_overnight_slot_split_at_midnight():
+    """Тест ночного слота 22:00-02:00: виден по обе стороны полуночи"""
+    index = SlotIndex((Slot("s1", "c1", "22:00", "02:00"),))
+
+    assert index.available_at("2024-01-16 01:00:00") == ("c1",)
+    assert index.available_at("23:30") == ("c1",)
+    assert index.available_at("03:00") == ()
+    assert check_slot(index, Slot("s2", "c1", "01:00", "03:00")).error["conflicts"] == ("s1",)
+    assert check_slot(index, Slot("s3", "c1", "02:00", "22:00")).is_right()
+
+
+def test_service_rejects_overlapping_slots():
+    """Тест отказа DeliveryService.assign_courier_slot при пересечении"""
+    service = DeliveryService((), (Slot("s1", "c1", "10:00", "12:00"),))
+    service = service.assign_courier_slot(Slot("s2", "c1", "12:00", "14:00"))
+
+    with pytest.raises(ValueError):
+        service.assign_courier_slot(Slot("s3", "c1", "13:00", "15:00"))
+    assert len(service.slots) == 2
+    assert service.check_slot(Slot("s3", "c1", "13:00", "15:00")).is_left()
+
+
+def test_service_validates_slots_like_add():
+    """Тест одного правила для слотов в конструкторе и в assign_courier_slot"""
+    service = DeliveryService((), (Slot("s1", "c1", "22:00", "02:00"),))
+    assert service.slot_index.available_at("01:00") == ("c1",)
+    service = service.assign_courier_slot(Slot("s2", "c2", "23:00", "01:00"))
+    with pytest.raises(ValueError):
+        service.assign_courier_slot(Slot("s3", "c1", "01:00", "03:00"))
+
+    inverted = Slot("s4", "c1", "2024-01-15 14:00:00", "2024-01-15 13:00:00")
+    with pytest.raises(ValueError):
+        DeliveryService((), (inverted,))
+    with pytest.raises(ValueError):
+        service.assign_courier_slot(inverted)
@@ -0,0 +1,77 @@
+from core.domain import Order
+from core.filters import by_restaurant, by_status, by_time_range, by_total_range
+from core.lazy import Query
+from core.store import OrderStore
+
+
+def _orders(n=20):
+    return tuple(Order(f"o{i}", f"r{i % 3}", (("m1", 1),), 100 * i, f"2024-01-01T10:{i:02d}:00",
+                       "placed" if i % 2 else "delivered") for i in range(n))
+
+
+def test_query_matches_eager_chain():
+    """Тест: ленивый запрос дает тот же результат, что и tuple(filter/map)"""
+    orders = _orders()
+    q = Query(orders).filter(by_restaurant("r1")).filter(by_status("placed")).map(lambda o: o.id)
+    eager = tuple(o.id for o in filter(by_status("placed"), filter(by_restaurant("r1"), orders)))
+
+    assert q.to_tuple() == eager
+    assert q.count() == len(eager)
+
+
+def test_adjacent_stages_are_fused():
+    """Тест слияния соседних фильтров, map и take в одну стадию"""
+    q = (Query(_orders()).filter(by_restaurant("r1")).filter(lambda o: o.total > 500)
+         .map(lambda o: o.total).map(lambda t: t // 100).take(5).take(3))
+
+    assert q.explain().count("Filter") == 1
+    assert q.explain().count("Map") == 1
+    assert q.explain().endswith("Take(3)")
+    assert q.to_tuple() == (7, 10, 13)
+
+
+def test_take_short_circuits():
+    """Тест: take не читает источник дальше нужного"""
+    seen = []
+
+    def source():
+        for o in _orders(1000):
+            seen.append(o.id)
+            yield o
+
+    assert len(Query(source()).filter(by_status("placed")).take(2).to_tuple()) == 2
+    assert len(seen) == 4
+
+
+def test_group_by_and_sort():
+    """Тест группировки и частичной сортировки sort_by + take"""
+    orders = _orders()
+    groups = Query(orders).group_by(lambda o: o.rest_id).map(lambda kv: (kv[0], len(kv[1]))).to_dict()
+    top = Query(orders).sort_by(lambda o: o.total, reverse=True).take(2).map(lambda o: o.id).to_tuple()
+
+    assert groups == {"r0": 7, "r1": 7, "r2": 6}
+    assert top == ("o19", "o18")
+    assert Query(orders).skip(18).map(lambda o: o.id).to_tuple() == ("o18", "o19")
+
+
+def test_store_source_uses_index():
+    """Тест: ведущий фильтр по OrderStore выполняется через индекс"""
+    store = OrderStore(_orders())
+    q = Query(store).filter(by_status("placed") & by_total_range(0, 1000))
+
+    assert q.explain().startswith("IndexLookup[status_index]")
+    assert q.to_tuple() == tuple(o for o in _orders() if o.status == "placed" and o.total <= 1000)
+    assert q.first().id == "o1"
+    assert not Query(store).filter(by_restaurant("r9")).any()
+
+
+def test_time_index_keeps_source_order():
+    """Тест: фильтр по времени через индекс отдает строки в порядке источника"""
+    orders = tuple(reversed(_orders()))
+    store = OrderStore(orders)
+    store.ts_index()
+    q = Query(store).filter(by_time_range("2024-01-01 10:05:00", "2024-01-01 10:15:00"))
+
+    assert q.explain().startswith("IndexLookup[ts_index]")
+    assert q.to_tuple() == tuple(o for o in orders if "10:05" <= o.ts[11:16] <= "10:15")
+    assert [o.id for o in q.take(2)] == ["o15", "o14"]
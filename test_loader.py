@@ -0,0 +1,59 @@
+import io
+import json
+import pytest
+from core.loader import iter_seed_batches, collect_seed, load_seed_file
+from core.transforms import load_seed
+
+
+def _seed(n_orders=25):
+    return {
+        "restaurants": [{"id": "r1", "name": "Test", "zone": "center"}],
+        "meta": {"version": 1, "nested": [1, 2, {"x": "y"}]},
+        "orders": [{"id": f"o{i}", "rest_id": "r1", "items": [["m1", i + 1]], "total": 1000 + i,
+                    "ts": "2024-01-15 10:00:00", "status": "placed"} for i in range(n_orders)],
+        "couriers": [{"id": "c1", "name": "Alice", "vehicle": "bike", "zone": "center"}],
+        "slots": [],
+        "menu_items": [{"id": "m1", "rest_id": "r1", "name": "Item", "price": 1000, "prep_time": 10}],
+    }
+
+
+def test_stream_matches_load_seed():
+    """Тест что потоковый разбор дает тот же результат, что и load_seed"""
+    data = _seed()
+    text = json.dumps(data, indent=2)
+
+    # Маленький чанк заставляет разбирать значения на границах буфера
+    streamed = collect_seed(iter_seed_batches(io.StringIO(text), batch_size=4, chunk_size=7))
+
+    assert streamed == load_seed(data)
+    assert streamed[2][-1].total == 1024
+    assert streamed[2][0].items == (("m1", 1),)
+
+
+def test_batches_are_bounded():
+    """Тест что пачки не превышают batch_size"""
+    batches = list(iter_seed_batches(io.StringIO(json.dumps(_seed())), batch_size=10))
+
+    order_batches = [b for key, b in batches if key == "orders"]
+    assert [len(b) for b in order_batches] == [10, 10, 5]
+    assert all(len(b) <= 10 for _, b in batches)
+
+
+def test_load_seed_file(tmp_path):
+    """Тест загрузки seed из файла"""
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps(_seed(3)), encoding="utf-8")
+
+    restaurants, menu_items, orders, couriers, slots = load_seed_file(path)
+
+    assert len(orders) == 3
+    assert menu_items[0].prep_time == 10
+    assert slots == ()
+
+
+def test_truncated_file_raises():
+    """Тест что обрезанный файл приводит к ошибке"""
+    text = json.dumps(_seed(3))[:-20]
+
+    with pytest.raises(ValueError):
+        list(iter_seed_batches(io.StringIO(text), chunk_size=16))
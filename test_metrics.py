@@ -0,0 +1,78 @@
+import json
+from core import memo
+from core.domain import Courier, Order
+from core.metrics import Histogram, Registry
+
+
+def test_histogram_quantiles():
+    """Тест логарифмических корзин: квантиль не меньше значения и не больше 2x"""
+    h = Histogram()
+    for ns in range(1000, 101_000, 1000):
+        h.observe(ns)
+
+    assert h.count == 100 and h.min == 1000 and h.max == 100_000
+    assert 50_000 <= h.quantile(0.5) <= 100_000
+    assert h.quantile(0.99) <= h.max
+    assert Histogram().quantile(0.5) == 0
+
+
+def test_disabled_registry_records_nothing():
+    """Тест: выключенный реестр не пишет замеры и счетчики"""
+    registry = Registry()
+    double = registry.timed("double")(lambda x: x * 2)
+
+    assert double(3) == 6
+    with registry.span("block"):
+        pass
+    registry.incr("calls")
+
+    snap = registry.snapshot()
+    assert snap["timers"] == {} and snap["counters"] == {}
+
+
+def test_timed_and_span_when_enabled():
+    """Тест: включенный реестр пишет вызовы, в том числе завершившиеся ошибкой"""
+    registry = Registry(enabled=True)
+
+    @registry.timed()
+    def fail():
+        raise ValueError("boom")
+
+    for _ in range(3):
+        try:
+            fail()
+        except ValueError:
+            pass
+    with registry.span("block"):
+        registry.incr("calls", 2)
+
+    snap = registry.snapshot()
+    assert snap["timers"][f"{__name__}.test_timed_and_span_when_enabled.<locals>.fail"]["count"] == 3
+    assert snap["timers"]["block"]["count"] == 1
+    assert snap["counters"] == {"calls": 2}
+
+
+def test_export_formats(tmp_path):
+    """Тест экспорта в JSON и текстовый формат"""
+    registry = Registry(enabled=True)
+    registry.observe("load", 2_000_000)
+    registry.write(tmp_path / "m.json")
+    registry.write(tmp_path / "m.txt")
+
+    data = json.loads((tmp_path / "m.json").read_text(encoding="utf-8"))
+    assert data["timers"]["load"]["count"] == 1
+    assert "timer.load{count} 1" in (tmp_path / "m.txt").read_text(encoding="utf-8")
+
+
+def test_route_cache_hit_ratio():
+    """Тест: доля попаданий общего кэша маршрутов доступна в метриках"""
+    from core.metrics import REGISTRY
+    memo.compute_route_cost_cached.cache_clear()
+    orders = (Order("o1", "r1", (("m1", 1),), 500, "2024-01-01T10:00:00", "placed"),)
+    couriers = (Courier("c1", "Иван", "bike", "center"),)
+    for _ in range(4):
+        memo.compute_route_cost("metrics", orders, couriers)
+
+    ratios = REGISTRY.cache_ratios()["route_cost"]
+    assert ratios["hits"] == 3 and ratios["misses"] == 1
+    assert ratios["hit_ratio"] == 0.75
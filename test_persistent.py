@@ -0,0 +1,68 @@
+import pytest
+from core.persistent import PVector, PMap
+from core.service import DeliveryService
+from core.domain import Order, Slot
+
+
+def test_pvector_append_keeps_old_versions():
+    """Тест что append не изменяет предыдущую версию вектора"""
+    vec = PVector()
+    versions = []
+    for i in range(2000):
+        vec = vec.append(i)
+        versions.append(vec)
+
+    assert len(vec) == 2000
+    assert list(vec) == list(range(2000))
+    assert len(versions[99]) == 100
+    assert versions[99][-1] == 99
+
+
+def test_pvector_set_and_slice():
+    """Тест обновления элемента и срезов"""
+    vec = PVector(range(100))
+    updated = vec.set(42, "x")
+
+    assert vec[42] == 42
+    assert updated[42] == "x"
+    assert updated[40:44] == (40, 41, "x", 43)
+    assert PVector((1, 2)) == (1, 2)
+    with pytest.raises(IndexError):
+        vec[100]
+
+
+def test_pmap_set_remove():
+    """Тест персистентного словаря"""
+    pmap = PMap({"a": 1})
+    bigger = pmap.set("b", 2)
+    smaller = bigger.remove("a")
+
+    assert dict(pmap) == {"a": 1}
+    assert dict(bigger) == {"a": 1, "b": 2}
+    assert dict(smaller) == {"b": 2}
+    assert "a" not in smaller
+    assert smaller.get("a", 0) == 0
+
+
+def test_pmap_many_keys():
+    """Тест большого количества ключей"""
+    pmap = PMap()
+    for i in range(5000):
+        pmap = pmap.set(f"o{i}", i)
+
+    assert len(pmap) == 5000
+    assert pmap["o4321"] == 4321
+
+
+def test_service_versions_share_structure():
+    """Тест что старые версии сервиса остаются нетронутыми"""
+    service = DeliveryService((), ())
+    first = service.place_order(Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed"))
+    second = first.place_order(Order("o2", "r1", (("m2", 1),), 500, "2024-01-15 11:00:00", "placed"))
+    with_slot = second.assign_courier_slot(Slot("s1", "c1", "10:00", "12:00"))
+
+    assert len(service.orders) == 0
+    assert len(first.orders) == 1
+    assert second.get_revenue() == 1500
+    assert len(second.slots) == 0
+    assert with_slot.slots[0].id == "s1"
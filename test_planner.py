@@ -0,0 +1,93 @@
+from core.filters import by_restaurant, by_time_range, by_status, by_total_range, orders_in_zone, Eq
+from core.planner import plan_query, run_query, run_queries
+from core.store import OrderStore
+from core.domain import Order, Restaurant
+
+
+def _orders():
+    return tuple(
+        Order(f"o{i}", f"r{i % 4}", (("m1", 1),), 500 * i, f"2024-01-15 {10 + i % 8:02d}:00:00",
+              "delivered" if i % 3 else "placed")
+        for i in range(40)
+    )
+
+
+def test_predicate_algebra():
+    """Тест комбинирования предикатов через &, | и ~"""
+    order = Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed")
+
+    assert (by_restaurant("r1") & by_status("placed"))(order) is True
+    assert (by_restaurant("r2") | by_status("placed"))(order) is True
+    assert (~by_restaurant("r1"))(order) is False
+    assert (by_restaurant("r1") & (lambda o: o.total > 5000))(order) is False
+    assert repr(by_restaurant("r1") & by_status("placed")) == "(rest_id == 'r1' & status == 'placed')"
+
+
+def test_planner_uses_index_and_matches_scan():
+    """Тест что план через индекс дает тот же результат, что полный проход"""
+    orders = _orders()
+    store = OrderStore(orders)
+    query = by_restaurant("r1") & by_total_range(0, 10000)
+
+    plan = plan_query(store, query)
+    scan = plan_query(orders, query)
+
+    assert plan.strategy == "rest_id_index"
+    assert scan.strategy == "scan"
+    assert plan.execute() == scan.execute() == tuple(o for o in orders if query(o))
+    assert "IndexLookup[rest_id_index]" in plan.explain()
+    assert "FullScan" in scan.explain()
+
+
+def test_planner_picks_most_selective_index():
+    """Тест выбора самого избирательного индекса"""
+    store = OrderStore(_orders())
+
+    by_id = plan_query(store, by_status("placed") & Eq("id", "o3"))
+    by_time = plan_query(store, by_status("delivered") & by_time_range("2024-01-15 10:00:00", "2024-01-15 10:30:00"))
+
+    assert by_id.strategy == "id_index"
+    assert [o.id for o in by_id.execute()] == ["o3"]
+    assert by_time.strategy == "ts_index"
+    assert all(o.ts.startswith("2024-01-15 10:") and o.status == "delivered" for o in by_time.execute())
+    assert len(run_query(store, Eq("id", "missing"))) == 0
+
+
+def test_hash_estimate_uses_group_sizes():
+    """Тест: оценка по хеш-индексу берет размер группы и не собирает кортеж"""
+    orders = _orders()
+    store = OrderStore(orders).update(Order("o0", "r0", (("m1", 1),), 0, "2024-01-15 10:00:00", "delivered"))
+    plan = plan_query(store, by_status("placed") & by_restaurant("r1"))
+
+    assert (plan.strategy, plan.estimate) == ("rest_id_index", 10)
+    assert store._by_status["placed"]._rows is None
+    assert store.count_status("placed") == len(store.by_status("placed")) == 13
+    assert store.count_rest_id("missing") == 0
+
+
+def test_ts_estimate_does_not_build_index():
+    """Тест: оценка диапазона по времени не строит индекс, пока план его не выбрал"""
+    store = OrderStore(_orders())
+    window = by_time_range("2024-01-15 10:00:00", "2024-01-15 12:00:00")
+
+    assert plan_query(store, Eq("id", "o3") & window).strategy == "id_index"
+    assert not store.has_ts_index
+
+    assert run_query(store, window) == tuple(o for o in _orders() if window(o))
+    assert store.has_ts_index
+
+
+def test_run_queries_single_pass():
+    """Тест нескольких запросов за один проход"""
+    orders = _orders()
+    restaurants = (Restaurant("r0", "A", "north"), Restaurant("r1", "B", "south"))
+
+    results = run_queries(orders, {
+        "rest": by_restaurant("r1"),
+        "zone": orders_in_zone(restaurants, "north"),
+        "placed": by_status("placed"),
+    })
+
+    assert results["rest"] == tuple(o for o in orders if o.rest_id == "r1")
+    assert results["zone"] == tuple(o for o in orders if o.rest_id == "r0")
+    assert len(results["placed"]) == 14
@@ -1,5 +1,5 @@
 import pytest
-from core.recursion import split_route, collect_orders_by_zone
+from core.recursion import split_route, collect_orders_by_zone, iter_route, iter_orders_by_zone
 from core.domain import Route, Order, Restaurant
 
 
@@ -55,4 +55,30 @@ def test_recursive_depth():
     route = Route("rt1", "c1", ("o1", "o2", "o3", "o4", "o5"), 15, 45)
 
     result = split_route(route)
-    assert len(result) == 5
\ No newline at end of file
+    assert len(result) == 5
+
+def test_long_route_is_stack_safe():
+    """Тест что длинный маршрут не вызывает RecursionError"""
+    order_ids = tuple(f"o{i}" for i in range(50000))
+    route = Route("rt1", "c1", order_ids, 0, 0)
+
+    result = split_route(route)
+    assert len(result) == 50000
+    assert result[-1] == "Order o49999 -> Courier c1"
+    assert tuple(iter_route(route)) == result
+
+
+def test_collect_many_orders_matches_lazy_variant():
+    """Тест сбора большого числа заказов и ленивого варианта"""
+    restaurants = tuple(Restaurant(f"r{i}", f"R{i}", "north" if i % 2 else "south") for i in range(100))
+    orders = tuple(
+        Order(f"o{i}", f"r{i % 100}", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed")
+        for i in range(20000)
+    )
+
+    result = collect_orders_by_zone(orders, restaurants, "north")
+    lazy = iter_orders_by_zone(orders, restaurants, "north")
+
+    assert len(result) == 10000
+    assert next(lazy) == result[0]
+    assert (result[0],) + tuple(lazy) == result
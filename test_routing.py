@@ -0,0 +1,114 @@
+import itertools
+import random
+import time
+from core import memo
+from core.domain import Courier, MenuItem, Order
+from core.routing import CostModel, DistanceMatrix, hashed_point, nearest_neighbour, path_length, plan_route, two_opt
+
+
+def _dist(points):
+    return [[abs(a[0] - b[0]) + abs(a[1] - b[1]) for b in points] for a in points]
+
+
+def test_two_opt_close_to_optimal():
+    """Тест эвристик на малых маршрутах против полного перебора"""
+    rng = random.Random(3)
+    for _ in range(20):
+        points = [(rng.randrange(100), rng.randrange(100)) for _ in range(7)]
+        dist = _dist(points)
+        tour = two_opt(nearest_neighbour(dist), dist)
+        best = min(path_length((0, *p), dist) for p in itertools.permutations(range(1, 7)))
+
+        assert sorted(tour) == list(range(7)) and tour[0] == 0
+        assert path_length(tour, dist) <= best * 1.3
+
+
+def test_distance_matrix_is_memoized():
+    """Тест мемоизации попарных расстояний"""
+    calls = []
+    matrix = DistanceMatrix(lambda key: calls.append(key) or hashed_point(key))
+
+    assert matrix.distance("a", "b") == matrix.distance("b", "a")
+    matrix.matrix(["a", "b", "a"])
+    assert calls == ["a", "b"]
+    assert hashed_point("a") == hashed_point("a")
+
+
+def test_prep_time_in_duration():
+    """Тест учета времени приготовления: курьер ждет готовности заказа"""
+    model = CostModel(locations={"c1": (0, 0), "o1": (250, 0)})
+    model.register_menu((MenuItem("m1", "r1", "Soup", 300, 20),))
+    order = Order("o1", "r1", (("m1", 1),), 300, "2024-01-15 10:00:00", "placed")
+
+    fast = model.route_cost("r", ("o1",), ("c1",))
+    model.register_orders((order,))
+    slow = model.route_cost("r", ("o1",), ("c1",))
+    assert fast["distance"] == slow["distance"] == 250
+    assert fast["duration"] == 1 + model.service_min
+    assert slow["duration"] == 20 + model.service_min
+    assert slow["cost"] > fast["cost"]
+
+
+def test_route_shape_and_speed():
+    """Тест формы результата и скорости на маршруте из десятков остановок"""
+    orders = tuple(Order(f"o{i}", "r1", (), 1000, "2024-01-15 10:00:00", "placed") for i in range(40))
+    courier = Courier("c1", "Alice", "car", "north")
+
+    start = time.perf_counter()
+    route = plan_route("route40", orders, courier)
+    elapsed = time.perf_counter() - start
+
+    assert sorted(route.orders) == sorted(o.id for o in orders)
+    assert route.courier_id == "c1" and route.distance > 0 and route.duration > 0
+    assert elapsed < 0.5
+
+
+def test_memo_uses_cost_model():
+    """Тест подключения модели к кэшируемому расчету"""
+    previous = memo.cost_model
+    try:
+        memo.configure_cost_model(CostModel(locations={"c1": (0, 0), "x1": (100, 0), "x2": (300, 0)}))
+        orders = (Order("x2", "r1", (), 1, "2024-01-15 10:00:00", "placed"),
+                  Order("x1", "r1", (), 1, "2024-01-15 10:00:00", "placed"))
+        result = memo.compute_route_cost("rx", orders, (Courier("c1", "A", "car", "n"),))
+        assert result["sequence"] == ["x1", "x2"]
+        assert result["distance"] == 300
+        assert set(result) >= {"distance", "duration", "cost", "orders_count", "route_id"}
+    finally:
+        memo.configure_cost_model(previous)
+
+
+def test_menu_change_is_not_served_from_cache(tmp_path, monkeypatch):
+    """Тест: время готовности входит в ключ кэша, смена меню не отдает старый результат"""
+    from core.cache import RouteCostCache
+    from core.disk_cache import DiskRouteCache
+
+    cache = RouteCostCache(max_entries=16, backing=DiskRouteCache(str(tmp_path / "routes.sqlite")))
+    for attr, value in (("cache", cache), ("cache_clear", cache.clear), ("cache_info", cache.cache_info)):
+        monkeypatch.setattr(memo.compute_route_cost_cached, attr, value)
+    monkeypatch.setattr(memo, "cost_model", CostModel(locations={"c1": (0, 0), "o1": (250, 0)}))
+    order = Order("o1", "r1", (("m1", 1),), 300, "2024-01-15 10:00:00", "placed")
+    courier = (Courier("c1", "A", "car", "n"),)
+
+    memo.register_menu((MenuItem("m1", "r1", "Soup", 300, 20),))
+    slow = memo.compute_route_cost("r", (order,), courier)
+    memo.register_menu((MenuItem("m1", "r1", "Soup", 300, 0),))
+    fast = memo.compute_route_cost("r", (order,), courier)
+    cache.clear()
+    memo.register_menu((MenuItem("m1", "r1", "Soup", 300, 20),))
+
+    assert slow["duration"] == 20 + memo.cost_model.service_min
+    assert fast["duration"] < slow["duration"]
+    assert memo.compute_route_cost("r", (order,), courier) == slow
+    assert cache.stats().backing_hits == 1
+
+
+def test_model_state_is_bounded():
+    """Тест ограничения словарей расстояний и времени готовности"""
+    model = CostModel(max_entries=4)
+    model.plan("c1", [f"o{i}" for i in range(5)])
+    model.register_orders(Order(f"o{i}", "r1", (), 1, "2024-01-15 10:00:00", "placed") for i in range(10))
+
+    assert len(model.distances._pairs) <= 4
+    assert len(model.distances._points) <= 4
+    assert list(model.prep_times) == ["o6", "o7", "o8", "o9"]
@@ -0,0 +1,83 @@
+import pytest
+from core.domain import Courier, Order, Rule
+from core.ftypes import assign_courier, validate_order
+from core.rules import RuleSet, compile_rules
+
+
+def _order(oid="o1", total=3000, rest_id="r1", status="placed", qty=1):
+    return Order(oid, rest_id, (("m1", qty),), total, "2024-01-15 10:00:00", status)
+
+
+RULES = (
+    Rule("items", "max_items", {"limit": 5, "error": "Too many items"}),
+    Rule("total", "max_total", {"limit": 8000, "error": "Too expensive"}),
+    Rule("status", "status_in", {"statuses": ["placed"]}),
+    Rule("bike", "vehicle_max_total", {"vehicle": "bike", "limit": 5000}),
+    Rule("zone", "same_zone", {"zones": {"r1": "north"}}),
+)
+
+
+def test_rules_sorted_by_cost():
+    """Тест порядка проверки: дешевые правила первыми"""
+    ruleset = RuleSet(RULES)
+    assert [r.id for r in ruleset.order_rules] == ["total", "status", "items"]
+    assert [r.id for r in ruleset.pair_rules] == ["bike", "zone"]
+    # Заказ нарушает и сумму, и число позиций: срабатывает более дешевое правило
+    result = ruleset.check_order(_order(total=9000, qty=10))
+    assert result.is_left()
+    assert result.error == {"error": "Too expensive", "rule": "total"}
+
+
+def test_validate_with_couriers():
+    """Тест validate: нужен хотя бы один курьер, проходящий парные правила"""
+    ruleset = compile_rules(RULES)
+    bike = Courier("c1", "A", "bike", "north")
+    car_south = Courier("c2", "B", "car", "south")
+    car_north = Courier("c3", "C", "car", "north")
+
+    assert ruleset.validate(_order(total=6000), (bike, car_north)).is_right()
+    result = ruleset.validate(_order(total=6000), (bike, car_south))
+    assert result.is_left() and result.error["rule"] == "zone"
+    assert ruleset.validate(_order(status="delivered"), (car_north,)).error["rule"] == "status"
+
+
+def test_batch_matches_single():
+    """Тест пакетной проверки: результаты совпадают с поштучными"""
+    ruleset = compile_rules(RULES)
+    orders = [_order(f"o{i}", total=1000 * i, qty=i % 8, status="placed" if i % 3 else "assigned")
+              for i in range(20)]
+    assert ruleset.check_orders(orders) == tuple(ruleset.check_order(o) for o in orders)
+
+    couriers = [Courier(f"c{i}", "X", "bike" if i % 2 else "car", "north" if i % 3 else "south") for i in range(20)]
+    pairs = list(zip(orders, couriers, strict=True))
+    assert ruleset.check_pairs(pairs) == tuple(ruleset.check_pair(o, c) for o, c in pairs)
+
+
+def test_compile_once_and_unknown_kind():
+    """Тест кэша компиляции и ошибки для неизвестного вида правила"""
+    assert compile_rules(RULES) is compile_rules(RULES)
+    with pytest.raises(ValueError):
+        RuleSet((Rule("x", "no_such_kind", {}),))
+
+
+def test_ftypes_use_rules():
+    """Тест validate_order и assign_courier с явными правилами"""
+    rules = (Rule("cheap", "max_total", {"limit": 1000}),)
+    bike = Courier("c1", "A", "bike", "north")
+
+    assert validate_order(_order(total=2000), rules, ()).error == {"error": "Rule cheap failed", "rule": "cheap"}
+    assert validate_order(_order(total=2000), (), ()).is_right()
+    assert assign_courier(_order(total=6000), bike).is_left()
+    assert assign_courier(_order(total=6000), bike, (Rule("v", "vehicle_in", {"vehicles": ["bike"]}),)).is_right()
+
+
+def test_same_kind_rules_are_fused():
+    """Тест слияния однотипных правил: ошибка - от первого нарушенного правила группы"""
+    rules = tuple(Rule(f"t{limit}", "max_total", {"limit": limit}) for limit in (5000, 3000, 4000))
+    ruleset = RuleSet(rules)
+    assert len(ruleset._order_checks) == 1
+
+    assert ruleset.check_order(_order(total=2000)).is_right()
+    assert ruleset.check_order(_order(total=3500)).error["rule"] == "t3000"
+    assert ruleset.check_order(_order(total=6000)).error["rule"] == "t5000"
+    assert ruleset.check_orders([_order(total=4500)])[0].error["rule"] == "t3000"
@@ -0,0 +1,141 @@
+import json
+import os
+import pytest
+from core.snapshot import Snapshot, file_digest, load_cached, write_snapshot
+from core.transforms import load_seed
+
+
+def _data():
+    return load_seed({
+        "restaurants": [{"id": "r1", "name": "Пицца", "zone": "north"},
+                        {"id": "r2", "name": "Burger", "zone": "south"}],
+        "menu_items": [{"id": "m1", "rest_id": "r1", "name": "Item", "price": 1000, "prep_time": 10}],
+        "orders": [{"id": f"o{i}", "rest_id": "r1" if i % 2 else "r2", "items": [["m1", i], ["m2", 1]][:1 + i % 2],
+                    "total": 1000 * i, "ts": "2024-01-15 10:00:00", "status": "placed"} for i in range(50)],
+        "couriers": [{"id": "c1", "name": "Alice", "vehicle": "bike", "zone": "north"}],
+        "slots": [{"id": "s1", "courier_id": "c1", "start": "10:00", "end": "12:00"}],
+    })
+
+
+def test_snapshot_roundtrip(tmp_path):
+    """Тест записи и чтения снапшота"""
+    data = _data()
+    path = tmp_path / "data.snap"
+    write_snapshot(path, *data)
+
+    with Snapshot(path) as snap:
+        restaurants, menu_items, orders, couriers, slots = snap.as_tuple()
+        assert tuple(restaurants) == data[0]
+        assert tuple(menu_items) == data[1]
+        assert tuple(orders) == data[2]
+        assert tuple(couriers) == data[3]
+        assert tuple(slots) == data[4]
+
+
+def test_snapshot_lazy_access(tmp_path):
+    """Тест произвольного доступа к заказам без полной материализации"""
+    data = _data()
+    path = tmp_path / "data.snap"
+    write_snapshot(path, *data)
+
+    with Snapshot(path) as snap:
+        assert len(snap.orders) == 50
+        assert snap.orders[-1] == data[2][-1]
+        assert snap.orders[10:12] == data[2][10:12]
+        assert snap.restaurants[0].name == "Пицца"
+        with pytest.raises(IndexError):
+            snap.orders[50]
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    """Тест что посторонний файл не открывается как снапшот"""
+    path = tmp_path / "seed.json"
+    path.write_bytes(b"{" + b" " * 100 + b"}")
+
+    with pytest.raises(ValueError):
+        Snapshot(path)
+
+
+def test_snapshot_rejects_short_files(tmp_path):
+    """Тест: пустой, короткий и обрезанный файлы дают ValueError"""
+    empty = tmp_path / "empty.snap"
+    empty.write_bytes(b"")
+    short = tmp_path / "short.snap"
+    short.write_bytes(b"FSDSNAP1")
+    full = tmp_path / "full.snap"
+    write_snapshot(full, *_data())
+    truncated = tmp_path / "truncated.snap"
+    truncated.write_bytes(full.read_bytes()[:-10])
+
+    for path in (empty, short, truncated):
+        with pytest.raises(ValueError):
+            Snapshot(path)
+
+
+def test_failed_write_removes_temp_file(tmp_path):
+    """Тест: при ошибке записи временный файл удаляется"""
+    path = tmp_path / "data.snap"
+    bad = list(_data())
+    bad[2] = (None,)
+
+    with pytest.raises(AttributeError):
+        write_snapshot(path, *bad)
+    assert list(tmp_path.iterdir()) == []
+
+
+def _write_seed(path, data):
+    path.write_text(json.dumps({
+        "restaurants": [{"id": r.id, "name": r.name, "zone": r.zone} for r in data[0]],
+        "orders": [{"id": o.id, "rest_id": o.rest_id, "items": [list(i) for i in o.items], "total": o.total,
+                    "ts": o.ts, "status": o.status} for o in data[2]],
+    }), encoding="utf-8")
+
+
+def test_load_cached_builds_and_reuses_snapshot(tmp_path, monkeypatch):
+    """Тест: первый запуск пишет снапшот, следующий читает его вместо seed"""
+    seed = tmp_path / "seed.json"
+    data = _data()
+    _write_seed(seed, data)
+
+    first = load_cached(seed)
+    assert (tmp_path / "seed.json.snap").exists()
+    assert first[2] == data[2]
+
+    # То же содержимое с новым mtime: seed не разбирается
+    os.utime(seed, ns=(os.stat(tmp_path / "seed.json.snap").st_mtime_ns + 10**9,) * 2)
+    monkeypatch.setattr("core.loader.load_seed_file", pytest.fail)
+    cached = load_cached(seed)
+    assert tuple(map(tuple, cached)) == first
+
+
+def test_load_cached_snapshot_is_lazy(tmp_path):
+    """Тест: из снапшота приходят ленивые последовательности, записи собираются по обращению"""
+    seed = tmp_path / "seed.json"
+    data = _data()
+    _write_seed(seed, data)
+    load_cached(seed)
+
+    restaurants, menu_items, orders, couriers, slots = load_cached(seed)
+    assert not isinstance(orders, tuple) and len(orders) == 50
+    assert orders[7] == data[2][7] and orders[7] is orders[7]
+    assert sum(item is not None for item in orders._items) == 1
+    assert orders[:3] == data[2][:3]
+    assert tuple(orders) == data[2]
+
+
+def test_load_cached_rebuilds_on_content_change(tmp_path):
+    """Тест: другое содержимое seed пересобирает снапшот даже при старом mtime"""
+    seed = tmp_path / "seed.json"
+    data = _data()
+    _write_seed(seed, data)
+    load_cached(seed)
+    snap_mtime = os.stat(tmp_path / "seed.json.snap").st_mtime_ns
+
+    _write_seed(seed, (data[0], (), data[2][:10]))
+    os.utime(seed, ns=(snap_mtime - 10**9,) * 2)
+    rebuilt = load_cached(seed)
+
+    assert rebuilt[2] == data[2][:10]
+    assert tuple(map(tuple, load_cached(seed, digest=file_digest(seed)))) == rebuilt
+    with Snapshot(tmp_path / "seed.json.snap") as snap:
+        assert (snap.seed_size, snap.seed_digest) == (os.stat(seed).st_size, file_digest(seed))
@@ -0,0 +1,97 @@
+from core.store import OrderStore
+from core.service import DeliveryService
+from core.ftypes import safe_order
+from core.filters import select_by_restaurant
+from core.domain import Order
+
+
+def _orders():
+    return (
+        Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "placed"),
+        Order("o2", "r2", (("m2", 1),), 1500, "2024-01-15 11:00:00", "delivered"),
+        Order("o3", "r1", (("m1", 2),), 2000, "2024-01-15 12:00:00", "placed"),
+    )
+
+
+def test_store_behaves_like_tuple():
+    """Тест что OrderStore ведет себя как кортеж заказов"""
+    orders = _orders()
+    store = OrderStore(orders)
+
+    assert len(store) == 3
+    assert store[0].id == "o1"
+    assert store[:2] == orders[:2]
+    assert tuple(store) == orders
+    assert store == orders
+    assert orders[1] in store
+
+
+def test_store_indexes():
+    """Тест индексов по id, rest_id и status"""
+    store = OrderStore(_orders())
+
+    assert store.get("o2").rest_id == "r2"
+    assert store.get("missing") is None
+    assert [o.id for o in store.by_rest_id("r1")] == ["o1", "o3"]
+    assert [o.id for o in store.by_status("placed")] == ["o1", "o3"]
+    assert store.by_status("cancelled") == ()
+
+
+def test_store_add_immutability():
+    """Тест что add возвращает новую версию и не меняет старую"""
+    store = OrderStore(_orders())
+    new_order = Order("o4", "r2", (("m3", 1),), 700, "2024-01-15 13:00:00", "placed")
+
+    new_store = store.add(new_order)
+
+    assert len(store) == 3
+    assert len(new_store) == 4
+    assert store.get("o4") is None
+    assert new_store.get("o4") == new_order
+    assert len(new_store.by_status("placed")) == 3
+
+
+def test_indexed_lookups_in_consumers():
+    """Тест что safe_order, фильтры и сервис используют индексы"""
+    store = OrderStore(_orders())
+    service = DeliveryService(_orders(), ())
+
+    assert safe_order(store, "o3").value.total == 2000
+    assert safe_order(store, "nope").is_nothing()
+    assert [o.id for o in select_by_restaurant(store, "r1")] == ["o1", "o3"]
+    assert [o.id for o in select_by_restaurant(_orders(), "r1")] == ["o1", "o3"]
+    assert [o.id for o in service.get_orders_by_status("delivered")] == ["o2"]
+    assert service.get_orders_by_status("delivered") == (_orders()[1],)
+    assert isinstance(hash(service.orders.by_rest_id("r1")), int)
+    assert service.place_order(_orders()[0]).get_revenue() == 5500
+
+
+def test_update_keeps_single_version():
+    """Тест: update заменяет заказ в группах, а не копит старые версии"""
+    order = _orders()[0]
+    assert len(OrderStore([order]).update(order).by_status("placed")) == 1
+
+    store = OrderStore(_orders())
+    store.ts_index()
+    delivered = Order("o1", "r1", (("m1", 1),), 1000, "2024-01-15 10:00:00", "delivered")
+    new = store.update(delivered).update(delivered)
+
+    assert [o.id for o in new.by_status("placed")] == ["o3"]
+    assert [o.id for o in new.by_status("delivered")] == ["o1", "o2"]
+    assert new.by_rest_id("r1") == (delivered, _orders()[2])
+    assert new.by_ts_range("2024-01-15 10:00:00", "2024-01-15 10:00:00") == (delivered,)
+    assert [o.id for o in store.by_status("placed")] == ["o1", "o3"]
+    assert len(new._by_status.get("delivered")) == 2
+
+
+def test_group_rows_cached_between_reads():
+    """Тест: кортеж группы кэшируется, add дописывает его без пересборки"""
+    store = OrderStore(_orders())
+    placed = store.by_status("placed")
+    assert store.by_status("placed") is placed
+
+    extra = Order("o4", "r2", (("m2", 1),), 500, "2024-01-15 13:00:00", "placed")
+    added = store.add(extra)
+    assert added.by_status("placed") == placed + (extra,)
+    assert added.by_status("placed") is added.by_status("placed")
+    assert store.by_status("placed") is placed
@@ -0,0 +1,82 @@
+import pytest
+from core.timeindex import TimeIndex, time_of_day, to_epoch, slot_bounds
+from core.store import OrderStore
+from core.domain import Order, Slot
+
+
+def _order(i, ts):
+    return Order(f"o{i}", "r1", (("m1", 1),), 1000, ts, "placed")
+
+
+def _orders():
+    return (
+        _order(1, "2024-01-15 12:00:00"),
+        _order(2, "2024-01-15 10:00:00"),
+        _order(3, "2024-01-15 11:30:00"),
+        _order(4, "2024-01-15 11:00:00"),
+    )
+
+
+def test_to_epoch_formats():
+    """Тест разбора полного времени и времени суток"""
+    assert to_epoch("1970-01-02 00:00:00") == 86400
+    assert time_of_day("10:30") == 10 * 3600 + 30 * 60
+    assert to_epoch(42) == 42
+    assert slot_bounds(Slot("s1", "c1", "10:00", "12:00")) == (36000, 43200)
+    assert slot_bounds(Slot("s2", "c1", "1970-01-02 00:00:00", "1970-01-02 01:00:00")) == (86400, 90000)
+    # Время суток - отдельная ось, to_epoch его не принимает
+    with pytest.raises(ValueError):
+        to_epoch("10:30")
+
+
+def test_order_epoch_parsed_once():
+    """Тест: эпоха заказа считается при загрузке и не входит в равенство"""
+    from core.loader import make_order
+    order = make_order({"id": "o1", "rest_id": "r1", "items": [["m1", 1]], "total": 1,
+                        "ts": "1970-01-01 01:00:00", "status": "placed"})
+
+    assert order._epoch == 3600 == order.epoch
+    assert order == Order("o1", "r1", (("m1", 1),), 1, "1970-01-01 01:00:00", "placed")
+
+
+def test_range_matches_filter_scan():
+    """Тест что запрос по окну совпадает с полным проходом"""
+    orders = _orders()
+    index = TimeIndex(orders)
+
+    result = index.range("2024-01-15 10:30:00", "2024-01-15 12:00:00")
+
+    assert [o.id for o in result] == ["o4", "o3", "o1"]
+    assert index.count_range("2024-01-15 13:00:00", "2024-01-15 14:00:00") == 0
+    assert set(result) == {o for o in orders if "2024-01-15 10:30:00" <= o.ts <= "2024-01-15 12:00:00"}
+
+
+def test_last_minutes():
+    """Тест скользящего окна последних N минут"""
+    index = TimeIndex(_orders())
+
+    assert [o.id for o in index.last_minutes(60, now="2024-01-15 12:00:00")] == ["o4", "o3", "o1"]
+    assert [o.id for o in index.last_minutes(29, now="2024-01-15 12:00:00")] == ["o1"]
+
+
+def test_add_keeps_versions_independent():
+    """Тест что добавление в индекс не меняет старые версии"""
+    base = TimeIndex(_orders())
+    appended = base.add(_order(5, "2024-01-15 13:00:00"))
+    branched = base.add(_order(6, "2024-01-15 10:15:00"))
+
+    assert len(base) == 4
+    assert [o.id for o in appended.range("2024-01-15 12:30:00", "2024-01-15 14:00:00")] == ["o5"]
+    assert [o.id for o in branched.range("2024-01-15 12:30:00", "2024-01-15 14:00:00")] == []
+    assert [o.id for o in branched.range("2024-01-15 10:00:00", "2024-01-15 10:30:00")] == ["o2", "o6"]
+    assert base.range("2024-01-15 12:30:00", "2024-01-15 14:00:00") == ()
+
+
+def test_store_maintains_time_index():
+    """Тест что OrderStore ведет индекс времени при добавлении заказов"""
+    store = OrderStore(_orders())
+    store.ts_index()
+    newer = store.add(_order(5, "2024-01-15 12:10:00"))
+
+    assert [o.id for o in newer.in_last_minutes(15, now="2024-01-15 12:15:00")] == ["o1", "o5"]
+    assert [o.id for o in store.in_last_minutes(15, now="2024-01-15 12:15:00")] == ["o1"]
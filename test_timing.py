@@ -0,0 +1,75 @@
+import pytest
+from core import memo
+from core.domain import Courier, Order
+from core.timing import Timing, measure, measure_cold_warm
+
+
+def test_timing_statistics():
+    """Тест медианы, MAD и доверительного интервала"""
+    t = Timing.from_samples([10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20])
+
+    assert t.median == 15
+    assert t.mad == pytest.approx(3 * 1.4826)
+    assert t.ci_low <= t.median <= t.ci_high
+    assert t.outliers == 0 and t.as_dict(unit=1)["samples"] == 11
+
+
+def test_outliers_excluded_from_mean():
+    """Тест: выброс не сдвигает медиану и не входит в mean"""
+    t = Timing.from_samples([100, 101, 99, 100, 102, 98, 100, 10_000])
+
+    assert t.median == 100
+    assert t.outliers == 1
+    assert t.mean == pytest.approx(100)
+    assert t.p99 == 10_000
+
+    with pytest.raises(ValueError):
+        Timing.from_samples([])
+
+
+def test_measure_batches_fast_calls():
+    """Тест автоподбора числа вызовов на замер"""
+    calls = []
+    t = measure(lambda: calls.append(1), repeat=5, warmup=1, min_sample_ns=100_000)
+
+    assert t.number > 1
+    assert len(t.samples) == 5
+    assert len(calls) >= 5 * t.number
+
+
+def test_measure_with_setup_is_single_call():
+    """Тест холодного пути: setup вне таймера, один вызов на замер"""
+    states = []
+    t = measure(lambda s: s.append(1), repeat=4, warmup=2, setup=lambda: states.append([]) or states[-1])
+
+    assert t.number == 1 and len(t.samples) == 4
+    assert len(states) == 6 and all(s == [1] for s in states)
+
+
+def test_cold_warm_speedup():
+    """Тест: теплый вызов по заполненному кэшу быстрее холодного"""
+    def call(cache):
+        if "x" not in cache:
+            cache["x"] = sum(range(20_000))
+        return cache["x"]
+
+    speedup = measure_cold_warm(call, dict, repeat=9, warmup=1)
+
+    assert speedup.ratio > 1
+    low, high = speedup.ci
+    assert low <= speedup.ratio <= high
+
+
+def test_measure_performance_keeps_shared_cache():
+    """Тест: замер не очищает и не заполняет общий кэш маршрутов"""
+    orders = tuple(Order(f"o{i}", "r1", (("m1", 1),), 500, "2024-01-01T10:00:00", "placed") for i in range(5))
+    couriers = (Courier("c1", "Иван", "bike", "center"),)
+    memo.compute_route_cost("warm", orders[:2], couriers)
+    before = memo.route_cache.cache_info()
+
+    perf = memo.measure_performance("perf", orders, couriers, repeat=5, warmup=1)
+
+    assert memo.route_cache.cache_info() == before
+    assert perf["first_call_time"] > perf["cached_call_time"] > 0
+    assert perf["result"]["orders_count"] == 5
+    assert perf["cold"]["samples"] == 5
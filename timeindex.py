@@ -0,0 +1,140 @@
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple, Union
+from .domain import Order, Slot
+
+Timestamp = Union[str, int]
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def to_epoch(ts: Timestamp) -> int:
+    """'YYYY-MM-DD HH:MM[:SS]' -> секунды Unix (UTC); числа возвращаются как есть"""
+    if isinstance(ts, int):
+        return ts
+    return (datetime.fromisoformat(ts) - _EPOCH) // _SECOND
+
+
+def time_of_day(hhmm: str) -> int:
+    """'HH:MM[:SS]' -> секунды от полуночи"""
+    parts = hhmm.split(":")
+    return int(parts[0]) * 3600 + int(parts[1]) * 60 + (int(parts[2]) if len(parts) > 2 else 0)
+
+
+DAY = 24 * 3600
+
+
+def is_time_of_day(value: Timestamp) -> bool:
+    """'HH:MM[:SS]' без даты - время ежедневного слота"""
+    return isinstance(value, str) and len(value) <= 8
+
+
+def slot_time(value: Timestamp) -> int:
+    """Время на оси слотов: 'HH:MM' - секунды от полуночи (ежедневный слот), иначе to_epoch"""
+    if is_time_of_day(value):
+        return time_of_day(value)
+    return to_epoch(value)
+
+
+def slot_bounds(slot: Slot) -> Tuple[int, int]:
+    """Границы слота: секунды от полуночи для 'HH:MM', секунды Unix для полных дат"""
+    return slot_time(slot.start), slot_time(slot.end)
+
+
+def day_ranges(start: int, end: int) -> Tuple[Tuple[int, int], ...]:
+    """Интервалы времени суток, которые покрывает [start, end) на оси секунд.
+
+    Промежуток через полночь делится на два интервала, сутки и больше -
+    весь день. Для ежедневного слота конец не позже начала - переход через
+    полночь ("22:00"-"02:00"), а равные границы - круглые сутки.
+    """
+    if end - start >= DAY:
+        return ((0, DAY),)
+    lo, hi = start % DAY, end % DAY
+    if lo < hi:
+        return ((lo, hi),)
+    return ((lo, DAY), (0, hi)) if hi else ((lo, DAY),)
+
+
+def slot_intervals(slot: Slot) -> Tuple[bool, Tuple[Tuple[int, int], ...]]:
+    """(ежедневный ли слот, его интервалы на своей оси).
+
+    Ежедневный слот 'HH:MM' - интервалы времени суток (day_ranges, ночной
+    слот делится в полночь). Слот с датами - один интервал секунд Unix;
+    ValueError, если он кончается не позже начала.
+    """
+    start, end = slot_bounds(slot)
+    if is_time_of_day(slot.start) and is_time_of_day(slot.end):
+        return True, day_ranges(start, end if end > start else end + DAY)
+    if end <= start:
+        raise ValueError(f"Slot {slot.id} ends before it starts: {slot.start}-{slot.end}")
+    return False, ((start, end),)
+
+
+class TimeIndex:
+    """Отсортированный индекс заказов по времени с эпохами, разобранными один раз.
+
+    Запросы по окну - бинарный поиск, O(log n + k). Версии разделяют буферы
+    при добавлении в конец (обычный случай для потока заказов): каждая версия
+    видит только свои первые count записей.
+    """
+
+    __slots__ = ("_keys", "_orders", "_count")
+
+    def __init__(self, orders: Iterable[Order] = ()):
+        pairs = sorted(((o.epoch, o) for o in orders), key=lambda p: p[0])
+        self._keys = array('q', (k for k, _ in pairs))
+        self._orders: List[Order] = [o for _, o in pairs]
+        self._count = len(pairs)
+
+    @classmethod
+    def _make(cls, keys: array, orders: List[Order], count: int) -> 'TimeIndex':
+        index = cls.__new__(cls)
+        index._keys = keys
+        index._orders = orders
+        index._count = count
+        return index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, order: Order) -> 'TimeIndex':
+        """Новая версия индекса с заказом; O(1) амортизированно для заказов в порядке времени"""
+        key = order.epoch
+        keys, orders, count = self._keys, self._orders, self._count
+        if len(keys) == count and (count == 0 or keys[count - 1] <= key):
+            # Буфер принадлежит этой версии целиком: дописываем без копирования
+            keys.append(key)
+            orders.append(order)
+            return TimeIndex._make(keys, orders, count + 1)
+        keys = keys[:count]
+        orders = orders[:count]
+        pos = bisect_right(keys, key)
+        keys.insert(pos, key)
+        orders.insert(pos, order)
+        return TimeIndex._make(keys, orders, count + 1)
+
+    def bounds(self, start: Timestamp, end: Timestamp) -> Tuple[int, int]:
+        """Позиции [lo, hi) заказов с start <= ts <= end"""
+        lo = bisect_left(self._keys, to_epoch(start), 0, self._count)
+        hi = bisect_right(self._keys, to_epoch(end), 0, self._count)
+        return lo, max(lo, hi)
+
+    def count_range(self, start: Timestamp, end: Timestamp) -> int:
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    def range(self, start: Timestamp, end: Timestamp) -> Tuple[Order, ...]:
+        lo, hi = self.bounds(start, end)
+        return tuple(self._orders[lo:hi])
+
+    def last_minutes(self, minutes: int, now: Optional[Timestamp] = None) -> Tuple[Order, ...]:
+        """Скользящее окно: заказы за последние minutes минут до now (по умолчанию - сейчас)"""
+        end = int(time.time()) if now is None else to_epoch(now)
+        return self.range(end - minutes * 60, end)
+
+    def latest(self) -> Optional[int]:
+        return self._keys[self._count - 1] if self._count else None
@@ -0,0 +1,144 @@
+import gc
+import math
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# Порог выбросов в единицах масштабированного MAD (~3.5 сигмы для нормального шума)
+OUTLIER_MADS = 3.5
+_MAD_SCALE = 1.4826
+_Z95 = 1.959964
+
+
+@dataclass(frozen=True, slots=True)
+class Timing:
+    """Статистика замеров одного вызова, наносекунды.
+
+    Центр - медиана, разброс - MAD; доверительный интервал медианы (95%)
+    строится по порядковым статистикам и не требует нормальности.
+    Выбросы (дальше OUTLIER_MADS MAD от медианы) не влияют на медиану и
+    исключаются из mean.
+    """
+    samples: Tuple[float, ...]
+    number: int
+    median: float
+    mean: float
+    mad: float
+    p99: float
+    ci_low: float
+    ci_high: float
+    outliers: int
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[float], number: int = 1) -> 'Timing':
+        if not samples:
+            raise ValueError("No timing samples")
+        ordered = sorted(samples)
+        n = len(ordered)
+        median = statistics.median(ordered)
+        mad = statistics.median(abs(x - median) for x in ordered) * _MAD_SCALE
+        kept = [x for x in ordered if mad == 0 or abs(x - median) <= OUTLIER_MADS * mad]
+        # Ранги границ ДИ медианы: биномиальное распределение числа замеров ниже медианы
+        half = _Z95 * math.sqrt(n) / 2
+        lo = max(0, math.floor(n / 2 - half) - 1)
+        hi = min(n - 1, math.ceil(n / 2 + half) - 1)
+        p99 = ordered[max(0, math.ceil(0.99 * n) - 1)]
+        return cls(tuple(samples), number, median, statistics.fmean(kept), mad, p99,
+                   ordered[lo], ordered[hi], n - len(kept))
+
+    def as_dict(self, unit: float = 1e6) -> Dict[str, float]:
+        """Сводка в миллисекундах (unit - делитель наносекунд)"""
+        return {
+            "median": self.median / unit,
+            "mean": self.mean / unit,
+            "mad": self.mad / unit,
+            "p99": self.p99 / unit,
+            "ci_low": self.ci_low / unit,
+            "ci_high": self.ci_high / unit,
+            "samples": len(self.samples),
+            "number": self.number,
+            "outliers": self.outliers,
+        }
+
+
+def _calibrate(func: Callable[[], Any], min_sample_ns: int) -> int:
+    # Подбираем число вызовов на замер, чтобы замер был заметно дольше разрешения таймера
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        if time.perf_counter_ns() - start >= min_sample_ns or number >= 1 << 20:
+            return number
+        number *= 4
+
+
+def measure(func: Callable[[], Any], repeat: int = 30, warmup: int = 3, number: Optional[int] = None,
+            setup: Optional[Callable[[], Any]] = None, min_sample_ns: int = 200_000) -> Timing:
+    """Время одного вызова func по repeat замерам после warmup прогревочных.
+
+    Быстрые вызовы группируются по number штук в замер (подбирается
+    автоматически), и время делится на number. Если задан setup, он
+    вызывается перед каждым замером вне таймера, а его результат передается
+    в func; тогда в замере ровно один вызов (холодный путь).
+    """
+    if setup is not None:
+        for _ in range(warmup):
+            func(setup())
+        samples = []
+        for _ in range(repeat):
+            state = setup()
+            start = time.perf_counter_ns()
+            func(state)
+            samples.append(time.perf_counter_ns() - start)
+        return Timing.from_samples(samples, 1)
+
+    for _ in range(warmup):
+        func()
+    if number is None:
+        number = _calibrate(func, min_sample_ns)
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter_ns() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return Timing.from_samples(samples, number)
+
+
+@dataclass(frozen=True, slots=True)
+class Speedup:
+    cold: Timing
+    warm: Timing
+
+    @property
+    def ratio(self) -> float:
+        return self.cold.median / self.warm.median if self.warm.median > 0 else math.inf
+
+    @property
+    def ci(self) -> Tuple[float, float]:
+        """Консервативные границы отношения по ДИ медиан холодного и теплого вызова"""
+        low = self.cold.ci_low / self.warm.ci_high if self.warm.ci_high > 0 else math.inf
+        high = self.cold.ci_high / self.warm.ci_low if self.warm.ci_low > 0 else math.inf
+        return low, high
+
+
+def measure_cold_warm(call: Callable[[Any], Any], make_cache: Callable[[], Any], repeat: int = 30,
+                      warmup: int = 3, cold_repeat: Optional[int] = None) -> Speedup:
+    """Холодная и теплая задержка call(cache) на изолированных экземплярах кэша.
+
+    Холодный замер получает новый пустой кэш от make_cache, теплый - один
+    кэш, заполненный первым вызовом. Общие кэши приложения не трогаются.
+    """
+    cold = measure(call, repeat=cold_repeat or repeat, warmup=warmup, setup=make_cache)
+    cache = make_cache()
+    call(cache)
+    warm = measure(lambda: call(cache), repeat=repeat, warmup=warmup)
+    return Speedup(cold, warm)
@@ -1,31 +1,12 @@
 from functools import reduce
 from typing import Tuple
-from .domain import Order, Slot, Restaurant, MenuItem, Courier
+from .domain import Order, Slot
+from .loader import collect_seed, iter_seed_batches
 
 
 def load_seed(data: dict) -> tuple:
-    restaurants = tuple(Restaurant(**r) for r in data.get('restaurants', []))
-    menu_items = tuple(MenuItem(**m) for m in data.get('menu_items', []))
-
-    # Преобразуем items из list в tuple для хеширования
-    orders_data = []
-    for o in data.get('orders', []):
-        items_tuple = tuple(tuple(item) for item in o['items'])
-        order = Order(
-            id=o['id'],
-            rest_id=o['rest_id'],
-            items=items_tuple,
-            total=o['total'],
-            ts=o['ts'],
-            status=o['status']
-        )
-        orders_data.append(order)
-    orders = tuple(orders_data)
-
-    couriers = tuple(Courier(**c) for c in data.get('couriers', []))
-    slots = tuple(Slot(**s) for s in data.get('slots', []))
-
-    return restaurants, menu_items, orders, couriers, slots
+    # Сборка кортежей поверх того же потокового пути, что и для больших файлов
+    return collect_seed(iter_seed_batches(data))
 
 
 def add_order(orders: Tuple[Order, ...], new_order: Order) -> Tuple[Order, ...]: